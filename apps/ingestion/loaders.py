@@ -1,56 +1,354 @@
 import pandas as pd
+from openpyxl import load_workbook
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
 from apps.customers.models import Customer
 from apps.loans.models import Loan
+from apps.loans.services.loan_summary import LoanSummaryService
+from apps.loans.services.score_events import ScoreEventService
+from apps.ingestion.validation import ChunkValidator
 from datetime import datetime
+import csv
+import io
+import itertools
 import logging
+import os
+import shutil
+import tempfile
 
 logger = logging.getLogger(__name__)
 
+class OrmBatchWriter:
+    """Default backend: one bulk_create(ignore_conflicts=True) per chunk."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def write(self, instances):
+        self.model.objects.bulk_create(instances, ignore_conflicts=True)
+
+    def close(self):
+        pass
+
+class PostgresCopyWriter:
+    """
+    PostgreSQL backend: chunks are streamed into a session-local staging
+    table with COPY FROM STDIN and merged into the target table with
+    INSERT ... ON CONFLICT DO NOTHING, which keeps the skip-existing
+    behaviour of bulk_create(ignore_conflicts=True).
+
+    Values go through the same field pre_save/get_db_prep_save hooks the
+    ORM uses, so both backends write identical rows.
+    """
+    MERGE_ROWS = 100000  # Staged rows merged per INSERT ... SELECT
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = model._meta.concrete_fields
+        self.table = model._meta.db_table
+        self.staging_table = f"staging_{self.table}"
+        self.columns = ', '.join(connection.ops.quote_name(field.column) for field in self.fields)
+        self.staged_rows = 0
+        # Resolve the connection proxy once; it is looked up per value below
+        self.connection = connections[DEFAULT_DB_ALIAS]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE IF NOT EXISTS {self.staging_table} "
+                f"(LIKE {connection.ops.quote_name(self.table)} INCLUDING DEFAULTS)"
+            )
+            cursor.execute(f"TRUNCATE {self.staging_table}")
+
+    @staticmethod
+    def format_value(value):
+        """Encode one value for COPY's text format."""
+        if value is None:
+            return '\\N'
+        return (
+            str(value)
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r')
+        )
+
+    def write(self, instances):
+        buffer = io.StringIO()
+        for obj in instances:
+            buffer.write('\t'.join(
+                self.format_value(field.get_db_prep_save(field.pre_save(obj, True), self.connection))
+                for field in self.fields
+            ))
+            buffer.write('\n')
+        buffer.seek(0)
+
+        with connection.cursor() as cursor:
+            cursor.cursor.copy_expert(f"COPY {self.staging_table} ({self.columns}) FROM STDIN", buffer)
+        self.staged_rows += len(instances)
+
+        if self.staged_rows >= self.MERGE_ROWS:
+            self.merge()
+
+    def merge(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {connection.ops.quote_name(self.table)} ({self.columns}) "
+                f"SELECT {self.columns} FROM {self.staging_table} ON CONFLICT DO NOTHING"
+            )
+            cursor.execute(f"TRUNCATE {self.staging_table}")
+        self.staged_rows = 0
+
+    def close(self):
+        if self.staged_rows:
+            self.merge()
+
 class ExcelLoader:
     BATCH_SIZE = 1000
 
     @staticmethod
-    def load_customers(file_path):
+    def get_writer(model, backend=None):
+        """
+        Pick the write backend: 'orm', 'copy' or 'auto' (settings.INGESTION_BACKEND).
+        COPY needs PostgreSQL; other databases (SQLite in dev/tests) fall back to the ORM.
+        """
+        backend = backend or settings.INGESTION_BACKEND
+        if backend in ('copy', 'auto') and connection.vendor == 'postgresql':
+            return PostgresCopyWriter(model)
+        if backend == 'copy':
+            logger.warning(f"COPY ingestion needs PostgreSQL, falling back to ORM on {connection.vendor}")
+        return OrmBatchWriter(model)
+
+    @staticmethod
+    def iter_chunks(file_path, chunk_size=None, row_offset=0):
+        """
+        Stream a workbook or CSV as (first_row_index, DataFrame) chunks of at
+        most chunk_size rows, so peak memory is bounded by the chunk size
+        rather than the file size.
+
+        .xlsx files are read with openpyxl in read_only mode; .csv files with
+        pandas' chunked reader. Row indexes are 0-based data rows, matching
+        what pd.read_excel used to report, counted from row_offset (the
+        index of a shard file's first row in the file it was split from).
+        """
+        chunk_size = chunk_size or ExcelLoader.BATCH_SIZE
+
+        if str(file_path).lower().endswith('.csv'):
+            start = row_offset
+            for chunk in pd.read_csv(file_path, chunksize=chunk_size):
+                yield start, chunk
+                start += len(chunk)
+            return
+
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+
+            start = row_offset
+            records = []
+            for row in rows:
+                # read_only sheets can report trailing blank rows
+                if all(value is None for value in row):
+                    continue
+                records.append(row)
+                if len(records) >= chunk_size:
+                    yield start, pd.DataFrame.from_records(records, columns=header)
+                    start += len(records)
+                    records = []
+
+            if records:
+                yield start, pd.DataFrame.from_records(records, columns=header)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def iter_records(file_path):
+        """
+        The header and then every data row of a workbook or CSV as one
+        encoded CSV record, skipping the blank rows iter_chunks skips. CSV
+        lines are passed through untouched (a quoted field can span lines,
+        so lines are joined while a quote is open); workbook rows are
+        written out with the csv module.
+        """
+        if str(file_path).lower().endswith('.csv'):
+            with open(file_path, 'rb') as source:
+                record = b''
+                for line in source:
+                    record += line
+                    if record.count(b'"') % 2:
+                        continue
+                    if record.strip():
+                        yield record
+                    record = b''
+                if record.strip():
+                    yield record
+            return
+
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in itertools.chain([header], rows):
+                if all(value is None for value in row):
+                    continue
+                writer.writerow(row)
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def record_field(record, index):
+        """The index-th field of one record from iter_records; None if the record is shorter."""
+        if b'"' in record:
+            fields = next(csv.reader(io.StringIO(record.decode('utf-8-sig'))))
+        else:
+            fields = record.split(b',', index + 1)
+        return fields[index] if index < len(fields) else None
+
+    @staticmethod
+    def record_id(value):
+        """An integer id from a CSV field, or None where ChunkValidator would reject it."""
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None
+        return int(number) if number.is_integer() else None
+
+    @staticmethod
+    def plan_shards(file_path, shard_size=None, id_column=None):
+        """
+        Split a file into CSV shard files of at most shard_size rows, in one
+        pass, so every shard parses only its own rows instead of skipping
+        over the rows of the shards before it. Returns
+        [(shard_path, start_row, end_row, seen_ids)], where [start_row,
+        end_row) are the shard's rows in the original file; [] for a file
+        without rows.
+
+        seen_ids lists the id_column values of the shard that already
+        appear in an earlier shard. Loading the shard with them marks those
+        rows as duplicates, as a serial load would, instead of the write
+        silently skipping them as conflicts.
+
+        Shards are written next to the file (or under
+        settings.INGESTION_SHARD_DIR) so workers that can read the file can
+        read them; remove_shards deletes them once they are loaded.
+        """
+        shard_size = shard_size or settings.INGESTION_SHARD_SIZE
+        records = ExcelLoader.iter_records(file_path)
+        header = next(records, None)
+        if header is None:
+            return []
+        columns = next(csv.reader(io.StringIO(header.decode('utf-8-sig'))))
+        id_index = columns.index(id_column) if id_column in columns else None
+
+        shard_dir = tempfile.mkdtemp(
+            prefix=f"{os.path.basename(file_path)}.",
+            suffix='.shards',
+            dir=settings.INGESTION_SHARD_DIR or os.path.dirname(os.path.abspath(file_path))
+        )
+        shards = []
+        shard_file = None
+        total_rows = 0
+        earlier_ids = set()
+        shard_ids = set()
+        try:
+            try:
+                for record in records:
+                    if total_rows % shard_size == 0:
+                        if shard_file:
+                            shard_file.close()
+                        shard_path = os.path.join(shard_dir, f"{len(shards):05d}.csv")
+                        shard_file = open(shard_path, 'wb')
+                        shard_file.write(header)
+                        earlier_ids |= shard_ids
+                        shard_ids = set()
+                        shards.append((shard_path, total_rows, set()))
+                    shard_file.write(record)
+                    total_rows += 1
+
+                    if id_index is not None:
+                        record_id = ExcelLoader.record_id(ExcelLoader.record_field(record, id_index))
+                        if record_id in earlier_ids:
+                            shards[-1][2].add(record_id)
+                        elif record_id is not None:
+                            shard_ids.add(record_id)
+            finally:
+                if shard_file:
+                    shard_file.close()
+        except Exception:
+            shutil.rmtree(shard_dir, ignore_errors=True)
+            raise
+
+        if not shards:
+            shutil.rmtree(shard_dir, ignore_errors=True)
+        return [
+            (shard_path, start, min(start + shard_size, total_rows), sorted(seen_ids))
+            for shard_path, start, seen_ids in shards
+        ]
+
+    @staticmethod
+    def remove_shards(shard_paths):
+        """Delete the shard files written by plan_shards."""
+        if shard_paths:
+            shutil.rmtree(os.path.dirname(shard_paths[0]), ignore_errors=True)
+
+    @staticmethod
+    def merge_summaries(summaries):
+        """Combine per-shard {'total','success','failed','errors'} summaries into one report."""
+        report = {'total': 0, 'success': 0, 'failed': 0, 'errors': []}
+        for summary in summaries:
+            report['total'] += summary['total']
+            report['success'] += summary['success']
+            report['failed'] += summary['failed']
+            report['errors'].extend(summary['errors'])
+        return report
+
+    @staticmethod
+    def load_customers(file_path, backend=None, row_offset=0, seen_ids=()):
         try:
-            df = pd.read_excel(file_path)
-            total_rows = len(df)
+            writer = ExcelLoader.get_writer(Customer, backend)
+            total_rows = 0
             success_count = 0
             fail_count = 0
             errors = []
-            
-            batch = []
-            
-            for index, row in df.iterrows():
-                try:
-                    phone = str(row['Phone Number'])
-                    if not phone:
-                        raise ValueError("Missing Phone Number")
-                        
-                    customer = Customer(
-                        customer_id=row['Customer ID'],
-                        first_name=row['First Name'],
-                        last_name=row['Last Name'],
+            written_customer_ids = []
+            seen_customer_ids = set(seen_ids)
+
+            for start, chunk in ExcelLoader.iter_chunks(file_path, row_offset=row_offset):
+                total_rows += len(chunk)
+                # Only rows that pass the column-wise checks are turned into instances
+                clean, chunk_errors = ChunkValidator.validate_customers(chunk, start, seen_customer_ids)
+                fail_count += len(chunk_errors)
+                errors.extend(ChunkValidator.messages(chunk_errors))
+                batch = [
+                    Customer(
+                        customer_id=customer_id,
+                        first_name=first_name,
+                        last_name=last_name,
                         phone_number=phone,
-                        monthly_salary=row['Monthly Salary'],
-                        approved_limit=row['Approved Limit'],
-                        current_debt=row.get('Current Debt', 0),
-                        age=row['Age']
+                        monthly_salary=salary,
+                        approved_limit=limit,
+                        current_debt=debt,
+                        age=age
                     )
-                    batch.append(customer)
-                    
-                    if len(batch) >= ExcelLoader.BATCH_SIZE:
-                        Customer.objects.bulk_create(batch, ignore_conflicts=True)
-                        success_count += len(batch)
-                        batch = []
-                        
-                except Exception as e:
-                    fail_count += 1
-                    errors.append(f"Row {index}: {str(e)}")
-            
-            if batch:
-                Customer.objects.bulk_create(batch, ignore_conflicts=True)
-                success_count += len(batch)
-                
+                    for customer_id, first_name, last_name, phone, salary, limit, debt, age in zip(*clean.values())
+                ]
+
+                if batch:
+                    writer.write(batch)
+                    success_count += len(batch)
+                    written_customer_ids.extend(customer.customer_id for customer in batch)
+
+            writer.close()
+            # Approved limits feed the debt-overload check of existing scores
+            ScoreEventService.publish_on_commit(written_customer_ids)
             return {
                 'total': total_rows,
                 'success': success_count,
@@ -62,50 +360,48 @@ class ExcelLoader:
             raise e
 
     @staticmethod
-    def load_loans(file_path):
+    def load_loans(file_path, backend=None, row_offset=0, seen_ids=()):
         try:
-            df = pd.read_excel(file_path)
-            total_rows = len(df)
+            writer = ExcelLoader.get_writer(Loan, backend)
+            total_rows = 0
             success_count = 0
             fail_count = 0
             errors = []
-            
-            batch = []
+
             existing_customer_ids = set(Customer.objects.values_list('customer_id', flat=True))
-            
-            for index, row in df.iterrows():
-                try:
-                    customer_id = row['Customer ID']
-                    if customer_id not in existing_customer_ids:
-                        raise ValueError(f"Customer {customer_id} does not exist")
-
-                    loan = Loan(
-                        loan_id=row['Loan ID'],
+            affected_customer_ids = set()
+            seen_loan_ids = set(seen_ids)
+
+            for start, chunk in ExcelLoader.iter_chunks(file_path, row_offset=row_offset):
+                total_rows += len(chunk)
+                clean, chunk_errors = ChunkValidator.validate_loans(chunk, start, existing_customer_ids, seen_loan_ids)
+                fail_count += len(chunk_errors)
+                errors.extend(ChunkValidator.messages(chunk_errors))
+                batch = [
+                    Loan(
+                        loan_id=loan_id,
                         customer_id=customer_id,
-                        loan_amount=row['Loan Amount'],
-                        tenure=row['Tenure'],
-                        interest_rate=row['Interest Rate'],
-                        monthly_repayment=row['Monthly payment'],
-                        emis_paid_on_time=row['EMIs paid on Time'],
-                        start_date=pd.to_datetime(row['Date of Approval']).date(),
-                        end_date=pd.to_datetime(row['End Date']).date(),
-                        status='APPROVED' 
+                        loan_amount=amount,
+                        tenure=tenure,
+                        interest_rate=rate,
+                        monthly_repayment=repayment,
+                        emis_paid_on_time=paid_on_time,
+                        start_date=start_date,
+                        end_date=end_date,
+                        status='APPROVED'
                     )
-                    batch.append(loan)
-                    
-                    if len(batch) >= ExcelLoader.BATCH_SIZE:
-                        Loan.objects.bulk_create(batch, ignore_conflicts=True)
-                        success_count += len(batch)
-                        batch = []
-
-                except Exception as e:
-                    fail_count += 1
-                    errors.append(f"Row {index}: {str(e)}")
+                    for loan_id, customer_id, amount, tenure, rate, repayment, paid_on_time, start_date, end_date in zip(*clean.values())
+                ]
 
-            if batch:
-                Loan.objects.bulk_create(batch, ignore_conflicts=True)
-                success_count += len(batch)
+                if batch:
+                    writer.write(batch)
+                    success_count += len(batch)
+                    affected_customer_ids.update(loan.customer_id for loan in batch)
 
+            writer.close()
+            # Bulk writes bypass LoanService, so refresh the touched summaries once at the end
+            LoanSummaryService.rebuild(affected_customer_ids)
+            ScoreEventService.publish_on_commit(affected_customer_ids)
             return {
                 'total': total_rows,
                 'success': success_count,
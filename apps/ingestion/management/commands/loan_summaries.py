@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from apps.loans.services.loan_summary import LoanSummaryService
+
+class Command(BaseCommand):
+    help = 'Rebuilds or verifies the per-customer loan summaries against the Loan table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['rebuild', 'verify'])
+        parser.add_argument(
+            '--customer-id', type=int, action='append', dest='customer_ids', default=None,
+            help='Limit to this customer_id (repeatable); defaults to every customer'
+        )
+        parser.add_argument(
+            '--stale', action='store_true',
+            help='With rebuild: only the customers whose active EMI figures have expired (run daily)'
+        )
+        parser.add_argument(
+            '--fix', action='store_true',
+            help='With verify: rebuild the customers whose summaries drifted'
+        )
+
+    def handle(self, *args, **options):
+        customer_ids = options['customer_ids']
+
+        if options['action'] == 'rebuild':
+            self.stdout.write("Rebuilding loan summaries...")
+            if options['stale']:
+                customer_ids = list(LoanSummaryService.stale_customer_ids())
+            rebuilt = LoanSummaryService.rebuild(customer_ids)
+            self.stdout.write(self.style.SUCCESS(f"Loan Summaries Rebuilt: {rebuilt}"))
+            return
+
+        self.stdout.write("Verifying loan summaries...")
+        drift = LoanSummaryService.verify(customer_ids)
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Loan Summaries OK"))
+            return
+
+        for customer_id, field, stored, expected in drift:
+            self.stdout.write(f"  customer {customer_id}: {field} stored={stored} expected={expected}")
+        drifted_ids = {customer_id for customer_id, *_ in drift}
+        self.stdout.write(self.style.WARNING(f"Drift found for {len(drifted_ids)} customers"))
+
+        if options['fix']:
+            LoanSummaryService.rebuild(drifted_ids)
+            self.stdout.write(self.style.SUCCESS(f"Loan Summaries Rebuilt: {len(drifted_ids)}"))
@@ -1,13 +1,22 @@
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from apps.ingestion.loaders import ExcelLoader
+from apps.ingestion.parallel import load_parallel
 import os
 
 class Command(BaseCommand):
     help = 'Seeds data from constant/ folder using ExcelLoader'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Worker processes; files are split into shards when > 1'
+        )
+        parser.add_argument('--shard-size', type=int, default=None, help='Rows per shard')
+
     def handle(self, *args, **kwargs):
         self.stdout.write("Starting data seeding from Excel files...")
+        workers = kwargs.get('workers', 1)
+        shard_size = kwargs.get('shard_size')
 
         constant_dir = os.path.join(settings.BASE_DIR, 'constant')
         customer_file = os.path.join(constant_dir, 'customer_data.xlsx')
@@ -17,18 +26,18 @@ class Command(BaseCommand):
         if os.path.exists(customer_file):
             self.stdout.write(f"Loading customers from {customer_file}...")
             try:
-                result = ExcelLoader.load_customers(customer_file)
+                result = load_parallel('customers', customer_file, workers, shard_size)
                 self.stdout.write(self.style.SUCCESS(f"Customers Loaded: {result}"))
             except Exception as e:
                 self.stdout.write(self.style.ERROR(f"Failed to load customers: {e}"))
         else:
             self.stdout.write(self.style.WARNING(f"Customer file not found at {customer_file}"))
 
-        # 2. Load Loans
+        # 2. Load Loans (only after every customer shard has finished)
         if os.path.exists(loan_file):
             self.stdout.write(f"Loading loans from {loan_file}...")
             try:
-                result = ExcelLoader.load_loans(loan_file)
+                result = load_parallel('loans', loan_file, workers, shard_size)
                 self.stdout.write(self.style.SUCCESS(f"Loans Loaded: {result}"))
             except Exception as e:
                 self.stdout.write(self.style.ERROR(f"Failed to load loans: {e}"))
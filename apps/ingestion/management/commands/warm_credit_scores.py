@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from apps.loans.services.credit_score import CreditScoreService
+
+class Command(BaseCommand):
+    help = 'Precomputes credit scores for all customers (or an ID range) into the Redis cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-id', type=int, default=None, help='First customer_id to warm')
+        parser.add_argument('--end-id', type=int, default=None, help='Last customer_id to warm')
+        parser.add_argument(
+            '--chunk-size', type=int, default=CreditScoreService.WARM_CHUNK_SIZE,
+            help='Customers scored per GROUP BY pass and Redis pipeline'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Ignore the checkpoint left by an interrupted run and start from the beginning'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Warming credit score cache...")
+
+        def report_progress(processed, total):
+            self.stdout.write(f"  {processed}/{total} customers scored")
+
+        try:
+            result = CreditScoreService.warm_cache(
+                start_id=options['start_id'],
+                end_id=options['end_id'],
+                chunk_size=options['chunk_size'],
+                resume=not options['restart'],
+                progress_callback=report_progress
+            )
+            self.stdout.write(self.style.SUCCESS(f"Credit Scores Cached: {result}"))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Failed to warm credit scores: {e}"))
@@ -0,0 +1,53 @@
+from concurrent.futures import ProcessPoolExecutor
+from django.db import connection, connections
+from apps.ingestion.loaders import ExcelLoader
+import logging
+
+logger = logging.getLogger(__name__)
+
+LOADERS = {
+    'customers': ExcelLoader.load_customers,
+    'loans': ExcelLoader.load_loans,
+}
+# Column whose values must not repeat across shards (see ExcelLoader.plan_shards)
+ID_COLUMNS = {
+    'customers': 'Customer ID',
+    'loans': 'Loan ID',
+}
+
+def load_shard(kind, shard_path, start_row, seen_ids=()):
+    """
+    Load one shard file of a customer or loan file; start_row numbers its
+    rows and seen_ids are the ids already taken by earlier shards.
+    """
+    return LOADERS[kind](shard_path, row_offset=start_row, seen_ids=seen_ids)
+
+def _init_worker():
+    # Needed under the 'spawn' start method; a no-op for forked workers
+    import django
+    django.setup()
+
+def load_parallel(kind, file_path, workers, shard_size=None):
+    """
+    Load a file by splitting it into shard files (ExcelLoader.plan_shards)
+    and running them across a process pool. Returns the merged summary. SQLite serializes writers, so
+    it (and workers <= 1) falls back to a single serial load.
+    """
+    if workers <= 1 or connection.vendor == 'sqlite':
+        if workers > 1:
+            logger.warning("Parallel ingestion needs a client/server database, loading serially on SQLite")
+        return LOADERS[kind](file_path)
+
+    shards = ExcelLoader.plan_shards(file_path, shard_size, ID_COLUMNS[kind])
+    try:
+        # Forked workers must not share the parent's open DB connection
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [
+                pool.submit(load_shard, kind, shard_path, start_row, seen_ids)
+                for shard_path, start_row, end_row, seen_ids in shards
+            ]
+            summaries = [future.result() for future in futures]
+    finally:
+        ExcelLoader.remove_shards([shard[0] for shard in shards])
+    return ExcelLoader.merge_summaries(summaries)
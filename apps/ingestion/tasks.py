@@ -1,5 +1,6 @@
-from celery import shared_task
+from celery import shared_task, chain, chord
 from apps.ingestion.loaders import ExcelLoader
+from apps.ingestion.parallel import ID_COLUMNS, load_shard
 import logging
 
 logger = logging.getLogger(__name__)
@@ -31,3 +32,58 @@ def ingest_loan_data(file_path):
     except Exception as e:
         logger.error(f"Fatal error in loan ingestion: {e}")
         return f"Failed: {e}"
+
+@shared_task
+def ingest_shard(kind, shard_path, start_row, end_row, seen_ids=()):
+    """
+    Ingest one shard file ('customers' or 'loans') and return its summary dict.
+    """
+    try:
+        return load_shard(kind, shard_path, start_row, seen_ids)
+    except Exception as e:
+        logger.error(f"Fatal error in {kind} shard {start_row}-{end_row}: {e}")
+        total = end_row - start_row
+        return {'total': total, 'success': 0, 'failed': total, 'errors': [f"Rows {start_row}-{end_row}: {e}"]}
+
+@shared_task
+def merge_shard_summaries(summaries, kind, report=None, shard_paths=None):
+    """
+    Chord callback: fold the shard summaries of one file into the running
+    report and delete its shard files.
+    """
+    ExcelLoader.remove_shards(shard_paths)
+    report = dict(report or {})
+    report[kind] = ExcelLoader.merge_summaries(summaries)
+    logger.info(f"Parallel {kind} ingestion complete. {report[kind]}")
+    return report
+
+def build_shard_chord(kind, file_path, shard_size=None, report=None):
+    shards = ExcelLoader.plan_shards(file_path, shard_size, ID_COLUMNS[kind])
+    return chord(
+        [
+            ingest_shard.s(kind, shard_path, start_row, end_row, seen_ids)
+            for shard_path, start_row, end_row, seen_ids in shards
+        ],
+        merge_shard_summaries.s(kind, report, [shard[0] for shard in shards])
+    )
+
+@shared_task(bind=True)
+def ingest_loans_after_customers(self, report, loan_file, shard_size=None):
+    """
+    Second stage of ingest_data_parallel: fan out the loan shards once every
+    customer shard has finished, so load_loans sees all customers.
+    """
+    return self.replace(build_shard_chord('loans', loan_file, shard_size, report))
+
+@shared_task(bind=True)
+def ingest_data_parallel(self, customer_file, loan_file, shard_size=None):
+    """
+    Ingest both files across workers: customer shards run as one chord, then
+    loan shards as another. The final result is
+    {'customers': summary, 'loans': summary}.
+    """
+    workflow = chain(
+        build_shard_chord('customers', customer_file, shard_size),
+        ingest_loans_after_customers.s(loan_file, shard_size)
+    )
+    return self.replace(workflow)
@@ -0,0 +1,310 @@
+from django.test import TestCase, override_settings
+from datetime import date
+from decimal import Decimal
+import os
+import shutil
+import tempfile
+import pandas as pd
+from unittest import mock
+from apps.customers.models import Customer
+from apps.loans.models import Loan, CustomerLoanSummary
+from apps.loans.services.loan_summary import LoanSummaryService
+from apps.loans.services.score_events import ScoreEventService
+from apps.ingestion.loaders import ExcelLoader
+from apps.ingestion.validation import ChunkValidator
+
+CUSTOMER_COLUMNS = ['Customer ID', 'First Name', 'Last Name', 'Age', 'Phone Number', 'Monthly Salary', 'Approved Limit']
+LOAN_COLUMNS = [
+    'Customer ID', 'Loan ID', 'Loan Amount', 'Tenure', 'Interest Rate',
+    'Monthly payment', 'EMIs paid on Time', 'Date of Approval', 'End Date'
+]
+
+def customer_rows(count):
+    return [
+        [i, f"First{i}", f"Last{i}", 30, 9000000000 + i, 50000, 1800000]
+        for i in range(1, count + 1)
+    ]
+
+def loan_rows(count, customer_count):
+    return [
+        [(i % customer_count) + 1, i, 100000, 12, 10.5, 8792, 12, date(2020, 1, 15), date(2021, 1, 15)]
+        for i in range(1, count + 1)
+    ]
+
+class StreamingLoaderTests(TestCase):
+    """
+    Validates the streaming (chunked) Excel/CSV ingestion path.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def write_file(self, name, rows, columns):
+        path = os.path.join(self.tmp_dir, name)
+        df = pd.DataFrame(rows, columns=columns)
+        if name.endswith('.csv'):
+            df.to_csv(path, index=False)
+        else:
+            df.to_excel(path, index=False)
+        return path
+
+    def test_chunks_are_bounded_by_batch_size(self):
+        path = self.write_file('customers.xlsx', customer_rows(25), CUSTOMER_COLUMNS)
+
+        chunks = list(ExcelLoader.iter_chunks(path, chunk_size=10))
+
+        self.assertEqual([len(chunk) for _, chunk in chunks], [10, 10, 5])
+        self.assertEqual([start for start, _ in chunks], [0, 10, 20])
+        self.assertEqual(chunks[2][1]['Customer ID'].tolist(), [21, 22, 23, 24, 25])
+
+    def test_load_customers_and_loans_from_xlsx(self):
+        customer_path = self.write_file('customers.xlsx', customer_rows(5), CUSTOMER_COLUMNS)
+        loan_rows_with_orphan = loan_rows(8, 5) + [[999, 100, 50000, 6, 9, 8600, 6, date(2020, 1, 1), date(2020, 7, 1)]]
+        loan_path = self.write_file('loans.xlsx', loan_rows_with_orphan, LOAN_COLUMNS)
+
+        customers = ExcelLoader.load_customers(customer_path)
+        loans = ExcelLoader.load_loans(loan_path)
+
+        self.assertEqual(customers, {'total': 5, 'success': 5, 'failed': 0, 'errors': []})
+        self.assertEqual(loans['total'], 9)
+        self.assertEqual(loans['success'], 8)
+        self.assertEqual(loans['errors'], ["Row 8: Customer 999 does not exist"])
+        self.assertEqual(Customer.objects.get(customer_id=3).phone_number, '9000000003')
+        self.assertEqual(Loan.objects.get(loan_id=4).end_date, date(2021, 1, 15))
+        # Loaded customers get their loan summaries built
+        self.assertEqual(LoanSummaryService.verify(), [])
+        self.assertEqual(CustomerLoanSummary.objects.get(customer_id=2).loan_count, 2)
+
+    @override_settings(CREDIT_SCORE_EVENTS=True)
+    def test_loaders_publish_score_events(self):
+        customer_path = self.write_file('customers.csv', customer_rows(4), CUSTOMER_COLUMNS)
+        loan_path = self.write_file('loans.csv', loan_rows(3, 4), LOAN_COLUMNS)
+
+        with mock.patch.object(ScoreEventService, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                ExcelLoader.load_customers(customer_path)
+                ExcelLoader.load_loans(loan_path)
+
+        published = [sorted(call.args[0]) for call in publish.call_args_list]
+        self.assertEqual(published, [[1, 2, 3, 4], [2, 3, 4]])
+
+    def test_load_customers_from_csv_in_chunks(self):
+        path = self.write_file('customers.csv', customer_rows(30), CUSTOMER_COLUMNS)
+
+        original_batch_size = ExcelLoader.BATCH_SIZE
+        ExcelLoader.BATCH_SIZE = 7
+        try:
+            result = ExcelLoader.load_customers(path)
+        finally:
+            ExcelLoader.BATCH_SIZE = original_batch_size
+
+        self.assertEqual(result['total'], 30)
+        self.assertEqual(result['success'], 30)
+        self.assertEqual(Customer.objects.count(), 30)
+
+class ChunkValidationTests(TestCase):
+    """
+    Validates the column-wise validation stage in front of the writers.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def test_invalid_rows_are_masked_with_their_first_error(self):
+        rows = customer_rows(6)
+        rows[1][4] = None  # blank phone
+        rows[2][0] = 1  # repeats row 0
+        rows[3][5] = 'lots'
+        rows[4][3] = 'x'
+        rows[4][4] = None  # only the first failed check is reported
+        chunk = pd.DataFrame(rows, columns=CUSTOMER_COLUMNS)
+        seen = {6}
+
+        clean, errors = ChunkValidator.validate_customers(chunk, 10, seen)
+
+        self.assertEqual(clean['customer_id'], [1])
+        self.assertEqual(clean['phone_number'], ['9000000001'])
+        self.assertEqual(ChunkValidator.messages(errors), [
+            "Row 11: Missing Phone Number",
+            "Row 12: Duplicate Customer ID 1",
+            "Row 13: Invalid Monthly Salary",
+            "Row 14: Missing Phone Number",
+            "Row 15: Duplicate Customer ID 6",
+        ])
+        self.assertEqual(seen, {1, 2, 4, 5, 6})
+
+    def test_only_clean_loan_rows_are_written(self):
+        Customer.objects.bulk_create([
+            Customer(customer_id=i, first_name='A', last_name='B', phone_number=str(9100000000 + i),
+                     monthly_salary=50000, approved_limit=1800000, age=30)
+            for i in (1, 2)
+        ])
+        rows = loan_rows(6, 2)
+        rows[1][7] = 'not a date'
+        rows[3][1] = 1  # Loan ID seen in the first chunk
+        rows[4][0] = 7
+        path = os.path.join(self.tmp_dir, 'loans.csv')
+        pd.DataFrame(rows, columns=LOAN_COLUMNS).to_csv(path, index=False)
+
+        with mock.patch.object(ExcelLoader, 'BATCH_SIZE', 3):
+            result = ExcelLoader.load_loans(path)
+
+        self.assertEqual(result['errors'], [
+            "Row 1: Invalid Date of Approval or End Date",
+            "Row 3: Duplicate Loan ID 1",
+            "Row 4: Customer 7 does not exist",
+        ])
+        self.assertEqual((result['success'], result['failed']), (3, 3))
+        self.assertEqual(sorted(Loan.objects.values_list('loan_id', flat=True)), [1, 3, 6])
+
+    def test_money_is_handed_over_as_decimal(self):
+        rows = loan_rows(2, 1)
+        rows[0][2], rows[0][4], rows[0][5] = 12.35, 10.1, 8791.59
+        rows[1][2] = '100000.005'
+        chunk = pd.DataFrame(rows, columns=LOAN_COLUMNS)
+
+        clean, errors = ChunkValidator.validate_loans(chunk, 0, {1}, set())
+
+        self.assertTrue(errors.empty)
+        self.assertEqual(clean['loan_amount'], [Decimal('12.35'), Decimal('100000.00')])
+        self.assertEqual(clean['interest_rate'], [Decimal('10.10'), Decimal('10.50')])
+        self.assertEqual(clean['monthly_repayment'][0], Decimal('8791.59'))
+        self.assertTrue(all(isinstance(value, Decimal) for value in clean['monthly_repayment']))
+
+    def test_dates_in_mixed_formats_are_accepted(self):
+        rows = loan_rows(4, 1)
+        rows[0][7:9] = ['2020-01-15', '2021-01-15']
+        rows[1][7:9] = ['15/01/2020', '15/01/2021']
+        rows[2][7:9] = ['Jan 15, 2020', '2021-01-15 00:00:00']
+        rows[3][7] = 'not a date'
+        chunk = pd.DataFrame(rows, columns=LOAN_COLUMNS).astype({'Date of Approval': str, 'End Date': str})
+
+        clean, errors = ChunkValidator.validate_loans(chunk, 0, {1}, set())
+
+        self.assertEqual(ChunkValidator.messages(errors), ["Row 3: Invalid Date of Approval or End Date"])
+        self.assertEqual(clean['start_date'], [date(2020, 1, 15)] * 3)
+        self.assertEqual(clean['end_date'], [date(2021, 1, 15)] * 3)
+
+class IngestionBackendTests(TestCase):
+    """
+    Validates write backend selection and that COPY keeps the ORM's results.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def test_backend_selection(self):
+        from django.db import connection
+        from apps.ingestion.loaders import OrmBatchWriter, PostgresCopyWriter
+
+        self.assertIsInstance(ExcelLoader.get_writer(Customer, 'orm'), OrmBatchWriter)
+        expected = PostgresCopyWriter if connection.vendor == 'postgresql' else OrmBatchWriter
+        self.assertIsInstance(ExcelLoader.get_writer(Customer, 'copy'), expected)
+
+    def test_copy_backend_is_idempotent(self):
+        customer_path = os.path.join(self.tmp_dir, 'customers.csv')
+        loan_path = os.path.join(self.tmp_dir, 'loans.csv')
+        pd.DataFrame(customer_rows(4), columns=CUSTOMER_COLUMNS).to_csv(customer_path, index=False)
+        pd.DataFrame(loan_rows(6, 4), columns=LOAN_COLUMNS).to_csv(loan_path, index=False)
+
+        ExcelLoader.load_customers(customer_path, backend='copy')
+        ExcelLoader.load_loans(loan_path, backend='copy')
+        # Re-running must skip existing rows rather than fail or duplicate
+        ExcelLoader.load_customers(customer_path, backend='copy')
+        result = ExcelLoader.load_loans(loan_path, backend='copy')
+
+        self.assertEqual(result['failed'], 0)
+        self.assertEqual(Customer.objects.count(), 4)
+        self.assertEqual(Loan.objects.count(), 6)
+        loan = Loan.objects.get(loan_id=2)
+        self.assertEqual(loan.interest_rate, Decimal('10.50'))
+        self.assertEqual(loan.end_date, date(2021, 1, 15))
+
+class ShardedIngestionTests(TestCase):
+    """
+    Validates file sharding and summary merging used for parallel ingestion.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def test_shards_cover_every_row_once(self):
+        for name in ['customers.xlsx', 'customers.csv']:
+            path = os.path.join(self.tmp_dir, name)
+            df = pd.DataFrame(customer_rows(23), columns=CUSTOMER_COLUMNS)
+            df.to_csv(path, index=False) if name.endswith('.csv') else df.to_excel(path, index=False)
+
+            shards = ExcelLoader.plan_shards(path, shard_size=10)
+            self.assertEqual([(start_row, end_row) for _, start_row, end_row, _ in shards], [(0, 10), (10, 20), (20, 23)])
+
+            seen = []
+            for shard_path, start_row, end_row, _ in shards:
+                # Each shard file holds only its own rows, so parsing it costs the same for every shard
+                self.assertEqual(len(pd.read_csv(shard_path)), end_row - start_row)
+                for start, chunk in ExcelLoader.iter_chunks(shard_path, chunk_size=4, row_offset=start_row):
+                    # Row indexes stay global so shard errors point at the right row
+                    self.assertEqual(start, len(seen))
+                    seen.extend(chunk['Customer ID'].tolist())
+            self.assertEqual(seen, list(range(1, 24)), name)
+
+            ExcelLoader.remove_shards([shard[0] for shard in shards])
+            self.assertFalse(os.path.exists(os.path.dirname(shards[0][0])))
+
+    def test_csv_shards_keep_quoted_fields_and_skip_blank_lines(self):
+        path = os.path.join(self.tmp_dir, 'customers.csv')
+        rows = customer_rows(5)
+        rows[1][1] = 'Ann, "Jr"\nSecond line'
+        with open(path, 'w', newline='') as f:
+            f.write(pd.DataFrame(rows[:3], columns=CUSTOMER_COLUMNS).to_csv(index=False))
+            f.write('\n')
+            f.write(pd.DataFrame(rows[3:]).to_csv(index=False, header=False))
+
+        shards = ExcelLoader.plan_shards(path, shard_size=2)
+        self.addCleanup(ExcelLoader.remove_shards, [shard[0] for shard in shards])
+        sharded = pd.concat([
+            chunk for shard_path, start_row, _, _ in shards
+            for _, chunk in ExcelLoader.iter_chunks(shard_path, row_offset=start_row)
+        ], ignore_index=True)
+
+        self.assertEqual([(start_row, end_row) for _, start_row, end_row, _ in shards], [(0, 2), (2, 4), (4, 5)])
+        pd.testing.assert_frame_equal(sharded, pd.read_csv(path))
+
+    def test_merged_shard_summaries_match_serial_load(self):
+        path = os.path.join(self.tmp_dir, 'loans.csv')
+        customer_path = os.path.join(self.tmp_dir, 'customers.csv')
+        pd.DataFrame(customer_rows(3), columns=CUSTOMER_COLUMNS).to_csv(customer_path, index=False)
+        rows = loan_rows(12, 3)
+        rows[7][0] = 404  # unknown customer in the second shard
+        pd.DataFrame(rows, columns=LOAN_COLUMNS).to_csv(path, index=False)
+        ExcelLoader.load_customers(customer_path)
+
+        summaries = [
+            ExcelLoader.load_loans(shard_path, row_offset=start_row, seen_ids=seen_ids)
+            for shard_path, start_row, _, seen_ids in ExcelLoader.plan_shards(path, shard_size=5, id_column='Loan ID')
+        ]
+        report = ExcelLoader.merge_summaries(summaries)
+
+        self.assertEqual(report, {
+            'total': 12, 'success': 11, 'failed': 1,
+            'errors': ["Row 7: Customer 404 does not exist"]
+        })
+        self.assertEqual(Loan.objects.count(), 11)
+
+    def test_ids_repeated_across_shards_are_duplicates(self):
+        path = os.path.join(self.tmp_dir, 'customers.xlsx')
+        rows = customer_rows(12)
+        rows[7][0] = 2  # first seen in the first shard
+        pd.DataFrame(rows, columns=CUSTOMER_COLUMNS).to_excel(path, index=False)
+
+        shards = ExcelLoader.plan_shards(path, shard_size=5, id_column='Customer ID')
+        report = ExcelLoader.merge_summaries(
+            ExcelLoader.load_customers(shard_path, row_offset=start_row, seen_ids=seen_ids)
+            for shard_path, start_row, _, seen_ids in shards
+        )
+
+        self.assertEqual([seen_ids for _, _, _, seen_ids in shards], [[], [2], []])
+        self.assertEqual(report, {
+            'total': 12, 'success': 11, 'failed': 1,
+            'errors': ["Row 7: Duplicate Customer ID 2"]
+        })
+        self.assertEqual(Customer.objects.get(customer_id=2).first_name, 'First2')
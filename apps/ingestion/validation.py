@@ -0,0 +1,236 @@
+import numpy as np
+import pandas as pd
+from apps.customers.models import Customer
+from decimal import Decimal
+
+class ChunkValidator:
+    """
+    Vectorized validation stage between reading a chunk and writing it.
+
+    Every check runs over whole column arrays (numeric/date coercion once
+    per column, FK existence and ids seen in earlier chunks with isin,
+    repeats within the chunk with duplicated) and yields a boolean mask of
+    failing rows. The checks are folded, in priority order, into the
+    valid-row mask and a compact error frame (columns 'row' and 'error',
+    one line per rejected row, its first failed check), so only clean rows
+    reach the writer.
+
+    Masks and values are numpy arrays: at the loaders' chunk sizes the
+    per-call overhead of building pandas objects would outweigh the
+    vectorized work. validate_* return (clean, errors), where clean maps
+    the model field names to lists of the valid rows' values (money as
+    Decimal, not float).
+    """
+    CENTS = Decimal('0.01')
+    CUSTOMER_COLUMNS = ['Customer ID', 'First Name', 'Last Name', 'Phone Number', 'Monthly Salary', 'Approved Limit', 'Age']
+    LOAN_COLUMNS = [
+        'Customer ID', 'Loan ID', 'Loan Amount', 'Tenure', 'Interest Rate',
+        'Monthly payment', 'EMIs paid on Time', 'Date of Approval', 'End Date',
+    ]
+
+    @staticmethod
+    def require_columns(chunk, columns):
+        missing = [column for column in columns if column not in chunk]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    @staticmethod
+    def numbers(series):
+        """(values, invalid): the column as a float array, and where it is missing or not numeric."""
+        values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        return values, np.isnan(values)
+
+    @staticmethod
+    def integers(series, minimum=None):
+        """(values, invalid) for an integer column, optionally bounded below."""
+        values, invalid = ChunkValidator.numbers(series)
+        with np.errstate(invalid='ignore'):
+            invalid |= np.mod(values, 1) != 0
+            if minimum is not None:
+                invalid |= values < minimum
+        return values, invalid
+
+    @staticmethod
+    def dates(series):
+        """
+        (values, invalid) for a date column, parsed once: datetime64[D] values
+        and where they are NaT. Text is parsed as ISO 8601 in one fast pass;
+        only the values that fail it are re-parsed one by one
+        (format='mixed'), so rows written in another date style are not
+        rejected because the first row set the format.
+        """
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values = series.to_numpy(dtype='datetime64[D]')
+            return values, np.isnat(values)
+        values = pd.to_datetime(series, errors='coerce', format='ISO8601').to_numpy(dtype='datetime64[D]')
+        invalid = np.isnat(values)
+        if invalid.any():
+            retry = invalid & series.notna().to_numpy()
+            if retry.any():
+                values[retry] = pd.to_datetime(series[retry], errors='coerce', format='mixed').to_numpy(dtype='datetime64[D]')
+                invalid = np.isnat(values)
+        return values, invalid
+
+    @staticmethod
+    def decimals(values):
+        """
+        Money from a float array as Decimal rupees and paise. repr() is the
+        shortest string that reads back as the same float ('12.35', not
+        12.3499999999999996447...), so the value the file held is what gets
+        quantized.
+        """
+        return [Decimal(repr(value)).quantize(ChunkValidator.CENTS) for value in values.tolist()]
+
+    @staticmethod
+    def blank(series):
+        return (series.isna() | (series.astype(str).str.strip() == '')).to_numpy()
+
+    @staticmethod
+    def isin(values, ids):
+        """
+        values-in-ids mask for a large set of ids: only the chunk's distinct
+        values are looked up, instead of hashing the whole set per chunk.
+        """
+        present = [value for value in pd.unique(values).tolist() if value in ids]
+        return np.isin(values, present)
+
+    @staticmethod
+    def duplicated(values):
+        """Rows whose value already appeared earlier in the chunk."""
+        return pd.Index(values).duplicated(keep='first')
+
+    @staticmethod
+    def format_ids(values):
+        """Integer-valued numbers as strings for messages ('999', not '999.0')."""
+        return values.astype(np.int64).astype(str)
+
+    @staticmethod
+    def collect(start, length, checks):
+        """
+        Fold (invalid_mask, message) checks into the valid-row mask and the
+        error frame. A message is a string, or a function of the newly
+        failing rows' mask returning their messages; only a row's first
+        failed check is reported. Row numbers start at `start`.
+        """
+        failed = np.zeros(length, dtype=bool)
+        error = np.empty(length, dtype=object)
+        for invalid, message in checks:
+            new = invalid & ~failed
+            if new.any():
+                error[new] = message(new) if callable(message) else message
+                failed |= new
+        errors = pd.DataFrame({'row': np.flatnonzero(failed) + start, 'error': error[failed]})
+        return ~failed, errors
+
+    @staticmethod
+    def messages(errors):
+        """The error frame as 'Row N: ...' strings, as reported in loader summaries."""
+        return [f"Row {row}: {error}" for row, error in zip(errors['row'].tolist(), errors['error'].tolist())]
+
+    @staticmethod
+    def phone_numbers(series):
+        """
+        Phone numbers as strings. Numbers read as floats (a CSV column with
+        blanks) lose the '.0'; blanks become ''.
+        """
+        numeric = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        with np.errstate(invalid='ignore'):
+            integral = np.mod(numeric, 1) == 0
+        phones = series.astype(str).str.strip().to_numpy(dtype=object)
+        phones[integral] = ChunkValidator.format_ids(numeric[integral])
+        phones[series.isna().to_numpy()] = ''
+        return phones
+
+    @staticmethod
+    def validate_customers(chunk, start, seen_ids):
+        """
+        Customer rows: integer Customer ID not repeated within the file
+        (seen_ids carries the ids of earlier chunks and is updated), names
+        and a phone number present, non-negative integer salary, limit and
+        age, numeric Current Debt when the column is there.
+        """
+        ChunkValidator.require_columns(chunk, ChunkValidator.CUSTOMER_COLUMNS)
+        customer_ids, invalid_id = ChunkValidator.integers(chunk['Customer ID'])
+        salaries, invalid_salary = ChunkValidator.integers(chunk['Monthly Salary'], minimum=0)
+        limits, invalid_limit = ChunkValidator.integers(chunk['Approved Limit'], minimum=0)
+        ages, invalid_age = ChunkValidator.integers(chunk['Age'], minimum=0)
+        if 'Current Debt' in chunk:
+            debts, invalid_debt = ChunkValidator.numbers(chunk['Current Debt'])
+        else:
+            debts, invalid_debt = np.zeros(len(chunk)), np.zeros(len(chunk), dtype=bool)
+        phones = ChunkValidator.phone_numbers(chunk['Phone Number'])
+        phone_lengths = np.fromiter((len(phone) for phone in phones), dtype=np.int64, count=len(phones))
+        max_phone_length = Customer._meta.get_field('phone_number').max_length
+
+        duplicate = ~invalid_id & (
+            ChunkValidator.duplicated(customer_ids) | ChunkValidator.isin(customer_ids, seen_ids)
+        )
+        valid, errors = ChunkValidator.collect(start, len(chunk), [
+            (invalid_id, "Invalid Customer ID"),
+            (duplicate, lambda rows: [f"Duplicate Customer ID {value}" for value in ChunkValidator.format_ids(customer_ids[rows])]),
+            (ChunkValidator.blank(chunk['First Name']) | ChunkValidator.blank(chunk['Last Name']), "Missing First Name or Last Name"),
+            (phone_lengths == 0, "Missing Phone Number"),
+            (phone_lengths > max_phone_length, "Invalid Phone Number"),
+            (invalid_salary, "Invalid Monthly Salary"),
+            (invalid_limit, "Invalid Approved Limit"),
+            (invalid_age, "Invalid Age"),
+            (invalid_debt, "Invalid Current Debt"),
+        ])
+        seen_ids.update(customer_ids[~invalid_id].astype(np.int64).tolist())
+
+        clean = {
+            'customer_id': customer_ids[valid].astype(np.int64).tolist(),
+            'first_name': chunk['First Name'].to_numpy()[valid].astype(str).tolist(),
+            'last_name': chunk['Last Name'].to_numpy()[valid].astype(str).tolist(),
+            'phone_number': phones[valid].tolist(),
+            'monthly_salary': salaries[valid].astype(np.int64).tolist(),
+            'approved_limit': limits[valid].astype(np.int64).tolist(),
+            'current_debt': ChunkValidator.decimals(debts[valid]),
+            'age': ages[valid].astype(np.int64).tolist(),
+        }
+        return clean, errors
+
+    @staticmethod
+    def validate_loans(chunk, start, existing_customer_ids, seen_ids):
+        """
+        Loan rows: integer Loan ID not repeated within the file (seen_ids as
+        for customers), a Customer ID in existing_customer_ids, numeric
+        amount, rate and repayment, non-negative integer tenure and EMIs
+        paid, and both dates parseable.
+        """
+        ChunkValidator.require_columns(chunk, ChunkValidator.LOAN_COLUMNS)
+        customer_ids, invalid_customer = ChunkValidator.integers(chunk['Customer ID'])
+        loan_ids, invalid_loan = ChunkValidator.integers(chunk['Loan ID'])
+        amounts, invalid_amount = ChunkValidator.numbers(chunk['Loan Amount'])
+        rates, invalid_rate = ChunkValidator.numbers(chunk['Interest Rate'])
+        repayments, invalid_repayment = ChunkValidator.numbers(chunk['Monthly payment'])
+        tenures, invalid_tenure = ChunkValidator.integers(chunk['Tenure'], minimum=0)
+        paid_on_time, invalid_paid = ChunkValidator.integers(chunk['EMIs paid on Time'], minimum=0)
+        start_dates, invalid_start = ChunkValidator.dates(chunk['Date of Approval'])
+        end_dates, invalid_end = ChunkValidator.dates(chunk['End Date'])
+
+        duplicate = ~invalid_loan & (ChunkValidator.duplicated(loan_ids) | ChunkValidator.isin(loan_ids, seen_ids))
+        unknown_customer = ~invalid_customer & ~ChunkValidator.isin(customer_ids, existing_customer_ids)
+        valid, errors = ChunkValidator.collect(start, len(chunk), [
+            (invalid_customer, "Invalid Customer ID"),
+            (invalid_loan, "Invalid Loan ID"),
+            (duplicate, lambda rows: [f"Duplicate Loan ID {value}" for value in ChunkValidator.format_ids(loan_ids[rows])]),
+            (unknown_customer, lambda rows: [f"Customer {value} does not exist" for value in ChunkValidator.format_ids(customer_ids[rows])]),
+            (invalid_amount | invalid_rate | invalid_repayment, "Invalid Loan Amount, Interest Rate or Monthly payment"),
+            (invalid_tenure | invalid_paid, "Invalid Tenure or EMIs paid on Time"),
+            (invalid_start | invalid_end, "Invalid Date of Approval or End Date"),
+        ])
+        seen_ids.update(loan_ids[~invalid_loan].astype(np.int64).tolist())
+
+        clean = {
+            'loan_id': loan_ids[valid].astype(np.int64).tolist(),
+            'customer_id': customer_ids[valid].astype(np.int64).tolist(),
+            'loan_amount': ChunkValidator.decimals(amounts[valid]),
+            'tenure': tenures[valid].astype(np.int64).tolist(),
+            'interest_rate': ChunkValidator.decimals(rates[valid]),
+            'monthly_repayment': ChunkValidator.decimals(repayments[valid]),
+            'emis_paid_on_time': paid_on_time[valid].astype(np.int64).tolist(),
+            'start_date': start_dates[valid].tolist(),
+            'end_date': end_dates[valid].tolist(),
+        }
+        return clean, errors
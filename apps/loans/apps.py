@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+class LoansConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.loans'
+
+    def ready(self):
+        # Connect the score change-event hooks
+        from apps.loans import signals
@@ -0,0 +1,170 @@
+"""
+Async counterparts of the eligibility and read endpoints for the ASGI
+deployment (config/asgi.py routes them through config/asgi_urls.py).
+
+DRF's APIView is sync-only, so these are plain Django async views that reuse
+the DRF serializers for validation/representation and the configured DRF
+JSON renderer/parser so responses carry the same JSON as the WSGI views.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from apps.loans.serializers import CheckEligibilitySerializer, LoanDetailSerializer, CustomerLoanListSerializer
+from apps.loans.services.loan_service import LoanService
+from apps.loans.services.response_cache import LoanResponseCache
+from apps.loans.models import Loan
+from apps.loans.pagination import LoanCursorPagination
+from apps.customers.models import Customer
+import functools
+import io
+
+class AsyncAPIView(View):
+    # The JSON renderer/parser from REST_FRAMEWORK (listed first)
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    parser = api_settings.DEFAULT_PARSER_CLASSES[0]()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Same as APIView: token/session-less JSON API, no CSRF
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def render(self, data, status=status.HTTP_200_OK):
+        return HttpResponse(self.renderer.render(data), status=status, content_type='application/json')
+
+    async def conditional_get(self, request, version_query, respond):
+        """
+        Async counterpart of views.ConditionalLoanReadMixin: validators from
+        the customer's loan version, 304 when current, then the optional
+        rendered-response cache before awaiting respond().
+        """
+        version = await LoanResponseCache.aresolve_version(version_query)
+        if version is None:
+            return await respond()
+        customer_id, version, last_modified = version
+        etag = LoanResponseCache.etag(version, request, self.renderer.media_type)
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+
+        # The ETag alone decides: Last-Modified has one-second granularity, so
+        # If-Modified-Since could answer 304 for a change made in the same second
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content = await LoanResponseCache.aget(customer_id, etag)
+            if content is not None:
+                response = HttpResponse(content, content_type='application/json')
+            else:
+                response = await respond()
+                if response.status_code == 200:
+                    await LoanResponseCache.aset(customer_id, etag, response.content)
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def parse_json(self, request):
+        """Request body as JSON; returns (data, error_response)."""
+        try:
+            return self.parser.parse(io.BytesIO(request.body or b'{}')), None
+        except ParseError as e:
+            return None, self.render({'detail': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+class AsyncCheckEligibilityView(AsyncAPIView):
+    async def post(self, request):
+        data, error = self.parse_json(request)
+        if error:
+            return error
+        serializer = CheckEligibilitySerializer(data=data)
+        if serializer.is_valid():
+            data = serializer.validated_data
+            result = await LoanService.acheck_eligibility(
+                customer_id=data['customer_id'],
+                loan_amount=data['loan_amount'],
+                interest_rate=data['interest_rate'],
+                tenure=data['tenure']
+            )
+            return self.render(result, status=status.HTTP_200_OK)
+        return self.render(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class AsyncViewLoanDetailView(AsyncAPIView):
+    async def get(self, request, loan_id):
+        return await self.conditional_get(
+            request, LoanResponseCache.loan_version_query(loan_id), functools.partial(self.loan_response, loan_id)
+        )
+
+    async def loan_response(self, loan_id):
+        row = await Loan.objects.filter(loan_id=loan_id).values_list(*LoanDetailSerializer.ROW_FIELDS, named=True).afirst()
+        if row is None:
+            return self.render({'detail': 'No Loan matches the given query.'}, status=status.HTTP_404_NOT_FOUND)
+        return self.render(LoanDetailSerializer.represent_row(row))
+
+class AsyncViewLoansByCustomerView(AsyncAPIView):
+    """
+    Paginated like the sync ListAPIView (page numbers, the pagination class's
+    page size). Cursor requests go through LoanCursorPagination in a worker
+    thread, so both deployments hand out the same cursors.
+    """
+    pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+    cursor_pagination_class = LoanCursorPagination
+
+    async def get(self, request, customer_id):
+        return await self.conditional_get(
+            request, LoanResponseCache.customer_version_query(customer_id),
+            functools.partial(self.loans_response, request, customer_id)
+        )
+
+    async def loans_response(self, request, customer_id):
+        if self.cursor_pagination_class.cursor_query_param in request.GET:
+            data, status_code = await sync_to_async(self.cursor_page)(request, customer_id)
+            return self.render(data, status=status_code)
+
+        page_size = self.pagination_class.page_size
+        page_query_param = self.pagination_class.page_query_param
+        queryset = CustomerLoanListSerializer.rows(Loan.objects.filter(customer_id=customer_id).order_by('loan_id'))
+
+        count = await queryset.acount()
+        if not count and not await Customer.objects.filter(customer_id=customer_id).aexists():
+            return self.render({'detail': 'No Customer matches the given query.'}, status=status.HTTP_404_NOT_FOUND)
+        page_count = max(1, -(-count // page_size))
+        try:
+            page_number = int(request.GET.get(page_query_param, 1))
+        except ValueError:
+            page_number = 0
+        if not 1 <= page_number <= page_count:
+            return self.render({'detail': 'Invalid page.'}, status=status.HTTP_404_NOT_FOUND)
+
+        offset = (page_number - 1) * page_size
+        loans = [loan async for loan in queryset[offset:offset + page_size]]
+
+        url = request.build_absolute_uri()
+        next_link = replace_query_param(url, page_query_param, page_number + 1) if page_number < page_count else None
+        if page_number == 1:
+            previous_link = None
+        elif page_number == 2:
+            previous_link = remove_query_param(url, page_query_param)
+        else:
+            previous_link = replace_query_param(url, page_query_param, page_number - 1)
+
+        return self.render({
+            'count': count,
+            'next': next_link,
+            'previous': previous_link,
+            'results': CustomerLoanListSerializer.represent_rows(loans),
+        })
+
+    def cursor_page(self, request, customer_id):
+        paginator = self.cursor_pagination_class()
+        queryset = CustomerLoanListSerializer.rows(Loan.objects.filter(customer_id=customer_id))
+        try:
+            page = paginator.paginate_queryset(queryset, Request(request))
+        except NotFound as e:
+            return {'detail': e.detail}, status.HTTP_404_NOT_FOUND
+        if not page and not Customer.objects.filter(customer_id=customer_id).exists():
+            return {'detail': 'No Customer matches the given query.'}, status.HTTP_404_NOT_FOUND
+        return paginator.get_paginated_response(CustomerLoanListSerializer.represent_rows(page)).data, status.HTTP_200_OK
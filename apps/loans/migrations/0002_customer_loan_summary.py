@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0001_initial'),
+        ('loans', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerLoanSummary',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='loan_summary', serialize=False, to='customers.customer')),
+                ('loan_count', models.PositiveIntegerField(default=0)),
+                ('total_tenure', models.PositiveIntegerField(default=0)),
+                ('emis_paid_on_time', models.PositiveIntegerField(default=0)),
+                ('active_principal', models.DecimalField(decimal_places=2, default=0, help_text='Loan amount of APPROVED/PENDING loans', max_digits=14)),
+                ('approved_volume', models.DecimalField(decimal_places=2, default=0, help_text='Loan amount of APPROVED/PAID loans', max_digits=14)),
+                ('active_emi_sum', models.DecimalField(decimal_places=2, default=0, help_text='EMIs of APPROVED/PENDING loans not yet ended', max_digits=14)),
+                ('active_emi_valid_until', models.DateField(blank=True, help_text='Earliest end_date counted in active_emi_sum', null=True)),
+                ('loans_by_year', models.JSONField(default=dict, help_text='Loan count per start_date year')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0002_customer_loan_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['customer', 'status', 'end_date'], include=('monthly_repayment', 'loan_amount'), name='loan_cust_status_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['customer', 'start_date'], name='loan_cust_start_idx'),
+        ),
+    ]
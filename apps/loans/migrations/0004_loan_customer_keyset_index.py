@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0003_loan_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['customer', 'loan_id'], name='loan_cust_loan_idx'),
+        ),
+    ]
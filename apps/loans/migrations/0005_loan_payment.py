@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0004_loan_customer_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoanPayment',
+            fields=[
+                ('payment_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('installment', models.PositiveIntegerField(help_text='EMI number this payment settles (1..tenure)')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('paid_on', models.DateField()),
+                ('on_time', models.BooleanField(help_text="Paid on or before the installment's due date")),
+                ('reference', models.CharField(blank=True, help_text='Bank transaction reference; repeats are skipped', max_length=64, null=True, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('loan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='loans.loan')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='loanpayment',
+            constraint=models.UniqueConstraint(fields=('loan', 'installment'), name='payment_loan_installment_uniq'),
+        ),
+    ]
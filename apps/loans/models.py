@@ -21,5 +21,64 @@ class Loan(models.Model):
     end_date = models.DateField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
 
+    class Meta:
+        indexes = [
+            # Per-customer status filters and current EMIs (status + end_date >= today).
+            # INCLUDE lets Postgres answer the EMI/principal sums from the index alone.
+            models.Index(
+                fields=['customer', 'status', 'end_date'],
+                include=['monthly_repayment', 'loan_amount'],
+                name='loan_cust_status_end_idx',
+            ),
+            # Current-year activity: loans per customer by start_date
+            models.Index(fields=['customer', 'start_date'], name='loan_cust_start_idx'),
+            # Keyset pagination of a customer's loans (view-loans?cursor=)
+            models.Index(fields=['customer', 'loan_id'], name='loan_cust_loan_idx'),
+        ]
+
     def __str__(self):
         return f"Loan {self.loan_id} - {self.customer}"
+
+class LoanPayment(models.Model):
+    """
+    Repayment ledger: one row per EMI paid against a loan. Written by
+    PaymentService, which keeps Loan.emis_paid_on_time and the PAID status
+    transition in step with it.
+    """
+    payment_id = models.BigAutoField(primary_key=True)
+    loan = models.ForeignKey(Loan, on_delete=models.CASCADE, related_name='payments')
+    installment = models.PositiveIntegerField(help_text="EMI number this payment settles (1..tenure)")
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    paid_on = models.DateField()
+    on_time = models.BooleanField(help_text="Paid on or before the installment's due date")
+    reference = models.CharField(max_length=64, unique=True, null=True, blank=True, help_text="Bank transaction reference; repeats are skipped")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['loan', 'installment'], name='payment_loan_installment_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Payment {self.payment_id} - Loan {self.loan_id} EMI {self.installment}"
+
+class CustomerLoanSummary(models.Model):
+    """
+    Per-customer projection of the Loan table so score and eligibility
+    checks read one row instead of aggregating the full loan history.
+    Kept up to date by LoanService.create_loan and the ingestion loaders
+    (see LoanSummaryService).
+    """
+    customer = models.OneToOneField(Customer, on_delete=models.CASCADE, primary_key=True, related_name='loan_summary')
+    loan_count = models.PositiveIntegerField(default=0)
+    total_tenure = models.PositiveIntegerField(default=0)
+    emis_paid_on_time = models.PositiveIntegerField(default=0)
+    active_principal = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Loan amount of APPROVED/PENDING loans")
+    approved_volume = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Loan amount of APPROVED/PAID loans")
+    active_emi_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="EMIs of APPROVED/PENDING loans not yet ended")
+    active_emi_valid_until = models.DateField(null=True, blank=True, help_text="Earliest end_date counted in active_emi_sum")
+    loans_by_year = models.JSONField(default=dict, help_text="Loan count per start_date year")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Loan summary - {self.customer_id}"
@@ -0,0 +1,40 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+class LoanCursorPagination(CursorPagination):
+    """
+    Keyset pagination over a customer's loans: each page is
+    `loan_id > <last id seen> ORDER BY loan_id LIMIT page_size + 1`, served
+    by the (customer_id, loan_id) index, so page 500 costs the same as page 1
+    (no OFFSET scan).
+
+    Selected by passing `cursor` (empty for the first page); the next and
+    previous links carry the opaque cursor. The response has the same shape
+    as the page-number one; `count=false` skips the COUNT(*) and returns a
+    null count.
+    """
+    ordering = 'loan_id'
+    count_query_param = 'count'
+
+    def include_count(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() not in ('0', 'false', 'no')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = queryset.count() if self.include_count(request) else None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties'] = {
+            'count': {'type': 'integer', 'nullable': True, 'example': 123},
+            **response_schema['properties'],
+        }
+        return response_schema
@@ -0,0 +1,51 @@
+"""
+Line-oriented renderers for streamed loan data (the amortization schedule).
+
+Each renderer serves two purposes: stream(rows) yields the encoded lines of
+a StreamingHttpResponse, and render() handles the regular DRF responses of
+the same view (errors such as a 404), so content negotiation picks one
+format for both.
+"""
+from rest_framework.renderers import BaseRenderer
+from config.renderers import ORJSONRenderer
+import csv
+import io
+
+class NDJSONRenderer(BaseRenderer):
+    """One JSON object per line."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+    json_renderer = ORJSONRenderer()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b''.join(self.stream(data if isinstance(data, list) else [data]))
+
+    def stream(self, rows):
+        for row in rows:
+            yield self.json_renderer.render(row) + b'\n'
+
+class CSVRenderer(BaseRenderer):
+    """A header line from the first row's keys, then one line per row."""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b''.join(self.stream(data if isinstance(data, list) else [data]))
+
+    def stream(self, rows):
+        buffer = io.StringIO()
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+            yield buffer.getvalue().encode(self.charset)
+            buffer.seek(0)
+            buffer.truncate()
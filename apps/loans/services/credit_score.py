@@ -1,37 +1,453 @@
-from django.db.models import Sum
+from django.conf import settings
+from django.db.models import Sum, Count, Max, Q
+from apps.customers.models import Customer
 from apps.loans.models import Loan
-from datetime import date
-import redis
-import os
-
-# Redis connection
-redis_client = redis.Redis(
-    host=os.environ.get('REDIS_HOST', 'localhost'),
-    port=int(os.environ.get('REDIS_PORT', 6379)),
-    db=int(os.environ.get('REDIS_DB', 1)),
-    decode_responses=True
-)
+from apps.loans.services.loan_summary import LoanSummaryService
+from apps.loans.services.score_cache import CacheStats, LocalScoreCache
+from asgiref.sync import sync_to_async
+from config.instrumentation import instrumented
+from config.redis_client import get_async_redis_client, get_redis_client
+from datetime import date, datetime
+from decimal import Decimal
+import asyncio
+import json
+import random
+import time
+import uuid
+
+# Shared pooled client with timeouts, retries and a circuit breaker
+redis_client = get_redis_client()
+
+# Optional per-process tier in front of Redis, and hit/miss counters for both tiers
+local_cache = LocalScoreCache(redis_client)
+cache_stats = CacheStats()
 
 class CreditScoreService:
     CACHE_TTL = 86400  # 24 hours in seconds
+    CACHE_TTL_JITTER = 3600  # Spread warmed keys so they don't all expire together
+    EVENTS_CACHE_TTL = 7 * 86400  # Safety net with change events on, for changes whose event was lost
     CACHE_KEY_PREFIX = 'credit_score:'
+    BREAKDOWN_KEY_PREFIX = 'credit_score_breakdown:'
+    # Weighted components, in the order their points are summed
+    COMPONENT_WEIGHTS = {'repayment': 35, 'count': 20, 'activity': 20, 'volume': 25}
+    BREAKDOWN_FIELDS = ('repayment', 'count', 'activity', 'volume', 'debt_overload')
+    WARM_CHECKPOINT_KEY_PREFIX = 'credit_score_warm:'
+    WARM_CHUNK_SIZE = 5000
+    LOCK_KEY_PREFIX = 'credit_score_lock:'
+    LOCK_LEASE_MS = 5000  # Lock expires on its own if the holder dies mid-computation
+    LOCK_WAIT = 2.0  # Seconds a caller waits for another's computation before doing its own
+    LOCK_POLL_INTERVAL = 0.02
     
     @staticmethod
     def get_cache_key(customer_id):
         """Generate cache key for customer credit score."""
         return f"{CreditScoreService.CACHE_KEY_PREFIX}{customer_id}"
     
+    @staticmethod
+    def cache_ttl(jitter=0):
+        """
+        Expiry of cached scores and breakdowns: CACHE_TTL, or EVENTS_CACHE_TTL
+        when change events keep them current (settings.CREDIT_SCORE_EVENTS,
+        see ScoreEventService), plus jitter seconds. Either way a score
+        expires by the end of the year, when its activity component (loans
+        this year) goes stale.
+        """
+        if getattr(settings, 'CREDIT_SCORE_EVENTS', False):
+            ttl = CreditScoreService.EVENTS_CACHE_TTL
+        else:
+            ttl = CreditScoreService.CACHE_TTL
+        ttl += jitter
+        now = datetime.now()
+        year_end = datetime(now.year + 1, 1, 1)
+        return max(1, min(ttl, int((year_end - now).total_seconds())))
+
+    @staticmethod
+    def get_breakdown_key(customer_id):
+        """Key of the Redis hash holding the customer's score components (one field each)."""
+        return f"{CreditScoreService.BREAKDOWN_KEY_PREFIX}{customer_id}"
+
     @staticmethod
     def invalidate_cache(customer_id):
-        """Invalidate credit score cache for a customer (called after new loan creation)."""
+        """Invalidate the cached score and breakdown of a customer (e.g. when loans change in bulk)."""
         cache_key = CreditScoreService.get_cache_key(customer_id)
         try:
-            redis_client.delete(cache_key)
+            redis_client.delete(cache_key, CreditScoreService.get_breakdown_key(customer_id))
         except Exception as e:
             # If Redis is unavailable, silently continue
             pass
-    
+        try:
+            # Evicts here and broadcasts to the local tier of every other process
+            local_cache.invalidate(cache_key)
+        except Exception as e:
+            # Publishing failed; listeners that lost Redis too drop their local tier
+            pass
+
+    @staticmethod
+    def get_lock_key(customer_id):
+        """Key of the single-flight lock guarding a customer's score recomputation."""
+        return f"{CreditScoreService.LOCK_KEY_PREFIX}{customer_id}"
+
+    @staticmethod
+    def acquire_recompute_lock(customer_id):
+        """
+        Try to become the one caller that recomputes this customer's score.
+        Returns (acquired, token); when Redis is unavailable the caller
+        proceeds unlocked with (True, None).
+        """
+        token = uuid.uuid4().hex
+        try:
+            acquired = redis_client.set(
+                CreditScoreService.get_lock_key(customer_id), token,
+                nx=True, px=CreditScoreService.LOCK_LEASE_MS
+            )
+        except Exception as e:
+            return True, None
+        return bool(acquired), token
+
+    @staticmethod
+    def release_recompute_lock(customer_id, token):
+        """Delete the lock only if it still holds our token (WATCH-guarded compare-and-delete)."""
+        lock_key = CreditScoreService.get_lock_key(customer_id)
+        try:
+            with redis_client.pipeline() as pipe:
+                pipe.watch(lock_key)
+                if pipe.get(lock_key) == token:
+                    pipe.multi()
+                    pipe.delete(lock_key)
+                    pipe.execute()
+                else:
+                    pipe.unwatch()
+        except Exception as e:
+            # Lease expired and was taken over, or Redis is unavailable; it expires on its own
+            pass
+
+    @staticmethod
+    def wait_for_score(customer_id):
+        """
+        Wait up to LOCK_WAIT for the lock holder to cache the score. Returns
+        the score, or None if the holder finished without caching one (e.g.
+        debt overload) or the wait timed out.
+        """
+        cache_key = CreditScoreService.get_cache_key(customer_id)
+        lock_key = CreditScoreService.get_lock_key(customer_id)
+        deadline = time.monotonic() + CreditScoreService.LOCK_WAIT
+        try:
+            while time.monotonic() < deadline:
+                time.sleep(CreditScoreService.LOCK_POLL_INTERVAL)
+                cached_score, locked = redis_client.pipeline(transaction=False).get(cache_key).exists(lock_key).execute()
+                if cached_score is not None:
+                    return int(cached_score)
+                if not locked:
+                    return None
+        except Exception as e:
+            pass
+        return None
+
+    @staticmethod
+    async def aacquire_recompute_lock(customer_id):
+        """acquire_recompute_lock on the event loop's client."""
+        token = uuid.uuid4().hex
+        try:
+            acquired = await get_async_redis_client().set(
+                CreditScoreService.get_lock_key(customer_id), token,
+                nx=True, px=CreditScoreService.LOCK_LEASE_MS
+            )
+        except Exception as e:
+            return True, None
+        return bool(acquired), token
+
+    @staticmethod
+    async def await_score(customer_id):
+        """wait_for_score for async callers: polls with asyncio.sleep, so the wait holds no thread."""
+        cache_key = CreditScoreService.get_cache_key(customer_id)
+        lock_key = CreditScoreService.get_lock_key(customer_id)
+        deadline = time.monotonic() + CreditScoreService.LOCK_WAIT
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(CreditScoreService.LOCK_POLL_INTERVAL)
+                cached_score, locked = await get_async_redis_client().pipeline(transaction=False).get(cache_key).exists(lock_key).execute()
+                if cached_score is not None:
+                    return int(cached_score)
+                if not locked:
+                    return None
+        except Exception as e:
+            pass
+        return None
+
+    @staticmethod
+    def get_cache_stats():
+        """Hit/miss counters of this process, per tier ('local_hits', 'redis_misses', ...)."""
+        return cache_stats.snapshot()
+
+    @staticmethod
+    def get_aggregate_expressions():
+        """
+        Conditional aggregates needed by the score, evaluated in a single pass
+        over the customer's loans. The approved limit is pulled through the
+        customer join so no separate Customer lookup is needed.
+        """
+        current_year = date.today().year
+        return {
+            'current_debt': Sum('loan_amount', filter=Q(status__in=['APPROVED', 'PENDING'])),
+            'emis_paid_on_time': Sum('emis_paid_on_time'),
+            'total_tenure': Sum('tenure'),
+            'loan_count': Count('loan_id'),
+            'loans_this_year': Count('loan_id', filter=Q(start_date__year=current_year)),
+            'approved_volume': Sum('loan_amount', filter=Q(status__in=['APPROVED', 'PAID'])),
+            'approved_limit': Max('customer__approved_limit'),
+        }
+
+    @staticmethod
+    def get_score_aggregates(customer_id):
+        """Fetch every score component for a customer with one query."""
+        return Loan.objects.filter(customer_id=customer_id).aggregate(
+            **CreditScoreService.get_aggregate_expressions()
+        )
+
+    @staticmethod
+    def get_bulk_score_aggregates(**loan_filters):
+        """
+        Fetch score components for many customers with one GROUP BY query,
+        e.g. get_bulk_score_aggregates(customer_id__in=ids).
+        Customers without loans are absent from the result.
+        """
+        rows = (
+            Loan.objects.filter(**loan_filters)
+            .values('customer_id')
+            .annotate(**CreditScoreService.get_aggregate_expressions())
+        )
+        return {row['customer_id']: row for row in rows}
+
+    @staticmethod
+    def is_over_limit(aggregates):
+        """v. Edge Case: sum of current loans exceeds the approved limit."""
+        if not aggregates.get('loan_count'):
+            return False
+        current_loans_sum = aggregates['current_debt'] or 0
+        return current_loans_sum > aggregates['approved_limit']
+
+    @staticmethod
+    def repayment_component(emis_paid_on_time, total_tenure):
+        """i. Past repayment behavior: share of expected EMIs paid on time (capped at 1) * 35."""
+        points = 0.0
+        if total_tenure > 0:
+            points = min(emis_paid_on_time / total_tenure, 1.0) * CreditScoreService.COMPONENT_WEIGHTS['repayment']
+        return {'emis_paid_on_time': emis_paid_on_time, 'total_tenure': total_tenure, 'points': points}
+
+    @staticmethod
+    def count_component(loan_count):
+        """ii. Number of past loans: (count / 10) * 20, max 20."""
+        points = min(loan_count / 10, 1.0) * CreditScoreService.COMPONENT_WEIGHTS['count'] if loan_count > 0 else 0.0
+        return {'loan_count': loan_count, 'points': points}
+
+    @staticmethod
+    def activity_component(loans_this_year, year):
+        """iii. Current year activity: (loans this year / 3) * 20, max 20."""
+        points = 0.0
+        if loans_this_year > 0:
+            points = min(loans_this_year / 3, 1.0) * CreditScoreService.COMPONENT_WEIGHTS['activity']
+        return {'year': year, 'loans_this_year': loans_this_year, 'points': points}
+
+    @staticmethod
+    def volume_component(approved_volume):
+        """iv. Approved volume: (volume / 10,00,000) * 25, max 25."""
+        approved_volume = Decimal(approved_volume or 0)
+        points = 0.0
+        if approved_volume > 0:
+            points = min(float(approved_volume) / 1000000, 1.0) * CreditScoreService.COMPONENT_WEIGHTS['volume']
+        return {'approved_volume': str(approved_volume), 'points': points}
+
+    @staticmethod
+    def debt_overload_component(current_debt, approved_limit, loan_count):
+        """v. Debt overload flag (see is_over_limit); a flagged customer scores 0."""
+        current_debt = Decimal(current_debt or 0)
+        over_limit = CreditScoreService.is_over_limit({
+            'loan_count': loan_count, 'current_debt': current_debt, 'approved_limit': approved_limit,
+        })
+        return {'current_debt': str(current_debt), 'approved_limit': approved_limit, 'over_limit': over_limit}
+
+    @staticmethod
+    def breakdown_from_aggregates(aggregates):
+        """The structured score breakdown (one dict per component, JSON-safe) for the given aggregates."""
+        loan_count = aggregates.get('loan_count') or 0
+        return {
+            'repayment': CreditScoreService.repayment_component(
+                aggregates.get('emis_paid_on_time') or 0, aggregates.get('total_tenure') or 0
+            ),
+            'count': CreditScoreService.count_component(loan_count),
+            'activity': CreditScoreService.activity_component(aggregates.get('loans_this_year') or 0, date.today().year),
+            'volume': CreditScoreService.volume_component(aggregates.get('approved_volume')),
+            'debt_overload': CreditScoreService.debt_overload_component(
+                aggregates.get('current_debt'), aggregates.get('approved_limit'), loan_count
+            ),
+        }
+
     @staticmethod
+    def score_from_breakdown(breakdown):
+        """Turn a breakdown into the weighted 0-100 score."""
+        if breakdown['debt_overload']['over_limit']:
+            return 0
+        score = 0
+        for component in CreditScoreService.COMPONENT_WEIGHTS:
+            score += breakdown[component]['points']
+        return round(min(score, 100))
+
+    @staticmethod
+    def score_from_aggregates(aggregates):
+        """Turn the aggregate components into the weighted 0-100 score."""
+        return CreditScoreService.score_from_breakdown(CreditScoreService.breakdown_from_aggregates(aggregates))
+
+    @staticmethod
+    def compute_breakdown(customer_id):
+        """Breakdown from the customer's summary row, or one aggregation over Loan without one."""
+        aggregates = LoanSummaryService.get_score_aggregates(customer_id)
+        if aggregates is None:
+            aggregates = CreditScoreService.get_score_aggregates(customer_id)
+        return CreditScoreService.breakdown_from_aggregates(aggregates)
+
+    @staticmethod
+    def parse_breakdown(fields):
+        """
+        A breakdown from its Redis hash fields, or None if any component is
+        missing or the activity component was computed in an earlier year.
+        """
+        if any(field not in fields for field in CreditScoreService.BREAKDOWN_FIELDS):
+            return None
+        breakdown = {field: json.loads(fields[field]) for field in CreditScoreService.BREAKDOWN_FIELDS}
+        if breakdown['activity']['year'] != date.today().year:
+            return None
+        return breakdown
+
+    @staticmethod
+    def get_cached_breakdown(customer_id):
+        """The cached breakdown, or None on a miss or when Redis is unavailable."""
+        try:
+            fields = redis_client.hgetall(CreditScoreService.get_breakdown_key(customer_id))
+        except Exception as e:
+            return None
+        return CreditScoreService.parse_breakdown(fields)
+
+    @staticmethod
+    def queue_breakdown(pipe, customer_id, breakdown, components):
+        """
+        Queue writes of the given breakdown components and of the score
+        derived from the whole breakdown. Debt-overload zeros are not cached,
+        so a flagged customer's score key is dropped instead.
+        """
+        breakdown_key = CreditScoreService.get_breakdown_key(customer_id)
+        cache_key = CreditScoreService.get_cache_key(customer_id)
+        ttl = CreditScoreService.cache_ttl()
+        if components:
+            pipe.hset(breakdown_key, mapping={component: json.dumps(breakdown[component]) for component in components})
+            pipe.expire(breakdown_key, ttl)
+        if breakdown['debt_overload']['over_limit']:
+            pipe.delete(cache_key)
+        else:
+            pipe.set(cache_key, CreditScoreService.score_from_breakdown(breakdown), ex=ttl)
+
+    @staticmethod
+    def cache_breakdown(customer_id, breakdown, components=BREAKDOWN_FIELDS):
+        """Write breakdown components (all by default, none for only the score) and the derived score."""
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            CreditScoreService.queue_breakdown(pipe, customer_id, breakdown, components)
+            pipe.execute()
+        except Exception as e:
+            # If Redis is unavailable, continue without caching
+            pass
+
+    @staticmethod
+    def get_score_breakdown(customer_id):
+        """The customer's score breakdown: cached, or computed and cached together with the score."""
+        breakdown = CreditScoreService.get_cached_breakdown(customer_id)
+        if breakdown is None:
+            breakdown = CreditScoreService.compute_breakdown(customer_id)
+            CreditScoreService.cache_breakdown(customer_id, breakdown)
+        return breakdown
+
+    @staticmethod
+    def fold_new_loan(breakdown, loan):
+        """
+        Update a breakdown in place with a newly created loan, mirroring
+        LoanSummaryService.apply_new_loan. Returns the components it changed;
+        activity is untouched by a loan that started in another year, volume
+        and current debt only by loans in the statuses they count.
+        """
+        loan_amount = Decimal(loan.loan_amount)
+        changed = ['repayment', 'count']
+        repayment = breakdown['repayment']
+        breakdown['repayment'] = CreditScoreService.repayment_component(
+            repayment['emis_paid_on_time'] + loan.emis_paid_on_time, repayment['total_tenure'] + loan.tenure
+        )
+        loan_count = breakdown['count']['loan_count'] + 1
+        breakdown['count'] = CreditScoreService.count_component(loan_count)
+
+        activity = breakdown['activity']
+        if loan.start_date.year == activity['year']:
+            breakdown['activity'] = CreditScoreService.activity_component(activity['loans_this_year'] + 1, activity['year'])
+            changed.append('activity')
+        if loan.status in ('APPROVED', 'PAID'):
+            breakdown['volume'] = CreditScoreService.volume_component(
+                Decimal(breakdown['volume']['approved_volume']) + loan_amount
+            )
+            changed.append('volume')
+
+        debt_overload = breakdown['debt_overload']
+        current_debt = Decimal(debt_overload['current_debt'])
+        if loan.status in ('APPROVED', 'PENDING'):
+            current_debt += loan_amount
+        breakdown['debt_overload'] = CreditScoreService.debt_overload_component(
+            current_debt, debt_overload['approved_limit'], loan_count
+        )
+        if breakdown['debt_overload'] != debt_overload:
+            changed.append('debt_overload')
+        return changed
+
+    @staticmethod
+    def apply_new_loan(loan, loan_count):
+        """
+        Fold a committed new loan into the cached breakdown instead of
+        dropping it: only the components the loan touches are rewritten and
+        the score is re-derived, with no database work. loan_count is the
+        customer's loan count including the loan. A cached breakdown that
+        is not exactly one loan behind (a reader already cached the new
+        state, or missed another change) and any WATCH conflict fall back to
+        invalidate_cache.
+        """
+        customer_id = loan.customer_id
+        breakdown_key = CreditScoreService.get_breakdown_key(customer_id)
+        applied = False
+        try:
+            with redis_client.pipeline() as pipe:
+                pipe.watch(breakdown_key)
+                breakdown = CreditScoreService.parse_breakdown(pipe.hgetall(breakdown_key))
+                if (
+                    breakdown is not None
+                    and breakdown['count']['loan_count'] == loan_count - 1
+                    and breakdown['debt_overload']['approved_limit'] is not None
+                ):
+                    changed = CreditScoreService.fold_new_loan(breakdown, loan)
+                    pipe.multi()
+                    CreditScoreService.queue_breakdown(pipe, customer_id, breakdown, changed)
+                    pipe.execute()
+                    applied = True
+                else:
+                    pipe.unwatch()
+        except Exception as e:
+            # Concurrent write (WatchError) or Redis unavailable
+            pass
+
+        if not applied:
+            CreditScoreService.invalidate_cache(customer_id)
+            return
+        try:
+            # The score changed: evict it here and from every other process's local tier
+            local_cache.invalidate(CreditScoreService.get_cache_key(customer_id))
+        except Exception as e:
+            pass
+
+    @staticmethod
+    @instrumented('credit-score')
     def calculate_credit_score(customer_id):
         """
         Calculate credit score based on:
@@ -41,69 +457,293 @@ class CreditScoreService:
         iv. Loan approved volume
         v. If sum of current loans > approved limit, credit score = 0
         
-        Result is cached for 24 hours to reduce database load.
+        Components are read from the customer's CustomerLoanSummary row,
+        falling back to a single conditional-aggregation query over Loan.
+        They are cached as a breakdown (see get_score_breakdown) and the
+        score is derived from it; both are cached for 24 hours to reduce
+        database load, and the score for a few seconds in-process when the
+        local tier is enabled.
+
+        On a miss only one caller per customer recomputes (a Redis lock with
+        a short lease); concurrent callers wait for its cached result.
         """
-        # Check cache first
+        # Check the local tier, then Redis
         cache_key = CreditScoreService.get_cache_key(customer_id)
+        generation = local_cache.generation()
+        cached_score = local_cache.get(cache_key)
+        if cached_score is not None:
+            cache_stats.record('local', hit=True)
+            return cached_score
+        if local_cache.enabled:
+            cache_stats.record('local', hit=False)
+
         try:
             cached_score = redis_client.get(cache_key)
+            cache_stats.record('redis', hit=cached_score is not None)
             if cached_score is not None:
+                local_cache.set(cache_key, int(cached_score), generation)
                 return int(cached_score)
         except Exception as e:
             # If Redis is unavailable, continue with calculation
             pass
-        
-        score = 0
-        customer_loans = Loan.objects.filter(customer_id=customer_id)
-        
-        # v. Check approved limit - Edge Case: Score 0 if debt > limit
-        if customer_loans.exists():
-            customer = customer_loans.first().customer
-            current_loans_sum = customer_loans.filter(status__in=['APPROVED', 'PENDING']).aggregate(Sum('loan_amount'))['loan_amount__sum'] or 0
-            if current_loans_sum > customer.approved_limit:
+
+        # Single-flight: let the lock holder compute while everyone else waits for it
+        acquired, token = CreditScoreService.acquire_recompute_lock(customer_id)
+        if not acquired:
+            cached_score = CreditScoreService.wait_for_score(customer_id)
+            if cached_score is not None:
+                local_cache.set(cache_key, cached_score, generation)
+                return cached_score
+        return CreditScoreService.recompute_score(customer_id, generation, acquired, token)
+
+    @staticmethod
+    def recompute_score(customer_id, generation, acquired, token):
+        """
+        The miss path of calculate_credit_score once the lock was taken (or
+        waited for in vain): derive the score, cache it, and release the lock
+        if we hold it.
+        """
+        cache_key = CreditScoreService.get_cache_key(customer_id)
+        try:
+            # Derive the score from the cached breakdown when there is one
+            breakdown = CreditScoreService.get_cached_breakdown(customer_id)
+            if breakdown is None:
+                breakdown = CreditScoreService.compute_breakdown(customer_id)
+                components = CreditScoreService.BREAKDOWN_FIELDS
+            else:
+                components = ()
+
+            # Cache the breakdown and the score for 24 hours
+            CreditScoreService.cache_breakdown(customer_id, breakdown, components)
+
+            # v. Check approved limit - Edge Case: Score 0 if debt > limit
+            if breakdown['debt_overload']['over_limit']:
                 return 0
 
-        # Component 1: Past Repayment Behavior (Weight: 35%)
-        # Score = (Total EMIs Paid on Time / Total EMIs Expected) * 35
-        # We need total tenure vs total paid across completed/active loans
-        total_emis_paid = customer_loans.aggregate(Sum('emis_paid_on_time'))['emis_paid_on_time__sum'] or 0
-        total_tenure = customer_loans.aggregate(Sum('tenure'))['tenure__sum'] or 0
-        
-        if total_tenure > 0:
-            repayment_ratio = total_emis_paid / total_tenure
-            # Cap ratio at 1.0 just in case data is weird
-            repayment_ratio = min(repayment_ratio, 1.0)
-            score += repayment_ratio * 35
-        
-        # Component 2: Number of Loans (Weight: 20%)
-        # Score = (Count / 10) * 20, max 20
-        total_loans_count = customer_loans.count()
-        if total_loans_count > 0:
-            count_factor = min(total_loans_count / 10, 1.0)
-            score += count_factor * 20
-            
-        # Component 3: Current Year Activity (Weight: 20%)
-        # Score = (Loans this year / 3) * 20, max 20
-        current_year = date.today().year
-        loans_this_year = customer_loans.filter(start_date__year=current_year).count()
-        if loans_this_year > 0:
-            activity_factor = min(loans_this_year / 3, 1.0)
-            score += activity_factor * 20
-            
-        # Component 4: Loan Approved Volume (Weight: 25%)
-        # Score = (Volume / 10,00,000) * 25, max 25
-        approved_volume = customer_loans.filter(status__in=['APPROVED', 'PAID']).aggregate(Sum('loan_amount'))['loan_amount__sum'] or 0
-        if approved_volume > 0:
-            volume_factor = min(float(approved_volume) / 1000000, 1.0)
-            score += volume_factor * 25
-        
-        final_score = round(min(score, 100))
-        
-        # Cache the score for 24 hours
+            final_score = CreditScoreService.score_from_breakdown(breakdown)
+            local_cache.set(cache_key, final_score, generation)
+
+            return final_score
+        finally:
+            if acquired and token:
+                CreditScoreService.release_recompute_lock(customer_id, token)
+
+    @staticmethod
+    @instrumented('credit-score')
+    async def acalculate_credit_score(customer_id):
+        """
+        calculate_credit_score for async views: the local tier, Redis and the
+        single-flight lock and wait all run on the event loop, so a caller
+        waiting for another's computation holds no thread. Only the
+        recomputation itself (database reads and caching) runs in the sync
+        thread.
+        """
+        cache_key = CreditScoreService.get_cache_key(customer_id)
+        generation = local_cache.generation()
+        cached_score = local_cache.get(cache_key)
+        if cached_score is not None:
+            cache_stats.record('local', hit=True)
+            return cached_score
+        if local_cache.enabled:
+            cache_stats.record('local', hit=False)
+
+        try:
+            cached_score = await get_async_redis_client().get(cache_key)
+            cache_stats.record('redis', hit=cached_score is not None)
+            if cached_score is not None:
+                local_cache.set(cache_key, int(cached_score), generation)
+                return int(cached_score)
+        except Exception as e:
+            # If Redis is unavailable, continue with calculation
+            pass
+
+        acquired, token = await CreditScoreService.aacquire_recompute_lock(customer_id)
+        if not acquired:
+            cached_score = await CreditScoreService.await_score(customer_id)
+            if cached_score is not None:
+                local_cache.set(cache_key, cached_score, generation)
+                return cached_score
+        return await sync_to_async(CreditScoreService.recompute_score)(customer_id, generation, acquired, token)
+
+    @staticmethod
+    @instrumented('credit-score')
+    def calculate_credit_scores(customer_ids):
+        """
+        Bulk variant of calculate_credit_score for batch callers.
+
+        Scores in the local tier are served first, the rest of the cached
+        scores are read with a single MGET; the misses are read from
+        their summary rows (one query), with one GROUP BY query over Loan for
+        customers without a summary, and written back in one pipeline.
+        Returns a dict of customer_id -> score.
+        """
+        customer_ids = list(dict.fromkeys(customer_ids))
+        scores = {}
+        generation = local_cache.generation()
+        for customer_id in customer_ids:
+            cached_score = local_cache.get(CreditScoreService.get_cache_key(customer_id))
+            if cached_score is not None:
+                scores[customer_id] = cached_score
+        if local_cache.enabled:
+            cache_stats.record('local', hit=True, count=len(scores))
+            cache_stats.record('local', hit=False, count=len(customer_ids) - len(scores))
+
+        remote_ids = [customer_id for customer_id in customer_ids if customer_id not in scores]
+        try:
+            if remote_ids:
+                cached_scores = redis_client.mget(
+                    [CreditScoreService.get_cache_key(customer_id) for customer_id in remote_ids]
+                )
+                for customer_id, cached_score in zip(remote_ids, cached_scores):
+                    if cached_score is not None:
+                        scores[customer_id] = int(cached_score)
+                        local_cache.set(CreditScoreService.get_cache_key(customer_id), int(cached_score), generation)
+                hits = sum(cached_score is not None for cached_score in cached_scores)
+                cache_stats.record('redis', hit=True, count=hits)
+                cache_stats.record('redis', hit=False, count=len(remote_ids) - hits)
+        except Exception as e:
+            # If Redis is unavailable, compute every score
+            pass
+
+        missing_ids = [customer_id for customer_id in customer_ids if customer_id not in scores]
+        if not missing_ids:
+            return scores
+
+        aggregates_by_customer = LoanSummaryService.get_bulk_score_aggregates(missing_ids)
+        unsummarized_ids = [customer_id for customer_id in missing_ids if customer_id not in aggregates_by_customer]
+        if unsummarized_ids:
+            aggregates_by_customer.update(
+                CreditScoreService.get_bulk_score_aggregates(customer_id__in=unsummarized_ids)
+            )
+        cacheable = {}
+        for customer_id in missing_ids:
+            aggregates = aggregates_by_customer.get(customer_id, {})
+            scores[customer_id] = CreditScoreService.score_from_aggregates(aggregates)
+            # Mirror calculate_credit_score: debt-overload zeros are not cached
+            if not CreditScoreService.is_over_limit(aggregates):
+                cacheable[customer_id] = scores[customer_id]
+
         try:
-            redis_client.setex(cache_key, CreditScoreService.CACHE_TTL, final_score)
+            ttl = CreditScoreService.cache_ttl()
+            pipe = redis_client.pipeline(transaction=False)
+            for customer_id, score in cacheable.items():
+                pipe.set(CreditScoreService.get_cache_key(customer_id), score, ex=ttl)
+            pipe.execute()
         except Exception as e:
             # If Redis is unavailable, continue without caching
             pass
-        
-        return final_score
+        for customer_id, score in cacheable.items():
+            local_cache.set(CreditScoreService.get_cache_key(customer_id), score, generation)
+
+        return scores
+
+    @staticmethod
+    def recompute_scores(customer_ids):
+        """
+        Recompute and overwrite the cached breakdown and score of the given
+        customers, whatever is cached now (used by the change-event
+        consumer). Reads their summary rows in one query, plus one GROUP BY
+        over Loan for customers without a summary; writes in one pipeline and
+        evicts the scores from every process's local tier.
+        Returns a dict of customer_id -> score.
+        """
+        customer_ids = list(dict.fromkeys(customer_ids))
+        if not customer_ids:
+            return {}
+        aggregates_by_customer = LoanSummaryService.get_bulk_score_aggregates(customer_ids)
+        unsummarized_ids = [customer_id for customer_id in customer_ids if customer_id not in aggregates_by_customer]
+        if unsummarized_ids:
+            aggregates_by_customer.update(
+                CreditScoreService.get_bulk_score_aggregates(customer_id__in=unsummarized_ids)
+            )
+
+        scores = {}
+        pipe = redis_client.pipeline(transaction=False)
+        for customer_id in customer_ids:
+            breakdown = CreditScoreService.breakdown_from_aggregates(aggregates_by_customer.get(customer_id, {}))
+            scores[customer_id] = CreditScoreService.score_from_breakdown(breakdown)
+            CreditScoreService.queue_breakdown(pipe, customer_id, breakdown, CreditScoreService.BREAKDOWN_FIELDS)
+        pipe.execute()
+        try:
+            local_cache.invalidate(*[CreditScoreService.get_cache_key(customer_id) for customer_id in customer_ids])
+        except Exception as e:
+            # Publishing failed; listeners that lost Redis too drop their local tier
+            pass
+        return scores
+
+    @staticmethod
+    def get_warm_checkpoint_key(start_id=None, end_id=None):
+        """Checkpoint key for a warm-up run over the given customer_id range."""
+        return f"{CreditScoreService.WARM_CHECKPOINT_KEY_PREFIX}{start_id or 'min'}-{end_id or 'max'}"
+
+    @staticmethod
+    def warm_cache(start_id=None, end_id=None, chunk_size=None, resume=True, progress_callback=None):
+        """
+        Precompute and cache scores for all customers (or a customer_id range).
+
+        Customers are walked in customer_id order, one chunk at a time. Each
+        chunk is scored with a single GROUP BY pass over its loans and written
+        to Redis in one pipeline, together with a checkpoint of the last
+        customer_id, so an interrupted run picks up where it stopped.
+        TTLs are jittered to avoid a synchronized expiry of the warmed keys.
+        Customers over their approved limit are not cached; any score or
+        breakdown still cached for them is deleted in the same pipeline.
+
+        progress_callback(processed, total) is called after every chunk.
+        """
+        chunk_size = chunk_size or CreditScoreService.WARM_CHUNK_SIZE
+        checkpoint_key = CreditScoreService.get_warm_checkpoint_key(start_id, end_id)
+
+        customers = Customer.objects.order_by('customer_id')
+        if start_id is not None:
+            customers = customers.filter(customer_id__gte=start_id)
+        if end_id is not None:
+            customers = customers.filter(customer_id__lte=end_id)
+
+        last_id = None
+        if resume:
+            checkpoint = redis_client.get(checkpoint_key)
+            if checkpoint is not None:
+                last_id = int(checkpoint)
+
+        total = customers.count()
+        processed = customers.filter(customer_id__lte=last_id).count() if last_id is not None else 0
+        written = 0
+
+        while True:
+            remaining = customers.filter(customer_id__gt=last_id) if last_id is not None else customers
+            chunk_ids = list(remaining.values_list('customer_id', flat=True)[:chunk_size])
+            if not chunk_ids:
+                break
+
+            aggregates_by_customer = CreditScoreService.get_bulk_score_aggregates(
+                customer_id__gte=chunk_ids[0], customer_id__lte=chunk_ids[-1]
+            )
+            pipe = redis_client.pipeline(transaction=False)
+            dropped_keys = []
+            for customer_id in chunk_ids:
+                aggregates = aggregates_by_customer.get(customer_id, {})
+                if CreditScoreService.is_over_limit(aggregates):
+                    # Not cacheable: drop whatever an earlier, in-limit score left behind
+                    dropped_keys.append(CreditScoreService.get_cache_key(customer_id))
+                    pipe.delete(dropped_keys[-1], CreditScoreService.get_breakdown_key(customer_id))
+                    continue
+                ttl = CreditScoreService.cache_ttl(jitter=random.randint(0, CreditScoreService.CACHE_TTL_JITTER))
+                pipe.set(
+                    CreditScoreService.get_cache_key(customer_id),
+                    CreditScoreService.score_from_aggregates(aggregates),
+                    ex=ttl
+                )
+                written += 1
+            pipe.set(checkpoint_key, chunk_ids[-1])
+            pipe.execute()
+            if dropped_keys:
+                local_cache.invalidate(*dropped_keys)
+
+            last_id = chunk_ids[-1]
+            processed += len(chunk_ids)
+            if progress_callback:
+                progress_callback(processed, total)
+
+        redis_client.delete(checkpoint_key)
+        return {'total': total, 'processed': processed, 'cached': written}
@@ -1,8 +1,37 @@
+from collections import OrderedDict, namedtuple
+from config.instrumentation import instrumented
+from datetime import timedelta
 from decimal import Decimal
 import math
+import numpy as np
+import threading
+
+# One month of an amortization schedule; amounts are Decimal rupees
+ScheduleRow = namedtuple('ScheduleRow', ['month', 'emi', 'principal', 'interest', 'balance'])
+
+def _as_float_array(values):
+    """float64 array from an array or a sequence of Decimal/int/float."""
+    if isinstance(values, np.ndarray):
+        return values.astype(np.float64, copy=False)
+    return np.fromiter(map(float, values), dtype=np.float64, count=len(values))
+
+def _to_python(value):
+    """Unwrap NumPy scalars, which Decimal() does not accept."""
+    return value.item() if isinstance(value, np.generic) else value
 
 class InterestService:
+    # Tolerance (in paise) around a half-paisa below which float64 rounding
+    # could disagree with the Decimal path; such EMIs are recomputed exactly.
+    ROUNDING_TIE_TOLERANCE = 1e-4
+    # Completed schedules kept per (principal, rate, tenure); loans share terms often
+    SCHEDULE_CACHE_SIZE = 1024
+    # Installment k falls due k * 30 days after the start date (end_date = start + tenure * 30 days)
+    DAYS_PER_INSTALLMENT = 30
+    _schedule_cache = OrderedDict()
+    _schedule_cache_lock = threading.Lock()
+
     @staticmethod
+    @instrumented('emi')
     def calculate_monthly_installment(principal, rate, tenure_months):
         """
         Calculate monthly installment (EMI) using Standard Reducing Balance Matrix.
@@ -38,3 +67,94 @@ class InterestService:
         emi = numerator / denominator
         
         return round(emi, 2)
+
+    @staticmethod
+    @instrumented('emi')
+    def calculate_monthly_installments(principals, rates, tenures):
+        """
+        Vectorized calculate_monthly_installment for many loans in one pass.
+
+        Takes equal-length sequences (or arrays) of principal, annual rate and
+        tenure in months and returns a list of Decimal EMIs, identical to the
+        scalar path for every element. The bulk of the work is done with NumPy
+        in float64; the rare results that land within ROUNDING_TIE_TOLERANCE of
+        a half-paisa are recomputed with the scalar Decimal path so rounding
+        always matches.
+        """
+        P = _as_float_array(principals)
+        annual_rate = _as_float_array(rates)
+        n = _as_float_array(tenures)
+
+        r = annual_rate / 12 / 100
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pow_factor = np.power(1 + r, n)
+            emi = np.where(r == 0, P / n, P * r * pow_factor / (pow_factor - 1))
+        emi = np.where(n == 0, 0.0, emi)
+
+        paise = emi * 100
+        fraction = paise - np.floor(paise)
+        near_tie = np.abs(fraction - 0.5) < InterestService.ROUNDING_TIE_TOLERANCE
+        rounded_paise = np.rint(paise).astype(np.int64)
+
+        results = []
+        rows = zip(rounded_paise.tolist(), (n == 0).tolist(), near_tie.tolist())
+        for i, (value, no_tenure, tie) in enumerate(rows):
+            if no_tenure:
+                results.append(Decimal(0))
+            elif tie:
+                results.append(InterestService.calculate_monthly_installment(
+                    _to_python(principals[i]), _to_python(rates[i]), _to_python(tenures[i])
+                ))
+            else:
+                results.append(Decimal(value).scaleb(-2))
+        return results
+
+    @staticmethod
+    def amortization_schedule(principal, rate, tenure_months):
+        """
+        Month-by-month breakdown of a reducing-balance loan, as a generator
+        of ScheduleRow. Each installment pays the month's interest on the
+        outstanding balance (rounded to the paisa) and the rest of the EMI
+        goes to principal; the last installment clears whatever is left, so
+        the balance always ends at zero.
+
+        Rows are produced lazily. A schedule that is iterated to the end is
+        kept in a bounded LRU keyed by (principal, rate, tenure) and replayed
+        from there for the next loan with the same terms.
+        """
+        key = (Decimal(principal), Decimal(rate), int(tenure_months))
+        cache = InterestService._schedule_cache
+        with InterestService._schedule_cache_lock:
+            rows = cache.get(key)
+            if rows is not None:
+                cache.move_to_end(key)
+        if rows is not None:
+            yield from rows
+            return
+
+        rows = []
+        for row in InterestService._generate_schedule(*key):
+            rows.append(row)
+            yield row
+        with InterestService._schedule_cache_lock:
+            cache[key] = tuple(rows)
+            while len(cache) > InterestService.SCHEDULE_CACHE_SIZE:
+                cache.popitem(last=False)
+
+    @staticmethod
+    def _generate_schedule(principal, rate, tenure_months):
+        emi = InterestService.calculate_monthly_installment(principal, rate, tenure_months)
+        r = rate / Decimal(12) / Decimal(100)
+        balance = principal
+        for month in range(1, tenure_months + 1):
+            interest = round(balance * r, 2)
+            principal_paid = emi - interest
+            if month == tenure_months or principal_paid > balance:
+                principal_paid = balance
+            balance -= principal_paid
+            yield ScheduleRow(month, principal_paid + interest, principal_paid, interest, balance)
+
+    @staticmethod
+    def installment_due_date(start_date, month):
+        return start_date + timedelta(days=InterestService.DAYS_PER_INSTALLMENT * month)
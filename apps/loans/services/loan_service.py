@@ -1,17 +1,29 @@
 from decimal import Decimal
 from apps.customers.models import Customer
-from apps.loans.models import Loan
+from apps.loans.models import Loan, CustomerLoanSummary
 from apps.loans.services.credit_score import CreditScoreService
+from apps.loans.services.response_cache import LoanResponseCache
 from apps.loans.services.interest import InterestService
+from apps.loans.services.loan_summary import LoanSummaryService
+from config.instrumentation import instrumented
+from django.db import transaction
 from django.db.models import Sum
 from datetime import date, timedelta
+import asyncio
 
 class LoanService:
     @staticmethod
-    def check_eligibility(customer_id, loan_amount, interest_rate, tenure):
-        customer = Customer.objects.get(customer_id=customer_id)
-        credit_score = CreditScoreService.calculate_credit_score(customer_id)
-        
+    def current_loans(**filters):
+        """Loans whose EMIs still count towards the 50%-of-salary cap."""
+        return Loan.objects.filter(
+            status__in=['APPROVED', 'PENDING'],
+            end_date__gte=date.today(), # Only active loans? Logic implied by "current"
+            **filters
+        )
+
+    @staticmethod
+    def apply_credit_rules(credit_score, interest_rate):
+        """Map a credit score to (approved, corrected_interest_rate)."""
         approved = False
         corrected_interest_rate = interest_rate
         
@@ -28,6 +40,16 @@ class LoanService:
             approved = True
         else: # credit_score <= 10
             approved = False
+
+        return approved, corrected_interest_rate
+
+    @staticmethod
+    def build_eligibility(customer, credit_score, current_emis, loan_amount, interest_rate, tenure, new_emi=None):
+        """
+        Eligibility decision for already-loaded customer, score and EMI sum.
+        Batch callers pass a precomputed new_emi for the corrected rate.
+        """
+        approved, corrected_interest_rate = LoanService.apply_credit_rules(credit_score, interest_rate)
             
         # Check Total EMI constraint
         # "If sum of all current EMIs > 50% of monthly salary, don’t approve any loans"
@@ -37,20 +59,14 @@ class LoanService:
         # Let's assume strict reading: "sum of all CURRENT emis" implies existing ones.
         # But if we add a new one, we should probably check if (Existing + New) > 50% Salary.
         # Let's be safe and check Total + New.
-        
-        current_emis = Loan.objects.filter(
-            customer=customer, 
-            status__in=['APPROVED', 'PENDING'],
-            end_date__gte=date.today() # Only active loans? Logic implied by "current"
-        ).aggregate(Sum('monthly_repayment'))['monthly_repayment__sum'] or 0
-        
-        new_emi = InterestService.calculate_monthly_installment(loan_amount, corrected_interest_rate, tenure)
+        if new_emi is None:
+            new_emi = InterestService.calculate_monthly_installment(loan_amount, corrected_interest_rate, tenure)
         
         if (current_emis + new_emi) > (0.5 * customer.monthly_salary):
             approved = False
             
         return {
-            'customer_id': customer_id,
+            'customer_id': customer.customer_id,
             'approval': approved,
             'interest_rate': interest_rate,
             'corrected_interest_rate': corrected_interest_rate,
@@ -59,27 +75,150 @@ class LoanService:
         }
 
     @staticmethod
-    def create_loan(customer_id, loan_amount, interest_rate, tenure):
-        eligibility = LoanService.check_eligibility(customer_id, loan_amount, interest_rate, tenure)
+    def get_current_emis(customer):
+        """
+        Sum of current EMIs, read from the customer's loan summary when it has
+        one (load the customer with select_related('loan_summary')).
+        """
+        summary = LoanSummaryService.summary_for(customer)
+        if summary is not None:
+            return LoanSummaryService.get_current_emis(summary)
+        return LoanService.current_loans(customer=customer).aggregate(
+            Sum('monthly_repayment')
+        )['monthly_repayment__sum'] or 0
+
+    @staticmethod
+    @instrumented('eligibility')
+    def check_eligibility(customer_id, loan_amount, interest_rate, tenure):
+        customer = Customer.objects.select_related('loan_summary').get(customer_id=customer_id)
+        credit_score = CreditScoreService.calculate_credit_score(customer_id)
+        current_emis = LoanService.get_current_emis(customer)
         
+        return LoanService.build_eligibility(
+            customer, credit_score, current_emis, loan_amount, interest_rate, tenure
+        )
+
+    @staticmethod
+    async def aget_current_emis(customer_id):
+        """get_current_emis for async views, looked up by id so it can run alongside the customer fetch."""
+        summary = await CustomerLoanSummary.objects.filter(customer_id=customer_id).afirst()
+        if summary is not None and not LoanSummaryService.is_stale(summary):
+            return summary.active_emi_sum
+        aggregates = await LoanService.current_loans(customer_id=customer_id).aaggregate(Sum('monthly_repayment'))
+        return aggregates['monthly_repayment__sum'] or 0
+
+    @staticmethod
+    @instrumented('eligibility')
+    async def acheck_eligibility(customer_id, loan_amount, interest_rate, tenure):
+        """
+        check_eligibility for async views. The customer, the score and the
+        current EMI sum are fetched concurrently; raises Customer.DoesNotExist
+        like the sync version.
+        """
+        customer, credit_score, current_emis = await asyncio.gather(
+            Customer.objects.aget(customer_id=customer_id),
+            CreditScoreService.acalculate_credit_score(customer_id),
+            LoanService.aget_current_emis(customer_id),
+        )
+        return LoanService.build_eligibility(
+            customer, credit_score, current_emis, loan_amount, interest_rate, tenure
+        )
+
+    @staticmethod
+    @instrumented('eligibility-batch')
+    def check_eligibility_batch(applications):
+        """
+        Check many applications at once. Customers are loaded together with
+        their loan summaries in one IN query, current EMI sums for customers
+        without a summary (or with a stale one) with one more, and scores
+        come from the bulk score path.
+
+        Returns one entry per application, in input order. Applications for
+        unknown customers get an 'errors' entry instead of failing the batch.
+        """
+        customer_ids = {application['customer_id'] for application in applications}
+        customers = Customer.objects.select_related('loan_summary').in_bulk(customer_ids)
+        current_emis = {}
+        # Customers without a summary, or with a stale one, are aggregated from their loans in one query
+        aggregate_ids = []
+        for customer_id, customer in customers.items():
+            summary = LoanSummaryService.summary_for(customer)
+            if summary is None or LoanSummaryService.is_stale(summary):
+                aggregate_ids.append(customer_id)
+            else:
+                current_emis[customer_id] = summary.active_emi_sum
+        if aggregate_ids:
+            current_emis.update(LoanSummaryService.current_emis_from_loans(aggregate_ids))
+        credit_scores = CreditScoreService.calculate_credit_scores(customers.keys())
+
+        # New EMIs depend on the corrected rate, so price every known
+        # application in one vectorized call before building the results
+        known = [application for application in applications if application['customer_id'] in customers]
+        new_emis = InterestService.calculate_monthly_installments(
+            [application['loan_amount'] for application in known],
+            [
+                LoanService.apply_credit_rules(credit_scores[application['customer_id']], application['interest_rate'])[1]
+                for application in known
+            ],
+            [application['tenure'] for application in known]
+        )
+        new_emis = iter(new_emis)
+
+        results = []
+        for application in applications:
+            customer_id = application['customer_id']
+            customer = customers.get(customer_id)
+            if customer is None:
+                results.append({
+                    'customer_id': customer_id,
+                    'errors': {'customer_id': ['Customer not found.']}
+                })
+                continue
+            results.append(LoanService.build_eligibility(
+                customer,
+                credit_scores[customer_id],
+                current_emis.get(customer_id) or 0,
+                application['loan_amount'],
+                application['interest_rate'],
+                application['tenure'],
+                new_emi=next(new_emis)
+            ))
+        return results
+
+    @staticmethod
+    @instrumented('create-loan')
+    def create_loan(customer_id, loan_amount, interest_rate, tenure):
+        """
+        Check eligibility and create the loan in one transaction. The
+        customer's row is locked first, so concurrent applications for the
+        same customer are decided one after another (each sees the EMIs the
+        previous one added) while other customers proceed in parallel.
+        """
+        with transaction.atomic():
+            Customer.objects.select_for_update().only('customer_id').get(customer_id=customer_id)
+            eligibility = LoanService.check_eligibility(customer_id, loan_amount, interest_rate, tenure)
+
+            if eligibility['approval']:
+                start_date = date.today()
+                end_date = start_date + timedelta(days=tenure * 30)
+
+                # Create loan and fold it into the customer's loan summary
+                loan = Loan.objects.create(
+                    customer_id=customer_id,
+                    loan_amount=loan_amount,
+                    tenure=tenure,
+                    interest_rate=eligibility['corrected_interest_rate'],
+                    monthly_repayment=eligibility['monthly_installment'],
+                    start_date=start_date,
+                    end_date=end_date,
+                    status='APPROVED'
+                )
+                loan_count = LoanSummaryService.apply_new_loan(loan)
+
         if eligibility['approval']:
-            start_date = date.today()
-            end_date = start_date + timedelta(days=tenure * 30)
-
-            # Create loan
-            loan = Loan.objects.create(
-                customer_id=customer_id,
-                loan_amount=loan_amount,
-                tenure=tenure,
-                interest_rate=eligibility['corrected_interest_rate'],
-                monthly_repayment=eligibility['monthly_installment'],
-                start_date=start_date,
-                end_date=end_date,
-                status='APPROVED'
-            )
-            
-            # Invalidate credit score cache since new loan affects the score
-            CreditScoreService.invalidate_cache(customer_id)
+            # Fold the new loan into the cached score breakdown (or drop it)
+            CreditScoreService.apply_new_loan(loan, loan_count)
+            LoanResponseCache.invalidate(customer_id)
             
             return {
                 'loan_id': loan.loan_id,
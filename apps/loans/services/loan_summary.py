@@ -0,0 +1,273 @@
+from django.db import transaction
+from django.db.models import Sum, Count, Min, Q
+from django.db.models.functions import ExtractYear
+from apps.customers.models import Customer
+from apps.loans.models import Loan, CustomerLoanSummary
+from datetime import date
+from decimal import Decimal
+
+class LoanSummaryService:
+    REBUILD_CHUNK_SIZE = 1000
+    SUMMARY_FIELDS = [
+        'loan_count', 'total_tenure', 'emis_paid_on_time', 'active_principal',
+        'approved_volume', 'active_emi_sum', 'active_emi_valid_until', 'loans_by_year',
+    ]
+
+    @staticmethod
+    def is_current(loan):
+        """Mirrors LoanService.current_loans: the loan's EMI still counts against salary."""
+        return loan.status in ('APPROVED', 'PENDING') and loan.end_date >= date.today()
+
+    @staticmethod
+    def compute(customer_ids):
+        """
+        Aggregate the Loan table into summary field values, keyed by customer_id.
+        Two GROUP BY queries: the totals, and loan counts per start year.
+        Customers without loans get zeroed values.
+        """
+        today = date.today()
+        current = Q(status__in=['APPROVED', 'PENDING'], end_date__gte=today)
+        rows = (
+            Loan.objects.filter(customer_id__in=customer_ids)
+            .values('customer_id')
+            .annotate(
+                loan_count=Count('loan_id'),
+                total_tenure=Sum('tenure'),
+                emis_paid_on_time=Sum('emis_paid_on_time'),
+                active_principal=Sum('loan_amount', filter=Q(status__in=['APPROVED', 'PENDING'])),
+                approved_volume=Sum('loan_amount', filter=Q(status__in=['APPROVED', 'PAID'])),
+                active_emi_sum=Sum('monthly_repayment', filter=current),
+                active_emi_valid_until=Min('end_date', filter=current),
+            )
+        )
+        summaries = {
+            customer_id: {
+                'loan_count': 0, 'total_tenure': 0, 'emis_paid_on_time': 0,
+                'active_principal': Decimal(0), 'approved_volume': Decimal(0),
+                'active_emi_sum': Decimal(0), 'active_emi_valid_until': None, 'loans_by_year': {},
+            }
+            for customer_id in customer_ids
+        }
+        for row in rows:
+            values = summaries[row.pop('customer_id')]
+            values.update({field: value for field, value in row.items() if value is not None})
+
+        yearly = (
+            Loan.objects.filter(customer_id__in=customer_ids)
+            .annotate(year=ExtractYear('start_date'))
+            .values('customer_id', 'year')
+            .annotate(count=Count('loan_id'))
+        )
+        for row in yearly:
+            summaries[row['customer_id']]['loans_by_year'][str(row['year'])] = row['count']
+
+        return summaries
+
+    @staticmethod
+    def rebuild(customer_ids=None):
+        """
+        Recompute summaries from the Loan table for the given customers, or
+        for every customer when customer_ids is None. Also brings
+        Customer.current_debt in line with the active principal.
+
+        Each chunk locks its Customer rows (in id order) before aggregating,
+        so concurrent rebuilds of the same customer, e.g. from parallel
+        ingestion shards, serialize and the last one sees every committed loan.
+        Returns the number of customers rebuilt.
+        """
+        if customer_ids is None:
+            customer_ids = Customer.objects.order_by('customer_id').values_list('customer_id', flat=True).iterator()
+        else:
+            customer_ids = sorted(set(customer_ids))
+
+        rebuilt = 0
+        chunk = []
+        for customer_id in customer_ids:
+            chunk.append(customer_id)
+            if len(chunk) >= LoanSummaryService.REBUILD_CHUNK_SIZE:
+                rebuilt += LoanSummaryService._rebuild_chunk(chunk)
+                chunk = []
+        if chunk:
+            rebuilt += LoanSummaryService._rebuild_chunk(chunk)
+        return rebuilt
+
+    @staticmethod
+    def _rebuild_chunk(customer_ids):
+        with transaction.atomic():
+            customers = list(
+                Customer.objects.select_for_update()
+                .filter(customer_id__in=customer_ids)
+                .order_by('customer_id')
+                .only('customer_id', 'current_debt')
+            )
+            existing_ids = [customer.customer_id for customer in customers]
+            summaries = LoanSummaryService.compute(existing_ids)
+
+            CustomerLoanSummary.objects.bulk_create(
+                [CustomerLoanSummary(customer_id=customer_id, **values) for customer_id, values in summaries.items()],
+                update_conflicts=True,
+                unique_fields=['customer'],
+                update_fields=LoanSummaryService.SUMMARY_FIELDS + ['updated_at'],
+            )
+
+            for customer in customers:
+                customer.current_debt = summaries[customer.customer_id]['active_principal']
+            Customer.objects.bulk_update(customers, ['current_debt'])
+        return len(existing_ids)
+
+    @staticmethod
+    def apply_new_loan(loan):
+        """
+        Fold a newly created loan into its customer's summary. Call inside the
+        transaction that created the loan so both commit together. Returns
+        the customer's loan count, new loan included.
+        """
+        summary = CustomerLoanSummary.objects.select_for_update().filter(customer_id=loan.customer_id).first()
+        if summary is None:
+            # No projection yet (e.g. before the first rebuild): build it, new loan included
+            LoanSummaryService.rebuild([loan.customer_id])
+            return CustomerLoanSummary.objects.values_list('loan_count', flat=True).get(customer_id=loan.customer_id)
+
+        loan_amount = Decimal(loan.loan_amount)
+        summary.loan_count += 1
+        summary.total_tenure += loan.tenure
+        summary.emis_paid_on_time += loan.emis_paid_on_time
+        if loan.status in ('APPROVED', 'PENDING'):
+            summary.active_principal += loan_amount
+            Customer.objects.filter(customer_id=loan.customer_id).update(current_debt=summary.active_principal)
+        if loan.status in ('APPROVED', 'PAID'):
+            summary.approved_volume += loan_amount
+        if LoanSummaryService.is_current(loan):
+            summary.active_emi_sum += Decimal(loan.monthly_repayment)
+            if summary.active_emi_valid_until is None or loan.end_date < summary.active_emi_valid_until:
+                summary.active_emi_valid_until = loan.end_date
+        year = str(loan.start_date.year)
+        summary.loans_by_year[year] = summary.loans_by_year.get(year, 0) + 1
+        summary.save()
+        return summary.loan_count
+
+    @staticmethod
+    def is_stale(summary):
+        """active_emi_sum is only valid until its earliest counted loan ends."""
+        return summary.active_emi_valid_until is not None and summary.active_emi_valid_until < date.today()
+
+    @staticmethod
+    def to_score_aggregates(summary, approved_limit):
+        """Summary row in the shape CreditScoreService.score_from_aggregates expects."""
+        return {
+            'current_debt': summary.active_principal,
+            'emis_paid_on_time': summary.emis_paid_on_time,
+            'total_tenure': summary.total_tenure,
+            'loan_count': summary.loan_count,
+            'loans_this_year': summary.loans_by_year.get(str(date.today().year), 0),
+            'approved_volume': summary.approved_volume,
+            'approved_limit': approved_limit,
+        }
+
+    @staticmethod
+    def get_score_aggregates(customer_id):
+        """Score aggregates from the summary row, or None if the customer has no summary."""
+        summary = (
+            CustomerLoanSummary.objects.select_related('customer')
+            .only(*LoanSummaryService.SUMMARY_FIELDS, 'customer__approved_limit')
+            .filter(customer_id=customer_id)
+            .first()
+        )
+        if summary is None:
+            return None
+        return LoanSummaryService.to_score_aggregates(summary, summary.customer.approved_limit)
+
+    @staticmethod
+    def get_bulk_score_aggregates(customer_ids):
+        """get_score_aggregates for many customers with one query; customers without a summary are absent."""
+        summaries = (
+            CustomerLoanSummary.objects.select_related('customer')
+            .only(*LoanSummaryService.SUMMARY_FIELDS, 'customer__approved_limit')
+            .filter(customer_id__in=customer_ids)
+        )
+        return {
+            summary.customer_id: LoanSummaryService.to_score_aggregates(summary, summary.customer.approved_limit)
+            for summary in summaries
+        }
+
+    @staticmethod
+    def summary_for(customer):
+        """The customer's summary row (use select_related('loan_summary')), or None."""
+        try:
+            return customer.loan_summary
+        except CustomerLoanSummary.DoesNotExist:
+            return None
+
+    @staticmethod
+    def stale_customer_ids():
+        """Customers whose active EMI figures have expired (for `loan_summaries rebuild --stale`)."""
+        return (
+            CustomerLoanSummary.objects.filter(active_emi_valid_until__lt=date.today())
+            .order_by('customer_id').values_list('customer_id', flat=True)
+        )
+
+    @staticmethod
+    def current_emis_from_loans(customer_ids):
+        """Current EMI sums aggregated from the Loan table, keyed by customer_id (customers without current loans are absent)."""
+        return dict(
+            Loan.objects.filter(
+                customer_id__in=customer_ids, status__in=['APPROVED', 'PENDING'], end_date__gte=date.today()
+            )
+            .values('customer_id')
+            .annotate(total=Sum('monthly_repayment'))
+            .values_list('customer_id', 'total')
+        )
+
+    @staticmethod
+    def get_current_emis(summary):
+        """
+        Current EMI sum from a summary row. For a stale row (one of its loans
+        has ended since it was written) the sum is aggregated from the loans
+        instead; reads never rebuild, that is left to the write paths and
+        `loan_summaries rebuild --stale`.
+        """
+        if LoanSummaryService.is_stale(summary):
+            return LoanSummaryService.current_emis_from_loans([summary.customer_id]).get(summary.customer_id, 0)
+        return summary.active_emi_sum
+
+    @staticmethod
+    def verify(customer_ids=None):
+        """
+        Compare stored summaries with a fresh aggregation of the Loan table.
+        Returns a list of (customer_id, field, stored, expected) for every
+        mismatch; a missing summary row is reported as field 'summary'.
+        Stale active EMI figures are not drift (readers aggregate the loans instead) and are skipped.
+        """
+        if customer_ids is None:
+            customer_ids = Customer.objects.order_by('customer_id').values_list('customer_id', flat=True).iterator()
+
+        drift = []
+        chunk = []
+        for customer_id in customer_ids:
+            chunk.append(customer_id)
+            if len(chunk) >= LoanSummaryService.REBUILD_CHUNK_SIZE:
+                drift.extend(LoanSummaryService._verify_chunk(chunk))
+                chunk = []
+        if chunk:
+            drift.extend(LoanSummaryService._verify_chunk(chunk))
+        return drift
+
+    @staticmethod
+    def _verify_chunk(customer_ids):
+        expected = LoanSummaryService.compute(customer_ids)
+        stored = CustomerLoanSummary.objects.select_related('customer').in_bulk(customer_ids)
+        drift = []
+        for customer_id, values in expected.items():
+            summary = stored.get(customer_id)
+            if summary is None:
+                if values['loan_count']:
+                    drift.append((customer_id, 'summary', None, 'missing'))
+                continue
+            for field in LoanSummaryService.SUMMARY_FIELDS:
+                if field.startswith('active_emi') and LoanSummaryService.is_stale(summary):
+                    continue
+                if getattr(summary, field) != values[field]:
+                    drift.append((customer_id, field, getattr(summary, field), values[field]))
+            if summary.customer.current_debt != values['active_principal']:
+                drift.append((customer_id, 'customer.current_debt', summary.customer.current_debt, values['active_principal']))
+        return drift
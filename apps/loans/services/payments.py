@@ -0,0 +1,301 @@
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from apps.loans.models import Loan, LoanPayment
+from apps.loans.services.credit_score import CreditScoreService, local_cache
+from apps.loans.services.interest import InterestService
+from apps.loans.services.loan_summary import LoanSummaryService
+from apps.loans.services.response_cache import LoanResponseCache
+from apps.loans.services.score_events import ScoreEventService
+from config.instrumentation import instrumented
+from config.redis_client import get_redis_client
+from decimal import Decimal, InvalidOperation
+import logging
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+redis_client = get_redis_client()
+
+class PaymentService:
+    """
+    EMI repayments: the LoanPayment ledger and the Loan columns derived from
+    it (emis_paid_on_time, the APPROVED -> PAID transition).
+
+    Payments are applied in set-based batches, whether one arrives through
+    /loans/<id>/payments or a few hundred thousand through the nightly
+    settlement file: a fixed number of queries per batch (ledger lookup,
+    loan lock, late-payment counts, bulk insert, one UPDATE ... FROM per
+    LOAN_UPDATE_CHUNK loans, summary rebuild) and one Redis pipeline for
+    the affected customers' caches after commit.
+
+    Installments are settled in paid_on order. The n-th payment of a loan
+    settles installment n and is on time when paid on or before that
+    installment's due date (InterestService.installment_due_date); late
+    payments are recorded but not counted in emis_paid_on_time. A payment
+    must cover the loan's monthly_repayment; smaller (partial) payments are
+    rejected and settle nothing. A loan becomes PAID when all `tenure`
+    installments are settled.
+    """
+    SETTLEMENT_COLUMNS = ['loan_id', 'amount', 'paid_on', 'reference']
+    LOAN_UPDATE_CHUNK = 1000  # Loans per UPDATE ... FROM statement (3 parameters each)
+    INSERT_BATCH_SIZE = 1000
+    CONFLICT_ATTEMPTS = 3  # Runs of a batch that keeps losing races on references or installments
+
+    @staticmethod
+    def late_payments():
+        """Expression counting a loan's late payments, for annotating Loan querysets."""
+        late = (
+            LoanPayment.objects.filter(loan=OuterRef('pk'), on_time=False)
+            .order_by().values('loan').annotate(count=Count('payment_id')).values('count')
+        )
+        return Coalesce(Subquery(late, output_field=IntegerField()), Value(0))
+
+    @staticmethod
+    def repayments_left(tenure, emis_paid_on_time, late_payments, status):
+        """
+        Installments not yet settled according to the ledger: the tenure less
+        the on-time and late payments recorded, and none once the loan is
+        PAID. Loans loaded without a ledger count only their EMIs paid on time.
+        """
+        if status == 'PAID':
+            return 0
+        return max(tenure - emis_paid_on_time - late_payments, 0)
+
+    @staticmethod
+    def empty_summary():
+        return {'total': 0, 'success': 0, 'duplicates': 0, 'failed': 0, 'errors': []}
+
+    @staticmethod
+    @instrumented('payments')
+    def apply_batch(rows):
+        """
+        Record one batch of payments in a single transaction.
+
+        rows are dicts with loan_id, amount (Decimal), paid_on (date), an
+        optional reference and an optional index (the row number reported in
+        errors; the position in rows by default).
+        Payments whose reference is already in the ledger (or earlier in the
+        batch) are skipped as duplicates, so a settlement file can be
+        re-submitted safely. Returns the summary
+        {'total', 'success', 'duplicates', 'failed', 'errors', 'payments'},
+        where 'payments' holds the created LoanPayment rows.
+
+        The ledger is read before the insert, so a concurrent batch can
+        commit one of our references (or installments) in between; the
+        insert then hits the unique constraint, the transaction rolls back
+        and the batch is run again against the updated ledger, where those
+        rows are duplicates.
+        """
+        for attempt in range(1, PaymentService.CONFLICT_ATTEMPTS + 1):
+            try:
+                return PaymentService.record_batch(rows)
+            except IntegrityError as e:
+                if attempt == PaymentService.CONFLICT_ATTEMPTS:
+                    raise
+                logger.info(f"Payment batch of {len(rows)} rows lost a race ({e}); retrying")
+
+    @staticmethod
+    def existing_references(references):
+        """The references already in the ledger."""
+        if not references:
+            return set()
+        return set(LoanPayment.objects.filter(reference__in=references).values_list('reference', flat=True))
+
+    @staticmethod
+    def record_batch(rows):
+        """One transactional run of apply_batch; raises IntegrityError when it loses a race."""
+        summary = PaymentService.empty_summary()
+        summary['total'] = len(rows)
+        summary['payments'] = []
+        errors = []
+
+        with transaction.atomic():
+            seen = PaymentService.existing_references([row['reference'] for row in rows if row.get('reference')])
+            pending = []
+            for position, row in enumerate(rows):
+                index = row.get('index', position)
+                reference = row.get('reference') or None
+                if reference is not None:
+                    if reference in seen:
+                        summary['duplicates'] += 1
+                        continue
+                    seen.add(reference)
+                pending.append((index, row, reference))
+
+            # Lock in id order so concurrent batches over the same loans serialize without deadlocking
+            loan_ids = sorted({row['loan_id'] for _, row, _ in pending})
+            loans = {
+                loan['loan_id']: loan
+                for loan in Loan.objects.select_for_update().filter(loan_id__in=loan_ids).order_by('loan_id')
+                .values('loan_id', 'customer_id', 'tenure', 'start_date', 'status', 'emis_paid_on_time', 'monthly_repayment')
+            }
+            late = dict(
+                LoanPayment.objects.filter(loan_id__in=list(loans), on_time=False)
+                .values('loan_id').annotate(count=Count('payment_id')).values_list('loan_id', 'count')
+            )
+            for loan in loans.values():
+                loan['installments_paid'] = loan['emis_paid_on_time'] + late.get(loan['loan_id'], 0)
+                loan['paid_on_time'] = 0
+                loan['payments'] = 0
+
+            payments = []
+            for index, row, reference in sorted(pending, key=lambda item: (item[1]['paid_on'], item[0])):
+                loan = loans.get(row['loan_id'])
+                if loan is None:
+                    error = f"Loan {row['loan_id']} does not exist"
+                elif loan['status'] != 'APPROVED':
+                    error = f"Loan {row['loan_id']} is {loan['status']}, not APPROVED"
+                elif loan['installments_paid'] >= loan['tenure']:
+                    error = f"Loan {row['loan_id']} is fully repaid"
+                elif row['amount'] < loan['monthly_repayment']:
+                    error = f"Amount {row['amount']} is below the monthly installment {loan['monthly_repayment']}"
+                else:
+                    error = None
+                if error:
+                    errors.append((index, f"Row {index}: {error}"))
+                    continue
+
+                loan['installments_paid'] += 1
+                installment = loan['installments_paid']
+                on_time = row['paid_on'] <= InterestService.installment_due_date(loan['start_date'], installment)
+                loan['paid_on_time'] += on_time
+                loan['payments'] += 1
+                payments.append(LoanPayment(
+                    loan_id=loan['loan_id'],
+                    installment=installment,
+                    amount=row['amount'],
+                    paid_on=row['paid_on'],
+                    on_time=on_time,
+                    reference=reference,
+                ))
+
+            if payments:
+                summary['payments'] = LoanPayment.objects.bulk_create(payments, batch_size=PaymentService.INSERT_BATCH_SIZE)
+                touched = [loan for loan in loans.values() if loan['payments']]
+                PaymentService.update_loans([
+                    (loan['loan_id'], loan['paid_on_time'], loan['installments_paid'] >= loan['tenure'])
+                    for loan in touched
+                ])
+                customer_ids = sorted({loan['customer_id'] for loan in touched})
+                LoanSummaryService.rebuild(customer_ids)
+                transaction.on_commit(lambda: PaymentService.invalidate(customer_ids))
+
+        summary['success'] = len(payments)
+        summary['failed'] = len(errors)
+        summary['errors'] = [message for _, message in sorted(errors)]
+        return summary
+
+    @staticmethod
+    def update_loans(updates):
+        """
+        Add the on-time payments to emis_paid_on_time and move fully paid
+        loans to PAID: one UPDATE ... FROM a VALUES list per
+        LOAN_UPDATE_CHUNK loans, instead of a save() per loan.
+        updates are (loan_id, paid_on_time, paid_off) tuples.
+        """
+        table = connection.ops.quote_name(Loan._meta.db_table)
+        with connection.cursor() as cursor:
+            for start in range(0, len(updates), PaymentService.LOAN_UPDATE_CHUNK):
+                chunk = updates[start:start + PaymentService.LOAN_UPDATE_CHUNK]
+                values = ', '.join(['(%s, %s, %s)'] * len(chunk))
+                cursor.execute(
+                    f"WITH paid (loan_id, on_time, paid_off) AS (VALUES {values}) "
+                    f"UPDATE {table} SET "
+                    f"emis_paid_on_time = {table}.emis_paid_on_time + paid.on_time, "
+                    f"status = CASE WHEN paid.paid_off = 1 THEN 'PAID' ELSE {table}.status END "
+                    f"FROM paid WHERE {table}.loan_id = paid.loan_id",
+                    [value for loan_id, on_time, paid_off in chunk for value in (loan_id, on_time, int(paid_off))]
+                )
+
+    @staticmethod
+    def invalidate(customer_ids):
+        """
+        Drop the cached scores, breakdowns and loan responses of the
+        customers in one pipeline, evict the scores from every process's
+        local tier with one broadcast, and publish the change events.
+        """
+        score_keys = [CreditScoreService.get_cache_key(customer_id) for customer_id in customer_ids]
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for customer_id, score_key in zip(customer_ids, score_keys):
+                pipe.delete(
+                    score_key,
+                    CreditScoreService.get_breakdown_key(customer_id),
+                    LoanResponseCache.get_cache_key(customer_id),
+                )
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not invalidate cached scores of {len(customer_ids)} customers: {e}")
+        try:
+            local_cache.invalidate(*score_keys)
+        except Exception as e:
+            pass
+        ScoreEventService.publish(customer_ids)
+
+    @staticmethod
+    def parse_settlement_chunk(chunk, start_index):
+        """
+        Validate a chunk of the settlement file column-wise. Returns
+        (rows, errors): apply_batch rows for the valid lines and
+        'Row N: ...' messages for the rest.
+        """
+        loan_ids = pd.to_numeric(chunk['loan_id'], errors='coerce')
+        amounts = pd.to_numeric(chunk['amount'], errors='coerce')
+        paid_on = pd.to_datetime(chunk['paid_on'], errors='coerce', format='%Y-%m-%d')
+        invalid = (
+            loan_ids.isna() | (loan_ids % 1 != 0)
+            | amounts.isna() | (amounts <= 0)
+            | paid_on.isna()
+        )
+        references = chunk['reference'] if 'reference' in chunk else pd.Series(None, index=chunk.index)
+
+        rows, errors = [], []
+        for offset, (bad, loan_id, amount, date_value, reference) in enumerate(zip(
+            invalid.tolist(), loan_ids.tolist(), chunk['amount'].tolist(), paid_on.tolist(), references.tolist()
+        )):
+            index = start_index + offset
+            if bad:
+                errors.append(f"Row {index}: invalid loan_id, amount or paid_on")
+                continue
+            try:
+                amount = Decimal(str(amount).strip()).quantize(Decimal('0.01'))
+            except InvalidOperation:
+                errors.append(f"Row {index}: invalid loan_id, amount or paid_on")
+                continue
+            rows.append({
+                'index': index,
+                'loan_id': int(loan_id),
+                'amount': amount,
+                'paid_on': date_value.date(),
+                'reference': reference.strip() if isinstance(reference, str) and reference.strip() else None,
+            })
+        return rows, errors
+
+    @staticmethod
+    def settle_file(file, batch_size=None):
+        """
+        Apply a bank settlement CSV (loan_id, amount, paid_on as YYYY-MM-DD,
+        optional reference) in batches of PAYMENT_SETTLEMENT_BATCH_SIZE rows,
+        each in its own transaction. Row numbers in errors are 0-based data
+        rows. Raises ValueError when a required column is missing.
+        """
+        batch_size = batch_size or settings.PAYMENT_SETTLEMENT_BATCH_SIZE
+        report = PaymentService.empty_summary()
+        reader = pd.read_csv(file, chunksize=batch_size, dtype=str, keep_default_na=False)
+        start = 0
+        for chunk in reader:
+            missing = [column for column in PaymentService.SETTLEMENT_COLUMNS[:3] if column not in chunk]
+            if missing:
+                raise ValueError(f"Missing columns: {', '.join(missing)}")
+            rows, errors = PaymentService.parse_settlement_chunk(chunk, start)
+            summary = PaymentService.apply_batch(rows) if rows else PaymentService.empty_summary()
+            report['total'] += len(chunk)
+            report['success'] += summary['success']
+            report['duplicates'] += summary['duplicates']
+            report['failed'] += len(errors) + summary['failed']
+            report['errors'].extend(errors)
+            report['errors'].extend(summary['errors'])
+            start += len(chunk)
+        return report
@@ -0,0 +1,148 @@
+from django.conf import settings
+from django.db.models import Count, Max
+from apps.customers.models import Customer
+from apps.loans.models import Loan
+from config.instrumentation import record_cache
+from config.redis_client import get_async_redis_client, get_redis_client
+import hashlib
+
+redis_client = get_redis_client()
+
+class LoanResponseCache:
+    """
+    Validators and an optional rendered-response cache for the loan read
+    endpoints (/view-loan/<id>, /view-loans/<customer_id>).
+
+    A customer's loan version is their CustomerLoanSummary (loan_count and
+    updated_at), which create_loan, payments and every ingestion rebuild
+    touch; without a summary it falls back to the count and max loan_id.
+    The ETag hashes that
+    version with the request path and negotiated media type, so an unchanged
+    resource is answered with 304 after one small query and no serialization.
+
+    With settings.LOAN_RESPONSE_CACHE the rendered JSON is also kept in one
+    Redis hash per customer (field = ETag) for LOAN_RESPONSE_CACHE_TTL
+    seconds. create_loan drops the hash; fields written for an older version
+    are never read again because the ETag has moved on.
+    """
+    CACHE_KEY_PREFIX = 'loan_responses:'
+
+    @staticmethod
+    def get_cache_key(customer_id):
+        return f"{LoanResponseCache.CACHE_KEY_PREFIX}{customer_id}"
+
+    @staticmethod
+    def enabled():
+        return getattr(settings, 'LOAN_RESPONSE_CACHE', False)
+
+    @staticmethod
+    def customer_version_query(customer_id):
+        return (
+            Customer.objects.filter(customer_id=customer_id)
+            .values_list('customer_id', 'loan_summary__loan_count', 'loan_summary__updated_at')
+        )
+
+    @staticmethod
+    def loan_version_query(loan_id):
+        return (
+            Loan.objects.filter(loan_id=loan_id)
+            .values_list('customer_id', 'customer__loan_summary__loan_count', 'customer__loan_summary__updated_at')
+        )
+
+    @staticmethod
+    def fallback_totals(customer_id):
+        """Loan count and max loan_id, for customers without a summary yet."""
+        return Loan.objects.filter(customer_id=customer_id).aggregate(count=Count('loan_id'), last=Max('loan_id'))
+
+    @staticmethod
+    def to_version(row, totals=None):
+        """
+        (customer_id, version, last_modified) from a version query row (plus
+        fallback totals if it has no summary). Payments move repayments_left
+        through the summary rebuild, which bumps updated_at.
+        """
+        customer_id, loan_count, updated_at = row
+        if updated_at is not None:
+            return customer_id, f"{customer_id}:{loan_count}:{updated_at.timestamp()}", updated_at
+        return customer_id, f"{customer_id}:{totals['count']}:{totals['last']}", None
+
+    @staticmethod
+    def resolve_version(queryset):
+        """(customer_id, version, last_modified), or None when the customer/loan does not exist."""
+        row = queryset.first()
+        if row is None:
+            return None
+        totals = LoanResponseCache.fallback_totals(row[0]) if row[2] is None else None
+        return LoanResponseCache.to_version(row, totals)
+
+    @staticmethod
+    async def aresolve_version(queryset):
+        row = await queryset.afirst()
+        if row is None:
+            return None
+        totals = None
+        if row[2] is None:
+            totals = await Loan.objects.filter(customer_id=row[0]).aaggregate(count=Count('loan_id'), last=Max('loan_id'))
+        return LoanResponseCache.to_version(row, totals)
+
+    @staticmethod
+    def etag(version, request, media_type):
+        digest = hashlib.md5(f"{version}|{request.get_full_path()}|{media_type}".encode()).hexdigest()
+        return f'"{digest}"'
+
+    @staticmethod
+    def get(customer_id, etag):
+        """Cached rendered body (bytes) or None; Redis errors are a miss."""
+        if not LoanResponseCache.enabled():
+            return None
+        try:
+            content = redis_client.hget(LoanResponseCache.get_cache_key(customer_id), etag)
+        except Exception as e:
+            return None
+        record_cache('loan-response', hit=content is not None)
+        return content.encode() if content is not None else None
+
+    @staticmethod
+    def set(customer_id, etag, content):
+        if not LoanResponseCache.enabled():
+            return
+        cache_key = LoanResponseCache.get_cache_key(customer_id)
+        try:
+            with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hset(cache_key, etag, content.decode())
+                pipe.expire(cache_key, settings.LOAN_RESPONSE_CACHE_TTL)
+                pipe.execute()
+        except Exception as e:
+            pass
+
+    @staticmethod
+    def invalidate(customer_id):
+        """Drop every cached response of the customer (called after new loan creation)."""
+        try:
+            redis_client.delete(LoanResponseCache.get_cache_key(customer_id))
+        except Exception as e:
+            pass
+
+    @staticmethod
+    async def aget(customer_id, etag):
+        if not LoanResponseCache.enabled():
+            return None
+        try:
+            content = await get_async_redis_client().hget(LoanResponseCache.get_cache_key(customer_id), etag)
+        except Exception as e:
+            return None
+        record_cache('loan-response', hit=content is not None)
+        return content.encode() if content is not None else None
+
+    @staticmethod
+    async def aset(customer_id, etag, content):
+        if not LoanResponseCache.enabled():
+            return
+        cache_key = LoanResponseCache.get_cache_key(customer_id)
+        try:
+            pipe = get_async_redis_client().pipeline(transaction=False)
+            pipe.hset(cache_key, etag, content.decode())
+            pipe.expire(cache_key, settings.LOAN_RESPONSE_CACHE_TTL)
+            await pipe.execute()
+        except Exception as e:
+            pass
@@ -0,0 +1,161 @@
+from collections import OrderedDict
+from django.conf import settings
+from config.instrumentation import record_cache
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class CacheStats:
+    """
+    Per-process hit/miss counters for the credit score cache tiers ('local',
+    'redis'), also reported to the request instrumentation as 'score-<tier>'.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, tier, hit, count=1):
+        key = f"{tier}_{'hits' if hit else 'misses'}"
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + count
+        record_cache(f"score-{tier}", hit, count)
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        for tier in ('local', 'redis'):
+            counts.setdefault(f"{tier}_hits", 0)
+            counts.setdefault(f"{tier}_misses", 0)
+        return counts
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+class LocalScoreCache:
+    """
+    Bounded in-process LRU with a short TTL that sits in front of Redis.
+
+    Invalidations are broadcast on a Redis pub/sub channel and every process
+    runs a listener thread that evicts the keys it is told about. The local
+    tier is only consulted while that listener is subscribed; if the
+    subscription drops, the tier is cleared and bypassed until it is back,
+    so a score invalidated elsewhere is never served from memory.
+
+    Enabled with settings.CREDIT_SCORE_LOCAL_CACHE; sized and timed by
+    CREDIT_SCORE_LOCAL_CACHE_SIZE and CREDIT_SCORE_LOCAL_CACHE_TTL (seconds).
+    """
+    CHANNEL = 'credit_score:invalidate'
+    RECONNECT_DELAY = 1  # Seconds between resubscribe attempts
+    POLL_TIMEOUT = 0.1
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._generation = 0
+        self._listening = threading.Event()
+        self._listener_pid = None
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'CREDIT_SCORE_LOCAL_CACHE', False)
+
+    def generation(self):
+        """
+        Token to take before reading the score from Redis or the database;
+        set() drops the value if an invalidation arrived in between.
+        """
+        return self._generation
+
+    def get(self, key):
+        """Cached value, or None on a miss (or while the tier is disabled/unsynchronized)."""
+        if not self.enabled or not self._ensure_listener():
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, generation):
+        if not self.enabled or not self._ensure_listener():
+            return
+        ttl = settings.CREDIT_SCORE_LOCAL_CACHE_TTL
+        max_size = settings.CREDIT_SCORE_LOCAL_CACHE_SIZE
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, *keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def invalidate(self, *keys):
+        """Evict locally and tell every other process to do the same."""
+        self.evict(*keys)
+        if keys and self.enabled:
+            self.redis_client.publish(self.CHANNEL, ' '.join(keys))
+
+    def _ensure_listener(self):
+        """Start the pub/sub listener for this process (again after a fork); True once subscribed."""
+        pid = os.getpid()
+        if self._listener_pid != pid:
+            with self._lock:
+                if self._listener_pid != pid:
+                    self._listener_pid = pid
+                    self._listening = threading.Event()
+                    self._entries.clear()
+                    thread = threading.Thread(target=self._listen, name='credit-score-invalidation', daemon=True)
+                    thread.start()
+        return self._listening.is_set()
+
+    def _listen(self):
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                pubsub.subscribe(self.CHANNEL)
+                while True:
+                    # Poll rather than listen(): a blocking read would trip the client's socket timeout
+                    message = pubsub.get_message(timeout=self.POLL_TIMEOUT)
+                    if message is None:
+                        continue
+                    if message['type'] == 'subscribe':
+                        # Anything cached before the (re)subscription may have missed an invalidation
+                        self.clear()
+                        self._listening.set()
+                    elif message['type'] == 'message':
+                        data = message['data']
+                        if isinstance(data, bytes):
+                            data = data.decode()
+                        self.evict(*data.split())
+            except Exception as e:
+                logger.warning(f"Credit score invalidation listener disconnected: {e}")
+            finally:
+                self._listening.clear()
+                self.clear()
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+            time.sleep(self.RECONNECT_DELAY)
@@ -0,0 +1,142 @@
+from django.conf import settings
+from django.db import transaction
+from apps.loans.services.credit_score import CreditScoreService
+from config.redis_client import get_redis_client
+import logging
+import redis
+import time
+
+logger = logging.getLogger(__name__)
+
+redis_client = get_redis_client()
+
+class ScoreEventService:
+    """
+    Change events that keep cached credit scores current without a TTL.
+
+    Writers publish the customer_ids whose loans changed to a Redis stream
+    (Loan post_save/post_delete, the ingestion loaders, bulk updates). The
+    consumer (apps.loans.tasks.recompute_changed_scores, run by celery beat
+    every CREDIT_SCORE_EVENTS_WINDOW seconds) reads everything published
+    since its last run through a consumer group, deduplicates the ids, and
+    recomputes their breakdowns and scores in batches of
+    CREDIT_SCORE_EVENTS_BATCH_SIZE. Entries are acknowledged only once
+    their scores are written; entries left pending by a consumer that died
+    are claimed by the next run.
+
+    Enabled with settings.CREDIT_SCORE_EVENTS, which also stretches the
+    score cache TTL to a week (CreditScoreService.cache_ttl).
+    """
+    STREAM_KEY = 'credit_score:events'
+    GROUP = 'score-recompute'
+    IDS_PER_EVENT = 1000  # Large bulk loads are split over several entries
+    READ_COUNT = 500  # Stream entries per XREADGROUP/XAUTOCLAIM call
+    CLAIM_IDLE_MS = 60000  # Pending entries idle this long belong to a dead consumer
+
+    @staticmethod
+    def enabled():
+        return getattr(settings, 'CREDIT_SCORE_EVENTS', False)
+
+    @staticmethod
+    def publish(customer_ids):
+        """
+        Append the customer_ids to the stream (one pipeline). If Redis is
+        unavailable their cached scores are dropped instead, so the next read
+        recomputes rather than serving a score that will never be refreshed.
+        """
+        if not ScoreEventService.enabled():
+            return
+        customer_ids = sorted(set(customer_ids))
+        if not customer_ids:
+            return
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for start in range(0, len(customer_ids), ScoreEventService.IDS_PER_EVENT):
+                chunk = customer_ids[start:start + ScoreEventService.IDS_PER_EVENT]
+                pipe.xadd(
+                    ScoreEventService.STREAM_KEY,
+                    {'customer_ids': ','.join(str(customer_id) for customer_id in chunk)},
+                    maxlen=settings.CREDIT_SCORE_EVENTS_MAXLEN,
+                    approximate=True,
+                )
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not publish score events for {len(customer_ids)} customers: {e}")
+            for customer_id in customer_ids:
+                CreditScoreService.invalidate_cache(customer_id)
+
+    @staticmethod
+    def publish_on_commit(customer_ids):
+        """publish() once the current transaction commits (immediately outside one), so the consumer sees the change."""
+        if not ScoreEventService.enabled():
+            return
+        customer_ids = list(customer_ids)
+        transaction.on_commit(lambda: ScoreEventService.publish(customer_ids))
+
+    @staticmethod
+    def ensure_group():
+        try:
+            redis_client.xgroup_create(ScoreEventService.STREAM_KEY, ScoreEventService.GROUP, id='0', mkstream=True)
+        except redis.exceptions.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    @staticmethod
+    def read_window(consumer, window):
+        """
+        Entries for this consumer: first those abandoned by dead consumers,
+        then new ones, until the stream is drained or `window` seconds pass.
+        Returns (entry_ids, customer_ids).
+        """
+        deadline = time.monotonic() + window
+        entries = []
+        start_id = '0-0'
+        while time.monotonic() < deadline:
+            start_id, claimed, *_ = redis_client.xautoclaim(
+                ScoreEventService.STREAM_KEY, ScoreEventService.GROUP, consumer,
+                min_idle_time=ScoreEventService.CLAIM_IDLE_MS, start_id=start_id, count=ScoreEventService.READ_COUNT,
+            )
+            entries.extend(claimed)
+            if start_id == '0-0':
+                break
+        while time.monotonic() < deadline:
+            response = redis_client.xreadgroup(
+                ScoreEventService.GROUP, consumer, {ScoreEventService.STREAM_KEY: '>'},
+                count=ScoreEventService.READ_COUNT,
+            )
+            if not response:
+                break
+            entries.extend(response[0][1])
+
+        entry_ids = []
+        customer_ids = set()
+        for entry_id, fields in entries:
+            entry_ids.append(entry_id)
+            # Deleted entries are claimed with no fields
+            if fields and fields.get('customer_ids'):
+                customer_ids.update(int(customer_id) for customer_id in fields['customer_ids'].split(','))
+        return entry_ids, customer_ids
+
+    @staticmethod
+    def consume(consumer, window=None, batch_size=None):
+        """
+        Drain one window of events: recompute every distinct customer once,
+        in batches, then acknowledge and delete the entries. Returns
+        {'events': ..., 'customers': ...}.
+        """
+        window = window if window is not None else settings.CREDIT_SCORE_EVENTS_WINDOW
+        batch_size = batch_size or settings.CREDIT_SCORE_EVENTS_BATCH_SIZE
+        ScoreEventService.ensure_group()
+        entry_ids, customer_ids = ScoreEventService.read_window(consumer, window)
+        if not entry_ids:
+            return {'events': 0, 'customers': 0}
+
+        customer_ids = sorted(customer_ids)
+        for start in range(0, len(customer_ids), batch_size):
+            CreditScoreService.recompute_scores(customer_ids[start:start + batch_size])
+
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.xack(ScoreEventService.STREAM_KEY, ScoreEventService.GROUP, *entry_ids)
+        pipe.xdel(ScoreEventService.STREAM_KEY, *entry_ids)
+        pipe.execute()
+        return {'events': len(entry_ids), 'customers': len(customer_ids)}
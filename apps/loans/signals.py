@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.loans.models import Loan
+from apps.loans.services.score_events import ScoreEventService
+
+@receiver(post_save, sender=Loan)
+@receiver(post_delete, sender=Loan)
+def publish_loan_change(sender, instance, **kwargs):
+    """A saved or deleted loan changes its customer's score; recomputed by the event consumer."""
+    ScoreEventService.publish_on_commit([instance.customer_id])
@@ -0,0 +1,44 @@
+from celery import shared_task
+from apps.loans.services.credit_score import CreditScoreService
+from apps.loans.services.score_events import ScoreEventService
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task(bind=True)
+def warm_credit_score_cache(self, start_id=None, end_id=None, chunk_size=None, resume=True):
+    """
+    Precompute credit scores into Redis, reporting progress through the task state.
+    Re-running after a failure resumes from the last completed chunk.
+    """
+    def report_progress(processed, total):
+        self.update_state(state='PROGRESS', meta={'processed': processed, 'total': total})
+        logger.info(f"Credit score warmup: {processed}/{total} customers")
+
+    try:
+        result = CreditScoreService.warm_cache(
+            start_id=start_id,
+            end_id=end_id,
+            chunk_size=chunk_size,
+            resume=resume,
+            progress_callback=report_progress
+        )
+        summary = f"Credit Score Warmup Complete. {result}"
+        logger.info(summary)
+        return summary
+    except Exception as e:
+        logger.error(f"Fatal error in credit score warmup: {e}")
+        return f"Failed: {e}"
+
+@shared_task(bind=True, ignore_result=True)
+def recompute_changed_scores(self):
+    """
+    Scheduled every CREDIT_SCORE_EVENTS_WINDOW seconds by celery beat:
+    recompute the scores of customers whose loans changed since the last run.
+    """
+    if not ScoreEventService.enabled():
+        return None
+    result = ScoreEventService.consume(consumer=self.request.hostname or 'local')
+    if result['events']:
+        logger.info(f"Recomputed {result['customers']} credit scores from {result['events']} change events")
+    return result
@@ -1,14 +1,42 @@
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from datetime import date, timedelta
+from django.utils.http import http_date
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from apps.customers.models import Customer
-from apps.loans.models import Loan
-from apps.loans.services.credit_score import CreditScoreService
+from apps.loans.models import Loan, LoanPayment, CustomerLoanSummary
+from apps.loans.services.credit_score import CreditScoreService, local_cache
+from apps.loans.services.score_cache import LocalScoreCache
+from unittest import skipUnless
+from config.redis_client import CircuitOpenError, create_redis_client
 from apps.loans.services.interest import InterestService
 from apps.loans.services.loan_service import LoanService
+from apps.loans.services.loan_summary import LoanSummaryService
+from apps.loans.services.payments import PaymentService
+from apps.loans.services.response_cache import LoanResponseCache
+from apps.loans.services.score_events import ScoreEventService
+from apps.loans.serializers import CustomerLoanListSerializer, LoanDetailSerializer
+from config.instrumentation import REQUEST_DURATION
+from config.metrics import Registry
+from config.parsers import ORJSONParser
+from config.renderers import ORJSONRenderer
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import asyncio
+import io
+import json
 import redis
 import os
+import threading
+import time
 
 # Redis connection for testing
 redis_client = redis.Redis(
@@ -18,6 +46,15 @@ redis_client = redis.Redis(
     decode_responses=True
 )
 
+def clear_cached_score(customer_id):
+    """Drop any score (and breakdown) cached by a previous test that reused this customer_id."""
+    try:
+        redis_client.delete(
+            CreditScoreService.get_cache_key(customer_id), CreditScoreService.get_breakdown_key(customer_id)
+        )
+    except Exception:
+        pass
+
 class EMICalculationTests(TestCase):
     """
     Validates the core financial math (EMI Calculation).
@@ -41,6 +78,89 @@ class EMICalculationTests(TestCase):
         # Allow small precision difference
         self.assertAlmostEqual(emi, Decimal('8884.88'), delta=Decimal('0.05'), msg="EMI for 1L/12%/1yr should be roughly 8884.88")
 
+    def test_vectorized_emi_matches_scalar(self):
+        """Batch EMIs must equal the scalar results to the paisa, edge cases included."""
+        principals, rates, tenures = [], [], []
+        for principal in [Decimal('1000'), Decimal('99999.99'), Decimal('100000'), Decimal('2500000.50')]:
+            for rate in [Decimal('0'), Decimal('8.5'), Decimal('12'), Decimal('24.99')]:
+                for tenure in [0, 1, 7, 12, 60, 360]:
+                    principals.append(principal)
+                    rates.append(rate)
+                    tenures.append(tenure)
+
+        batch = InterestService.calculate_monthly_installments(principals, rates, tenures)
+        scalar = [
+            InterestService.calculate_monthly_installment(p, r, n)
+            for p, r, n in zip(principals, rates, tenures)
+        ]
+        self.assertEqual(batch, scalar)
+        self.assertEqual([str(emi) for emi in batch], [str(emi) for emi in scalar])
+
+class AmortizationScheduleTests(TestCase):
+    """
+    Validates the amortization schedule and the streamed schedule endpoint.
+    """
+    def setUp(self):
+        InterestService._schedule_cache.clear()
+
+    def test_schedule_repays_principal(self):
+        rows = list(InterestService.amortization_schedule(Decimal('100000'), Decimal('10'), 12))
+        emi = InterestService.calculate_monthly_installment(100000, 10, 12)
+        self.assertEqual([row.month for row in rows], list(range(1, 13)))
+        self.assertEqual(rows[0].interest, Decimal('833.33'))
+        self.assertTrue(all(row.emi == emi for row in rows[:-1]))
+        self.assertEqual(sum(row.principal for row in rows), Decimal('100000'))
+        self.assertEqual(rows[-1].balance, 0)
+        # Zero interest: equal principal-only installments
+        rows = list(InterestService.amortization_schedule(1200, 0, 12))
+        self.assertEqual({row.emi for row in rows}, {Decimal('100.00')})
+        self.assertEqual(list(InterestService.amortization_schedule(1000, 10, 0)), [])
+
+    def test_schedule_is_cached_per_terms(self):
+        first = list(InterestService.amortization_schedule(Decimal('50000.00'), Decimal('12.00'), 24))
+        with mock.patch.object(InterestService, '_generate_schedule') as generate:
+            again = list(InterestService.amortization_schedule(50000, 12, 24))
+        generate.assert_not_called()
+        self.assertEqual(again, first)
+
+        # A partially consumed schedule is not cached
+        next(InterestService.amortization_schedule(1000, 8, 6))
+        self.assertNotIn((Decimal(1000), Decimal(8), 6), InterestService._schedule_cache)
+
+    def test_schedule_endpoint_streams_ndjson_and_csv(self):
+        customer = Customer.objects.create(
+            first_name="Schedule", last_name="Tester", phone_number="9999888877",
+            monthly_salary=100000, approved_limit=3600000, age=30
+        )
+        loan = Loan.objects.create(
+            customer=customer, loan_amount=100000, tenure=12, interest_rate=10,
+            monthly_repayment=8791.59, end_date=date.today() + timedelta(days=360), status='APPROVED'
+        )
+        url = reverse('view-loan-schedule', args=[loan.loan_id])
+
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(lines), 12)
+        self.assertEqual(lines[0], {
+            'month': 1, 'due_date': (date.today() + timedelta(days=30)).isoformat(),
+            'emi': '8791.59', 'principal': '7958.26', 'interest': '833.33', 'balance': '92041.74',
+        })
+        self.assertEqual(lines[-1]['balance'], '0.00')
+
+        response = self.client.get(url, HTTP_ACCEPT='text/csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        csv_lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(csv_lines[0], 'month,due_date,emi,principal,interest,balance')
+        self.assertEqual(len(csv_lines), 13)
+        self.assertEqual(self.client.get(f"{url}?format=csv")['Content-Type'], 'text/csv; charset=utf-8')
+
+        response = self.client.get(reverse('view-loan-schedule', args=[999999]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.content), {'detail': 'No Loan matches the given query.'})
+
+
 class CreditScoreTests(TestCase):
     """
     Validates the transparent credit score algorithm (0-100).
@@ -52,6 +172,7 @@ class CreditScoreTests(TestCase):
             phone_number="9999999999", monthly_salary=50000,
             approved_limit=500000, age=30
         )
+        clear_cached_score(self.customer.customer_id)
 
     def test_score_zero_for_high_debt(self):
         """If current_debt > approved_limit, score must be 0."""
@@ -94,6 +215,44 @@ class CreditScoreTests(TestCase):
         # Repayment (35) + Volume/Activity (9) = 44.
         self.assertTrue(score > 40, f"Score {score} should be > 40 for a fully paid loan (Got {score})")
 
+    def test_score_components_from_single_query(self):
+        """A cache miss must compute every component with exactly one query."""
+        today = date.today()
+        Loan.objects.create(
+            customer=self.customer, loan_amount=200000, tenure=12,
+            interest_rate=10, monthly_repayment=17583, emis_paid_on_time=6,
+            end_date=today + timedelta(days=180), status='APPROVED'
+        )
+        Loan.objects.create(
+            customer=self.customer, loan_amount=100000, tenure=12,
+            interest_rate=10, monthly_repayment=8792, emis_paid_on_time=12,
+            end_date=today - timedelta(days=10), status='PAID'
+        )
+        clear_cached_score(self.customer.customer_id)
+
+        with self.assertNumQueries(1):
+            aggregates = CreditScoreService.get_score_aggregates(self.customer.customer_id)
+
+        self.assertEqual(aggregates['loan_count'], 2)
+        self.assertEqual(aggregates['loans_this_year'], 2)
+        self.assertEqual(aggregates['total_tenure'], 24)
+        self.assertEqual(aggregates['emis_paid_on_time'], 18)
+        self.assertEqual(aggregates['current_debt'], Decimal('200000'))
+        self.assertEqual(aggregates['approved_volume'], Decimal('300000'))
+        self.assertEqual(aggregates['approved_limit'], 500000)
+
+        # With a loan summary the same components come from one row
+        LoanSummaryService.rebuild([self.customer.customer_id])
+        with self.assertNumQueries(1):
+            summary_aggregates = LoanSummaryService.get_score_aggregates(self.customer.customer_id)
+        self.assertEqual(summary_aggregates, aggregates)
+
+        # Repayment 18/24*35 + Count 2/10*20 + Activity 2/3*20 + Volume 0.3*25
+        # = 26.25 + 4 + 13.33 + 7.5 = 51.08
+        with self.assertNumQueries(1):
+            score = CreditScoreService.calculate_credit_score(self.customer.customer_id)
+        self.assertEqual(score, 51)
+
 class LoanEligibilityTests(TestCase):
     """
     Validates business rules for loan approval.
@@ -104,6 +263,7 @@ class LoanEligibilityTests(TestCase):
             phone_number="8888888888", monthly_salary=100000, # 1L Salary
             approved_limit=3600000, age=30
         )
+        clear_cached_score(self.customer.customer_id)
         # Salary 1L -> Max EMI allowed = 50k
 
     def test_reject_if_emi_exceeds_salary_cap(self):
@@ -164,6 +324,7 @@ class LoanAPITests(TestCase):
             phone_number="1231231234", monthly_salary=80000,
             approved_limit=2800000, age=28
         )
+        clear_cached_score(self.customer.customer_id)
 
     def test_create_loan_success(self):
         data = {
@@ -196,6 +357,127 @@ class LoanAPITests(TestCase):
         self.assertIsNotNone(response.data.get('loan_id'))
 
 
+class BatchEligibilityTests(TestCase):
+    """
+    Validates the batch eligibility path used by the partner channel.
+    """
+    def setUp(self):
+        self.customers = []
+        for i in range(3):
+            customer = Customer.objects.create(
+                first_name=f"Batch{i}", last_name="User",
+                phone_number=f"70000000{i:02d}", monthly_salary=100000,
+                approved_limit=3600000, age=30
+            )
+            Loan.objects.create(
+                customer=customer, loan_amount=100000 * (i + 1), tenure=12,
+                interest_rate=10, monthly_repayment=5000, emis_paid_on_time=12,
+                end_date=date.today() + timedelta(days=90), status='APPROVED'
+            )
+            clear_cached_score(customer.customer_id)
+            self.customers.append(customer)
+        LoanSummaryService.rebuild([c.customer_id for c in self.customers])
+
+    def test_batch_matches_single_checks_with_constant_queries(self):
+        applications = [
+            {'customer_id': c.customer_id, 'loan_amount': Decimal('50000'),
+             'interest_rate': Decimal('10'), 'tenure': 12}
+            for c in self.customers
+        ]
+        # Customers with their loan summaries, then the score aggregates
+        with self.assertNumQueries(2):
+            results = LoanService.check_eligibility_batch(applications)
+
+        for application, result in zip(applications, results):
+            expected = LoanService.check_eligibility(**application)
+            self.assertEqual(result, expected)
+
+    def test_batch_endpoint_keeps_order_and_isolates_errors(self):
+        payload = [
+            {'customer_id': self.customers[1].customer_id, 'loan_amount': 50000, 'interest_rate': 10, 'tenure': 12},
+            {'customer_id': 999999, 'loan_amount': 50000, 'interest_rate': 10, 'tenure': 12},
+            {'customer_id': self.customers[0].customer_id, 'loan_amount': 'abc', 'interest_rate': 10, 'tenure': 12},
+            {'customer_id': self.customers[0].customer_id, 'loan_amount': 50000, 'interest_rate': 10, 'tenure': 12},
+        ]
+        response = self.client.post(reverse('check-eligibility-batch'), payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        results = response.data['results']
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0]['customer_id'], self.customers[1].customer_id)
+        self.assertIn('approval', results[0])
+        self.assertIn('customer_id', results[1]['errors'])
+        self.assertIn('loan_amount', results[2]['errors'])
+        self.assertEqual(results[3]['customer_id'], self.customers[0].customer_id)
+        self.assertIn('approval', results[3])
+
+
+class LoanSummaryTests(TestCase):
+    """
+    Validates the per-customer loan summary against the Loan table.
+    """
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Summary", last_name="Tester",
+            phone_number="9000011111", monthly_salary=100000,
+            approved_limit=3600000, age=30
+        )
+        Loan.objects.create(
+            customer=self.customer, loan_amount=100000, tenure=12,
+            interest_rate=10, monthly_repayment=8792, emis_paid_on_time=6,
+            end_date=date.today() + timedelta(days=180), status='APPROVED'
+        )
+        clear_cached_score(self.customer.customer_id)
+        LoanSummaryService.rebuild([self.customer.customer_id])
+
+    def test_create_loan_keeps_summary_in_sync(self):
+        result = LoanService.create_loan(self.customer.customer_id, 50000, 12, 12)
+        self.assertTrue(result['loan_approved'])
+
+        summary = CustomerLoanSummary.objects.get(customer=self.customer)
+        self.assertEqual(summary.loan_count, 2)
+        self.assertEqual(summary.active_principal, Decimal('150000'))
+        self.assertEqual(LoanSummaryService.verify([self.customer.customer_id]), [])
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.current_debt, Decimal('150000'))
+
+    def test_verify_reports_drift_and_rebuild_repairs_it(self):
+        # Written behind LoanService's back, so the summary is not updated
+        Loan.objects.create(
+            customer=self.customer, loan_amount=40000, tenure=6,
+            interest_rate=10, monthly_repayment=6862, emis_paid_on_time=0,
+            end_date=date.today() + timedelta(days=90), status='APPROVED'
+        )
+        drifted_fields = {field for _, field, _, _ in LoanSummaryService.verify([self.customer.customer_id])}
+        self.assertIn('loan_count', drifted_fields)
+        self.assertIn('active_emi_sum', drifted_fields)
+
+        LoanSummaryService.rebuild([self.customer.customer_id])
+        self.assertEqual(LoanSummaryService.verify([self.customer.customer_id]), [])
+
+    def test_stale_active_emis_are_recomputed(self):
+        summary = CustomerLoanSummary.objects.get(customer=self.customer)
+        summary.active_emi_valid_until = date.today() - timedelta(days=1)
+        summary.active_emi_sum = Decimal('1')
+        summary.save()
+
+        customer = Customer.objects.select_related('loan_summary').get(customer_id=self.customer.customer_id)
+        # Read-only: one aggregate over the loans, no locks or rebuild
+        with self.assertNumQueries(1):
+            self.assertEqual(LoanService.get_current_emis(customer), Decimal('8792'))
+        self.assertEqual(CustomerLoanSummary.objects.get(customer=self.customer).active_emi_sum, Decimal('1'))
+        result = LoanService.check_eligibility_batch([{
+            'customer_id': self.customer.customer_id, 'loan_amount': 10000, 'interest_rate': 12, 'tenure': 12
+        }])
+        self.assertTrue(result[0]['approval'])
+
+        call_command('loan_summaries', 'rebuild', '--stale', stdout=io.StringIO())
+        summary = CustomerLoanSummary.objects.get(customer=self.customer)
+        self.assertEqual(summary.active_emi_sum, Decimal('8792'))
+        self.assertFalse(LoanSummaryService.is_stale(summary))
+
+
 class CreditScoreCachingTests(TestCase):
     """
     Validates Redis caching for credit score calculations.
@@ -207,11 +489,7 @@ class CreditScoreCachingTests(TestCase):
             approved_limit=500000, age=30
         )
         # Clear cache before each test
-        try:
-            cache_key = CreditScoreService.get_cache_key(self.customer.customer_id)
-            redis_client.delete(cache_key)
-        except Exception:
-            pass
+        clear_cached_score(self.customer.customer_id)
 
     def test_credit_score_caching(self):
         """
@@ -264,3 +542,1118 @@ class CreditScoreCachingTests(TestCase):
             self.assertIsNone(cached_score_after, "Cache should be cleared after invalidation")
         except Exception:
             self.skipTest("Redis not available for cache invalidation test")
+
+    def test_warm_cache_precomputes_scores(self):
+        """
+        Verify that the warm-up job caches every customer's score and
+        resumes after the checkpointed customer_id.
+        """
+        other = Customer.objects.create(
+            first_name="Warm", last_name="Tester",
+            phone_number="9999888866", monthly_salary=50000,
+            approved_limit=500000, age=30
+        )
+        Loan.objects.create(
+            customer=other, loan_amount=100000, tenure=12,
+            interest_rate=10, monthly_repayment=8792, emis_paid_on_time=12,
+            end_date=date.today() + timedelta(days=30), status='APPROVED'
+        )
+        customer_ids = [self.customer.customer_id, other.customer_id]
+        try:
+            for customer_id in customer_ids:
+                redis_client.delete(CreditScoreService.get_cache_key(customer_id))
+            # Pretend an earlier run stopped after the first customer
+            checkpoint_key = CreditScoreService.get_warm_checkpoint_key()
+            redis_client.set(checkpoint_key, self.customer.customer_id)
+
+            progress = []
+            result = CreditScoreService.warm_cache(
+                chunk_size=1, progress_callback=lambda done, total: progress.append((done, total))
+            )
+
+            self.assertEqual(result['cached'], 1, "Resumed run should only score customers after the checkpoint")
+            self.assertEqual(progress, [(2, 2)])
+            self.assertIsNone(redis_client.get(CreditScoreService.get_cache_key(self.customer.customer_id)))
+            cached_score = redis_client.get(CreditScoreService.get_cache_key(other.customer_id))
+            self.assertEqual(int(cached_score), CreditScoreService.score_from_aggregates(
+                CreditScoreService.get_score_aggregates(other.customer_id)
+            ))
+            ttl = redis_client.ttl(CreditScoreService.get_cache_key(other.customer_id))
+            self.assertGreater(ttl, CreditScoreService.cache_ttl() - 5)
+            self.assertIsNone(redis_client.get(checkpoint_key), "Checkpoint should be cleared on completion")
+        except redis.exceptions.ConnectionError:
+            self.skipTest("Redis not available for cache warmup test")
+
+    def test_warm_cache_drops_scores_of_over_limit_customers(self):
+        customer_id = self.customer.customer_id
+        Loan.objects.create(
+            customer=self.customer, loan_amount=600000, tenure=12,
+            interest_rate=10, monthly_repayment=52000, emis_paid_on_time=0,
+            end_date=date.today() + timedelta(days=300), status='APPROVED'
+        )
+        try:
+            redis_client.set(CreditScoreService.get_cache_key(customer_id), 80)
+            redis_client.hset(CreditScoreService.get_breakdown_key(customer_id), 'repayment', '{}')
+
+            result = CreditScoreService.warm_cache(start_id=customer_id, end_id=customer_id, resume=False)
+        except redis.exceptions.ConnectionError:
+            self.skipTest("Redis not available for cache warmup test")
+
+        self.assertEqual(result['cached'], 0)
+        self.assertIsNone(redis_client.get(CreditScoreService.get_cache_key(customer_id)))
+        self.assertFalse(redis_client.exists(CreditScoreService.get_breakdown_key(customer_id)))
+        self.assertEqual(CreditScoreService.calculate_credit_score(customer_id), 0)
+
+
+class ScoreBreakdownTests(TestCase):
+    """
+    Validates the cached score breakdown, its delta updates and /credit-score.
+    """
+    def setUp(self):
+        try:
+            redis_client.ping()
+        except Exception:
+            self.skipTest("Redis not available for breakdown tests")
+        self.customer = Customer.objects.create(
+            first_name="Breakdown", last_name="Tester",
+            phone_number="9999777766", monthly_salary=100000,
+            approved_limit=500000, age=30
+        )
+        today = date.today()
+        Loan.objects.create(
+            customer=self.customer, loan_amount=200000, tenure=12,
+            interest_rate=10, monthly_repayment=17583, emis_paid_on_time=6,
+            end_date=today + timedelta(days=180), status='APPROVED'
+        )
+        Loan.objects.create(
+            customer=self.customer, loan_amount=100000, tenure=12,
+            interest_rate=10, monthly_repayment=8792, emis_paid_on_time=12,
+            end_date=today - timedelta(days=10), status='PAID'
+        )
+        LoanSummaryService.rebuild([self.customer.customer_id])
+        clear_cached_score(self.customer.customer_id)
+
+    def test_score_is_derived_from_cached_breakdown(self):
+        customer_id = self.customer.customer_id
+        score = CreditScoreService.calculate_credit_score(customer_id)
+        breakdown = CreditScoreService.get_cached_breakdown(customer_id)
+        self.assertEqual(CreditScoreService.score_from_breakdown(breakdown), score)
+        self.assertEqual(score, CreditScoreService.score_from_aggregates(CreditScoreService.get_score_aggregates(customer_id)))
+
+        # Score key gone, breakdown cached: no query to rebuild the score
+        redis_client.delete(CreditScoreService.get_cache_key(customer_id))
+        with self.assertNumQueries(0):
+            self.assertEqual(CreditScoreService.calculate_credit_score(customer_id), score)
+        self.assertEqual(int(redis_client.get(CreditScoreService.get_cache_key(customer_id))), score)
+
+    def test_endpoint_returns_components(self):
+        customer_id = self.customer.customer_id
+        response = self.client.get(reverse('credit-score', args=[customer_id]))
+        self.assertEqual(response.status_code, 200)
+        # Repayment 18/24*35 + Count 2/10*20 + Activity 2/3*20 + Volume 0.3*25 = 51.08
+        self.assertEqual(response.data['credit_score'], 51)
+        components = response.data['components']
+        self.assertEqual(components['repayment'], {
+            'emis_paid_on_time': 18, 'total_tenure': 24, 'points': 26.25, 'weight': 35,
+        })
+        self.assertEqual(components['count']['points'], 4.0)
+        self.assertEqual(components['activity']['points'], 13.33)
+        self.assertEqual(components['volume']['approved_volume'], '300000.00')
+        self.assertEqual(response.data['debt_overload'], {
+            'current_debt': '200000.00', 'approved_limit': 500000, 'over_limit': False,
+        })
+
+        # Cached: only the customer existence check
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(reverse('credit-score', args=[customer_id])).data, response.data)
+        self.assertEqual(self.client.get(reverse('credit-score', args=[999999])).status_code, 404)
+
+    def test_new_loan_updates_only_touched_components(self):
+        customer_id = self.customer.customer_id
+        CreditScoreService.get_score_breakdown(customer_id)
+        breakdown_key = CreditScoreService.get_breakdown_key(customer_id)
+        # Marker: components are updated from their cached values, not re-read from the database
+        redis_client.hset(breakdown_key, 'debt_overload', json.dumps({
+            'current_debt': '200000.00', 'approved_limit': 900000, 'over_limit': False,
+        }))
+
+        with mock.patch.object(CreditScoreService, 'compute_breakdown') as compute:
+            result = LoanService.create_loan(customer_id, Decimal('50000'), Decimal('14'), 12)
+        self.assertTrue(result['loan_approved'])
+        compute.assert_not_called()
+
+        cached = CreditScoreService.get_cached_breakdown(customer_id)
+        fresh = CreditScoreService.compute_breakdown(customer_id)
+        for component in ('repayment', 'count', 'activity', 'volume'):
+            self.assertEqual(cached[component], fresh[component])
+        self.assertEqual(cached['debt_overload']['approved_limit'], 900000)
+        self.assertEqual(cached['debt_overload']['current_debt'], '250000.00')
+        self.assertEqual(
+            int(redis_client.get(CreditScoreService.get_cache_key(customer_id))),
+            CreditScoreService.score_from_breakdown(fresh)
+        )
+
+    def test_out_of_step_breakdown_is_dropped(self):
+        customer_id = self.customer.customer_id
+        CreditScoreService.calculate_credit_score(customer_id)
+        loan = Loan.objects.filter(customer=self.customer).first()
+        # The cached breakdown already counts 2 loans, so a loan bringing the count to 4 cannot be folded in
+        CreditScoreService.apply_new_loan(loan, loan_count=4)
+        self.assertFalse(redis_client.exists(CreditScoreService.get_breakdown_key(customer_id)))
+        self.assertIsNone(redis_client.get(CreditScoreService.get_cache_key(customer_id)))
+
+    def test_breakdown_from_an_earlier_year_is_a_miss(self):
+        customer_id = self.customer.customer_id
+        breakdown = CreditScoreService.get_score_breakdown(customer_id)
+        breakdown['activity']['year'] -= 1
+        CreditScoreService.cache_breakdown(customer_id, breakdown)
+        self.assertIsNone(CreditScoreService.get_cached_breakdown(customer_id))
+
+
+@override_settings(CREDIT_SCORE_EVENTS=True)
+class ScoreEventTests(TestCase):
+    """
+    Validates event-driven score recomputation (change stream + batched consumer).
+    """
+    def setUp(self):
+        try:
+            redis_client.delete(ScoreEventService.STREAM_KEY)
+        except Exception:
+            self.skipTest("Redis not available for score event tests")
+        self.customers = [
+            Customer.objects.create(
+                first_name="Event", last_name=f"Tester{i}",
+                phone_number=f"999955550{i}", monthly_salary=100000,
+                approved_limit=500000, age=30
+            )
+            for i in range(3)
+        ]
+        for customer in self.customers:
+            clear_cached_score(customer.customer_id)
+
+    def add_loan(self, customer, **fields):
+        values = dict(
+            customer=customer, loan_amount=100000, tenure=12,
+            interest_rate=10, monthly_repayment=8792, emis_paid_on_time=6,
+            end_date=date.today() + timedelta(days=180), status='APPROVED'
+        )
+        values.update(fields)
+        return Loan.objects.create(**values)
+
+    def published_ids(self):
+        return [
+            [int(customer_id) for customer_id in fields['customer_ids'].split(',')]
+            for _, fields in redis_client.xrange(ScoreEventService.STREAM_KEY)
+        ]
+
+    def test_loan_changes_are_published_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            loan = self.add_loan(self.customers[0])
+        self.assertEqual(self.published_ids(), [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.published_ids(), [[self.customers[0].customer_id]])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            loan.delete()
+        self.assertEqual(len(self.published_ids()), 2)
+
+    def test_consumer_deduplicates_and_recomputes_in_batches(self):
+        first, second, third = (customer.customer_id for customer in self.customers)
+        for customer in self.customers:
+            self.add_loan(customer, emis_paid_on_time=12)
+        # Scores cached before an update that bypasses the ORM hooks
+        stale = CreditScoreService.calculate_credit_score(first)
+        Loan.objects.filter(customer_id=first).update(emis_paid_on_time=0)
+        LoanSummaryService.rebuild([first])
+        ScoreEventService.publish([first, second])
+        ScoreEventService.publish([second, third])
+
+        with mock.patch.object(
+            CreditScoreService, 'recompute_scores', wraps=CreditScoreService.recompute_scores
+        ) as recompute:
+            result = ScoreEventService.consume('test-consumer', window=1, batch_size=2)
+
+        self.assertEqual(result, {'events': 2, 'customers': 3})
+        self.assertEqual([call.args[0] for call in recompute.call_args_list], [[first, second], [third]])
+        self.assertEqual(redis_client.xlen(ScoreEventService.STREAM_KEY), 0)
+
+        fresh = CreditScoreService.score_from_aggregates(CreditScoreService.get_score_aggregates(first))
+        self.assertLess(fresh, stale)
+        cache_key = CreditScoreService.get_cache_key(first)
+        self.assertEqual(int(redis_client.get(cache_key)), fresh)
+        # Kept current by events, so only the long safety-net expiry
+        self.assertGreater(redis_client.ttl(cache_key), 0)
+        self.assertLessEqual(redis_client.ttl(cache_key), CreditScoreService.EVENTS_CACHE_TTL)
+        self.assertGreater(redis_client.ttl(CreditScoreService.get_breakdown_key(first)), 0)
+        self.assertEqual(ScoreEventService.consume('test-consumer', window=1), {'events': 0, 'customers': 0})
+
+    def test_scores_expire_by_the_end_of_the_year(self):
+        self.assertEqual(CreditScoreService.cache_ttl(), CreditScoreService.EVENTS_CACHE_TTL)
+        with mock.patch('apps.loans.services.credit_score.datetime', wraps=datetime) as clock:
+            clock.now.return_value = datetime(2025, 12, 31, 23, 0)
+            # Last year's activity component must not outlive the rollover
+            self.assertEqual(CreditScoreService.cache_ttl(), 3600)
+            with self.settings(CREDIT_SCORE_EVENTS=False):
+                self.assertEqual(CreditScoreService.cache_ttl(), 3600)
+            clock.now.return_value = datetime(2025, 6, 1)
+            self.assertEqual(CreditScoreService.cache_ttl(), CreditScoreService.EVENTS_CACHE_TTL)
+
+    def test_entries_of_a_dead_consumer_are_claimed(self):
+        customer_id = self.customers[0].customer_id
+        ScoreEventService.ensure_group()
+        ScoreEventService.publish([customer_id])
+        # Read but never acknowledged
+        redis_client.xreadgroup(ScoreEventService.GROUP, 'dead-consumer', {ScoreEventService.STREAM_KEY: '>'})
+
+        with mock.patch.object(ScoreEventService, 'CLAIM_IDLE_MS', 0):
+            result = ScoreEventService.consume('test-consumer', window=1)
+        self.assertEqual(result, {'events': 1, 'customers': 1})
+        self.assertIsNotNone(redis_client.get(CreditScoreService.get_cache_key(customer_id)))
+
+
+class LoanPaymentTests(TestCase):
+    """
+    Validates the repayment ledger, /loans/<id>/payments and the settlement upload.
+    """
+    def setUp(self):
+        self.client = Client()
+        self.customer = Customer.objects.create(
+            first_name="Payment", last_name="Tester",
+            phone_number="9999666600", monthly_salary=100000,
+            approved_limit=500000, age=30
+        )
+        clear_cached_score(self.customer.customer_id)
+        self.start = date.today() - timedelta(days=100)
+
+    def add_loan(self, **fields):
+        values = dict(
+            customer=self.customer, loan_amount=30000, tenure=3,
+            interest_rate=10, monthly_repayment=10200, emis_paid_on_time=0,
+            end_date=self.start + timedelta(days=90), status='APPROVED'
+        )
+        values.update(fields)
+        loan = Loan.objects.create(**values)
+        Loan.objects.filter(loan_id=loan.loan_id).update(start_date=self.start)
+        return loan
+
+    def pay(self, loan, days, **fields):
+        payload = {'amount': '10200.00', 'paid_on': (self.start + timedelta(days=days)).isoformat()}
+        payload.update(fields)
+        return self.client.post(
+            reverse('loan-payments', args=[loan.loan_id]), payload, content_type='application/json'
+        )
+
+    def test_payments_settle_installments_until_paid(self):
+        loan = self.add_loan()
+        LoanSummaryService.rebuild([self.customer.customer_id])
+        score_key = CreditScoreService.get_cache_key(self.customer.customer_id)
+        redis_client.set(score_key, 50)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.pay(loan, 20)
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((first.json()['installment'], first.json()['on_time']), (1, True))
+        self.assertIsNone(redis_client.get(score_key))
+
+        # Installment 2 is due on day 60
+        late = self.pay(loan, 70)
+        self.assertEqual((late.json()['installment'], late.json()['on_time']), (2, False))
+        last = self.pay(loan, 90)
+        self.assertEqual((last.json()['installment'], last.json()['loan_status']), (3, 'PAID'))
+        self.assertEqual(self.pay(loan, 95).status_code, 400)
+
+        loan.refresh_from_db()
+        self.assertEqual((loan.emis_paid_on_time, loan.status), (2, 'PAID'))
+        self.assertEqual(CustomerLoanSummary.objects.get(customer=self.customer).emis_paid_on_time, 2)
+        ledger = self.client.get(reverse('loan-payments', args=[loan.loan_id])).json()
+        self.assertEqual([payment['installment'] for payment in ledger['payments']], [1, 2, 3])
+        self.assertEqual(ledger['status'], 'PAID')
+
+    def test_repayments_left_follow_the_ledger(self):
+        # Ingested history: 1 EMI paid on time, no ledger rows
+        loan = self.add_loan(tenure=4, emis_paid_on_time=1)
+        url = reverse('view-loans-by-customer', args=[self.customer.customer_id])
+        self.assertEqual(self.client.get(url).data['results'][0]['repayments_left'], 3)
+
+        # Installment 2 (due on day 60) on time, installment 3 (due on day 90) late
+        self.pay(loan, 50)
+        self.pay(loan, 95)
+        self.assertEqual(self.client.get(url).data['results'][0]['repayments_left'], 1)
+        self.assertEqual(self.client.get(f"{url}?cursor=").data['results'][0]['repayments_left'], 1)
+
+        self.pay(loan, 99)
+        self.assertEqual(self.client.get(url).data['results'][0]['repayments_left'], 0)
+        # PAID loans have nothing left, whatever their EMI counts say
+        Loan.objects.filter(loan_id=loan.loan_id).update(status='PAID', emis_paid_on_time=0)
+        loans = Loan.objects.filter(loan_id=loan.loan_id)
+        self.assertEqual(CustomerLoanListSerializer(loans, many=True).data[0]['repayments_left'], 0)
+
+    def test_partial_payment_settles_nothing(self):
+        loan = self.add_loan()
+        response = self.pay(loan, 20, amount='0.01')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['detail'], 'Amount 0.01 is below the monthly installment 10200.00')
+
+        summary = PaymentService.apply_batch([
+            {'loan_id': loan.loan_id, 'amount': Decimal('10199.99'), 'paid_on': self.start + timedelta(days=20)}
+            for _ in range(3)
+        ])
+        self.assertEqual((summary['success'], summary['failed']), (0, 3))
+        loan.refresh_from_db()
+        self.assertEqual((loan.emis_paid_on_time, loan.status), (0, 'APPROVED'))
+        self.assertFalse(LoanPayment.objects.filter(loan=loan).exists())
+
+    def test_repeated_reference_returns_the_recorded_payment(self):
+        loan = self.add_loan()
+        first = self.pay(loan, 20, reference='BANK-1')
+        again = self.pay(loan, 20, reference='BANK-1')
+        self.assertEqual((first.status_code, again.status_code), (201, 200))
+        self.assertEqual(again.json()['payment_id'], first.json()['payment_id'])
+        self.assertEqual(LoanPayment.objects.filter(loan=loan).count(), 1)
+        self.assertEqual(self.client.post(
+            reverse('loan-payments', args=[loan.loan_id + 1000]), {'amount': '1.00'}, content_type='application/json'
+        ).status_code, 404)
+
+    def test_batch_queries_do_not_grow_with_the_batch(self):
+        def rows(loans):
+            return [
+                {'loan_id': loan.loan_id, 'amount': Decimal('10200.00'), 'paid_on': self.start + timedelta(days=20)}
+                for loan in loans
+            ]
+
+        small_batch = rows([self.add_loan() for _ in range(2)])
+        large_batch = rows([self.add_loan() for _ in range(20)])
+        with CaptureQueriesContext(connection) as small:
+            PaymentService.apply_batch(small_batch)
+        with CaptureQueriesContext(connection) as large:
+            summary = PaymentService.apply_batch(large_batch)
+        self.assertEqual(summary['success'], 20)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+        self.assertEqual(Loan.objects.filter(customer=self.customer, emis_paid_on_time=1).count(), 22)
+
+    def test_reference_committed_concurrently_is_a_duplicate(self):
+        loan = self.add_loan(tenure=6)
+        recorded = self.pay(loan, 20, reference='BANK-7').json()
+        existing_references = PaymentService.existing_references
+        # The first read misses BANK-7, as if another request committed it right after
+        reads = []
+
+        def racing_read(references):
+            reads.append(references)
+            return set() if len(reads) == 1 else existing_references(references)
+
+        with mock.patch.object(PaymentService, 'existing_references', side_effect=racing_read):
+            again = self.pay(loan, 50, reference='BANK-7')
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.json()['payment_id'], recorded['payment_id'])
+
+        self.assertEqual(len(reads), 2)
+
+        reads.clear()
+        rows = [
+            {'loan_id': loan.loan_id, 'amount': Decimal('10200.00'), 'paid_on': self.start + timedelta(days=50), 'reference': reference}
+            for reference in ('BANK-8', 'BANK-7')
+        ]
+        with mock.patch.object(PaymentService, 'existing_references', side_effect=racing_read):
+            summary = PaymentService.apply_batch(rows)
+        self.assertEqual(len(reads), 2)
+        self.assertEqual((summary['success'], summary['duplicates'], summary['failed']), (1, 1, 0))
+        self.assertEqual(LoanPayment.objects.filter(loan=loan).count(), 2)
+
+    @override_settings(PAYMENT_SETTLEMENT_BATCH_SIZE=2)
+    def test_settlement_file_reports_per_row(self):
+        open_loan = self.add_loan()
+        paid_loan = self.add_loan(tenure=1)
+        rejected = self.add_loan(status='REJECTED')
+        day = (self.start + timedelta(days=20)).isoformat()
+        content = (
+            "loan_id,amount,paid_on,reference\n"
+            f"{open_loan.loan_id},10200.00,{day},S-1\n"
+            f"{paid_loan.loan_id},10200.00,{day},S-2\n"
+            f"{open_loan.loan_id},10200.00,{day},S-1\n"
+            f"{rejected.loan_id},10200.00,{day},S-3\n"
+            f"{open_loan.loan_id},abc,{day},S-4\n"
+        )
+        upload = io.BytesIO(content.encode())
+        upload.name = 'settlement.csv'
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('payment-settlement'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual(
+            {key: report[key] for key in ('total', 'success', 'duplicates', 'failed')},
+            {'total': 5, 'success': 2, 'duplicates': 1, 'failed': 2}
+        )
+        self.assertEqual([error.split(':')[0] for error in report['errors']], ['Row 3', 'Row 4'])
+        paid_loan.refresh_from_db()
+        self.assertEqual(paid_loan.status, 'PAID')
+
+        missing = io.BytesIO(b"loan_id,amount\n1,10\n")
+        missing.name = 'settlement.csv'
+        self.assertEqual(self.client.post(reverse('payment-settlement'), {'file': missing}).status_code, 400)
+
+
+@override_settings(CREDIT_SCORE_LOCAL_CACHE=True, CREDIT_SCORE_LOCAL_CACHE_SIZE=2, CREDIT_SCORE_LOCAL_CACHE_TTL=60)
+class LocalScoreCacheTests(TestCase):
+    """
+    Validates the in-process tier in front of Redis and its pub/sub invalidation.
+    """
+    def setUp(self):
+        try:
+            redis_client.ping()
+        except Exception:
+            self.skipTest("Redis not available for local cache tests")
+        self.customer = Customer.objects.create(
+            first_name="Local", last_name="Tester",
+            phone_number="9999777766", monthly_salary=50000,
+            approved_limit=500000, age=30
+        )
+        clear_cached_score(self.customer.customer_id)
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+        self.wait_for(lambda: local_cache._ensure_listener(), "invalidation listener never subscribed")
+
+    def wait_for(self, condition, message, timeout=2):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail(message)
+            time.sleep(0.01)
+
+    def test_repeat_checks_are_served_in_process_until_invalidated(self):
+        customer_id = self.customer.customer_id
+        cache_key = CreditScoreService.get_cache_key(customer_id)
+        before = CreditScoreService.get_cache_stats()
+
+        score = CreditScoreService.calculate_credit_score(customer_id)
+        with self.assertNumQueries(0):
+            self.assertEqual(CreditScoreService.calculate_credit_score(customer_id), score)
+
+        after = CreditScoreService.get_cache_stats()
+        self.assertEqual(after['local_hits'] - before['local_hits'], 1)
+        self.assertEqual(after['local_misses'] - before['local_misses'], 1)
+        self.assertEqual(after['redis_misses'] - before['redis_misses'], 1)
+
+        # An invalidation published by another process evicts the local entry
+        redis_client.publish(LocalScoreCache.CHANNEL, cache_key)
+        self.wait_for(lambda: local_cache.get(cache_key) is None, "invalidated score still served locally")
+
+    def test_local_tier_is_bounded_and_skips_values_read_before_an_invalidation(self):
+        generation = local_cache.generation()
+        local_cache.set('credit_score:a', 1, generation)
+        local_cache.set('credit_score:b', 2, generation)
+        local_cache.get('credit_score:a')
+        local_cache.set('credit_score:c', 3, generation)
+
+        # Size 2: the least recently used key goes
+        self.assertEqual(local_cache.get('credit_score:a'), 1)
+        self.assertIsNone(local_cache.get('credit_score:b'))
+
+        local_cache.evict('credit_score:c')
+        local_cache.set('credit_score:c', 3, generation)
+        self.assertIsNone(local_cache.get('credit_score:c'))
+
+
+class ScoreStampedeTests(TransactionTestCase):
+    """
+    Validates single-flight recomputation of a missing credit score.
+    Threads need committed rows, hence TransactionTestCase.
+    """
+    CALLERS = 8
+
+    def setUp(self):
+        try:
+            redis_client.ping()
+        except Exception:
+            self.skipTest("Redis not available for stampede tests")
+        self.customer = Customer.objects.create(
+            first_name="Stampede", last_name="Tester",
+            phone_number="9999666655", monthly_salary=50000,
+            approved_limit=500000, age=30
+        )
+        Loan.objects.create(
+            customer=self.customer, loan_amount=100000, tenure=12,
+            interest_rate=10, monthly_repayment=8792, emis_paid_on_time=12,
+            end_date=date.today() + timedelta(days=30), status='APPROVED'
+        )
+        clear_cached_score(self.customer.customer_id)
+        redis_client.delete(CreditScoreService.get_lock_key(self.customer.customer_id))
+
+    def test_simultaneous_misses_run_one_aggregation(self):
+        customer_id = self.customer.customer_id
+        aggregations = []
+        start = threading.Barrier(self.CALLERS)
+        get_score_aggregates = CreditScoreService.get_score_aggregates
+
+        def slow_aggregates(customer_id):
+            aggregations.append(customer_id)
+            time.sleep(0.2)  # Keep the computation in flight while the others miss
+            return get_score_aggregates(customer_id)
+
+        def check():
+            start.wait()
+            try:
+                return CreditScoreService.calculate_credit_score(customer_id)
+            finally:
+                connection.close()
+
+        with mock.patch.object(CreditScoreService, 'get_score_aggregates', side_effect=slow_aggregates):
+            with ThreadPoolExecutor(max_workers=self.CALLERS) as pool:
+                scores = list(pool.map(lambda _: check(), range(self.CALLERS)))
+
+        self.assertEqual(len(aggregations), 1)
+        self.assertEqual(len(set(scores)), 1)
+        self.assertEqual(int(redis_client.get(CreditScoreService.get_cache_key(customer_id))), scores[0])
+        self.assertFalse(redis_client.exists(CreditScoreService.get_lock_key(customer_id)))
+
+    async def test_async_caller_waits_on_the_event_loop(self):
+        customer_id = self.customer.customer_id
+        await sync_to_async(redis_client.set)(CreditScoreService.get_lock_key(customer_id), 'other-caller')
+
+        async def finish_elsewhere():
+            # The lock holder caches its result while the async caller is polling
+            await asyncio.sleep(0.1)
+            await sync_to_async(redis_client.set)(CreditScoreService.get_cache_key(customer_id), 640)
+
+        with mock.patch.object(CreditScoreService, 'wait_for_score', side_effect=AssertionError), \
+                mock.patch.object(CreditScoreService, 'recompute_score', side_effect=AssertionError):
+            score, _ = await asyncio.gather(CreditScoreService.acalculate_credit_score(customer_id), finish_elsewhere())
+
+        self.assertEqual(score, 640)
+        await sync_to_async(clear_cached_score)(customer_id)
+        await sync_to_async(redis_client.delete)(CreditScoreService.get_lock_key(customer_id))
+
+
+class RedisResilienceTests(TestCase):
+    """
+    Validates that a dead Redis trips the circuit breaker and scoring falls back to the database.
+    """
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Breaker", last_name="Tester",
+            phone_number="9999555544", monthly_salary=50000,
+            approved_limit=500000, age=30
+        )
+        Loan.objects.create(
+            customer=self.customer, loan_amount=100000, tenure=12,
+            interest_rate=10, monthly_repayment=8792, emis_paid_on_time=12,
+            end_date=date.today() + timedelta(days=30), status='APPROVED'
+        )
+        # Nothing listens on port 1, so every command fails to connect
+        self.dead_redis = create_redis_client(
+            port=1, retry_attempts=0, circuit_failure_threshold=2, circuit_cooldown=60
+        )
+
+    def test_circuit_opens_after_repeated_failures(self):
+        for _ in range(2):
+            with self.assertRaises(redis.exceptions.ConnectionError):
+                self.dead_redis.get('credit_score:1')
+        self.assertTrue(self.dead_redis.breaker.is_open)
+
+        with self.assertRaises(CircuitOpenError):
+            self.dead_redis.get('credit_score:1')
+        pipe = self.dead_redis.pipeline(transaction=False)
+        pipe.get('credit_score:1')
+        with self.assertRaises(CircuitOpenError):
+            pipe.execute()
+
+    def test_half_open_trial_closes_the_circuit(self):
+        client = create_redis_client(retry_attempts=0, circuit_failure_threshold=1, circuit_cooldown=0.05)
+        key = 'breaker-test'
+        try:
+            client.delete(key)
+        except redis.exceptions.ConnectionError:
+            self.skipTest("Redis not available for circuit breaker test")
+
+        # A pipelined trial closes the circuit, and later calls go through
+        client.breaker.record_failure()
+        time.sleep(0.06)
+        pipe = client.pipeline(transaction=False)
+        pipe.set(key, 'text')
+        self.assertEqual(pipe.execute(), [True])
+        self.assertFalse(client.breaker.is_open)
+        self.assertEqual(client.get(key), 'text')
+
+        # An error answered by the server also counts as a healthy trial
+        client.breaker.record_failure()
+        time.sleep(0.06)
+        with self.assertRaises(redis.exceptions.ResponseError):
+            client.incr(key)
+        self.assertFalse(client.breaker.is_open)
+        redis_client.delete(key)
+
+    def test_scores_are_computed_while_redis_is_down(self):
+        expected = CreditScoreService.score_from_aggregates(
+            CreditScoreService.get_score_aggregates(self.customer.customer_id)
+        )
+        with mock.patch('apps.loans.services.credit_score.redis_client', self.dead_redis):
+            for _ in range(3):
+                self.assertEqual(CreditScoreService.calculate_credit_score(self.customer.customer_id), expected)
+            self.assertTrue(self.dead_redis.breaker.is_open)
+
+            started = time.monotonic()
+            CreditScoreService.calculate_credit_score(self.customer.customer_id)
+            self.assertLess(time.monotonic() - started, 0.1)
+
+
+class AsyncViewTests(TestCase):
+    """
+    Validates that the ASGI (async) views answer exactly like the WSGI views.
+    """
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Async", last_name="Tester",
+            phone_number="9999444433", monthly_salary=100000,
+            approved_limit=3600000, age=30
+        )
+        self.loans = [
+            Loan.objects.create(
+                customer=self.customer, loan_amount=100000 * (i + 1), tenure=12,
+                interest_rate=10, monthly_repayment=5000, emis_paid_on_time=6,
+                end_date=date.today() + timedelta(days=90), status='APPROVED'
+            )
+            for i in range(3)
+        ]
+        LoanSummaryService.rebuild([self.customer.customer_id])
+        clear_cached_score(self.customer.customer_id)
+
+    async def assert_same_response(self, method, url, **kwargs):
+        sync_response = await sync_to_async(getattr(self.client, method))(url, **kwargs)
+        with self.settings(ROOT_URLCONF='config.asgi_urls'):
+            async_response = await getattr(self.async_client, method)(url, **kwargs)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(json.loads(async_response.content), json.loads(sync_response.content))
+        return async_response
+
+    async def test_check_eligibility_matches_sync_view(self):
+        payload = {'customer_id': self.customer.customer_id, 'loan_amount': 50000, 'interest_rate': 10, 'tenure': 12}
+        # Cold (score recomputed in the sync thread) and warm (score read from Redis)
+        for _ in range(2):
+            await sync_to_async(clear_cached_score)(self.customer.customer_id)
+            response = await self.assert_same_response(
+                'post', '/check-eligibility', data=payload, content_type='application/json'
+            )
+        self.assertIn('approval', json.loads(response.content))
+
+        await self.assert_same_response(
+            'post', '/check-eligibility', data={'customer_id': 'x'}, content_type='application/json'
+        )
+
+    async def test_read_endpoints_match_sync_views(self):
+        await self.assert_same_response('get', f'/view-loan/{self.loans[0].loan_id}')
+        await self.assert_same_response('get', '/view-loan/999999')
+
+        first_page = await self.assert_same_response('get', f'/view-loans/{self.customer.customer_id}')
+        self.assertEqual(json.loads(first_page.content)['count'], 3)
+        await self.assert_same_response('get', f'/view-loans/{self.customer.customer_id}?page=2')
+        await self.assert_same_response('get', '/view-loans/999999')
+
+        first_cursor_page = await self.assert_same_response('get', f'/view-loans/{self.customer.customer_id}?cursor=&count=false')
+        self.assertEqual(len(json.loads(first_cursor_page.content)['results']), 3)
+        await self.assert_same_response('get', f'/view-loans/{self.customer.customer_id}?cursor=bogus')
+        await self.assert_same_response('get', '/view-loans/999999?cursor=')
+
+
+class LoanReadQueryTests(TestCase):
+    """
+    Validates that the loan read endpoints run a constant number of queries.
+    """
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Query", last_name="Tester",
+            phone_number="9999555544", monthly_salary=100000,
+            approved_limit=3600000, age=30
+        )
+
+    def add_loans(self, count):
+        Loan.objects.bulk_create([
+            Loan(
+                customer=self.customer, loan_amount=10000 * (i + 1), tenure=12,
+                interest_rate=Decimal('10.50'), monthly_repayment=900, emis_paid_on_time=3,
+                end_date=date.today() + timedelta(days=300), status='APPROVED'
+            )
+            for i in range(count)
+        ])
+        LoanSummaryService.rebuild([self.customer.customer_id])
+
+    def test_detail_is_two_queries(self):
+        self.add_loans(1)
+        loan = Loan.objects.get(customer=self.customer)
+        # Version (ETag) lookup, then loan + customer
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('view-loan-detail', args=[loan.loan_id]))
+        self.assertEqual(response.data['customer']['first_name'], "Query")
+
+    def test_list_query_count_is_independent_of_loan_count(self):
+        url = reverse('view-loans-by-customer', args=[self.customer.customer_id])
+        for count in (5, 20):
+            Loan.objects.filter(customer=self.customer).delete()
+            self.add_loans(count)
+            # Version (ETag), count, page
+            with self.assertNumQueries(3):
+                response = self.client.get(url)
+            self.assertEqual(len(response.data['results']), count)
+
+    def test_list_rows_match_serializer(self):
+        self.add_loans(3)
+        loans = Loan.objects.filter(customer=self.customer).order_by('loan_id')
+        rows = CustomerLoanListSerializer.rows(loans)
+        self.assertEqual(
+            CustomerLoanListSerializer.represent_rows(rows),
+            CustomerLoanListSerializer(loans, many=True).data
+        )
+
+    def test_detail_row_matches_serializer(self):
+        self.add_loans(1)
+        loan = Loan.objects.select_related('customer').get(customer=self.customer)
+        row = Loan.objects.filter(loan_id=loan.loan_id).values_list(*LoanDetailSerializer.ROW_FIELDS, named=True).get()
+        self.assertEqual(LoanDetailSerializer.represent_row(row), LoanDetailSerializer(loan).data)
+
+    def test_list_unknown_customer_is_404(self):
+        response = self.client.get(reverse('view-loans-by-customer', args=[999999]))
+        self.assertEqual(response.status_code, 404)
+        # A known customer without loans is an empty page
+        response = self.client.get(reverse('view-loans-by-customer', args=[self.customer.customer_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [])
+
+
+class LoanCursorPaginationTests(TestCase):
+    """
+    Validates keyset pagination of a customer's loans (view-loans?cursor=).
+    """
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Cursor", last_name="Tester",
+            phone_number="9999666655", monthly_salary=100000,
+            approved_limit=3600000, age=30
+        )
+        Loan.objects.bulk_create([
+            Loan(
+                customer=self.customer, loan_amount=1000, tenure=12, interest_rate=10,
+                monthly_repayment=90, end_date=date.today() + timedelta(days=300), status='APPROVED'
+            )
+            for _ in range(250)
+        ])
+        LoanSummaryService.rebuild([self.customer.customer_id])
+        self.loan_ids = list(Loan.objects.filter(customer=self.customer).order_by('loan_id').values_list('loan_id', flat=True))
+        self.url = reverse('view-loans-by-customer', args=[self.customer.customer_id])
+
+    def test_walks_every_loan_once_in_order(self):
+        seen = []
+        url = f"{self.url}?cursor="
+        while url:
+            with self.assertNumQueries(3):
+                response = self.client.get(url)
+            self.assertEqual(response.data['count'], 250)
+            seen.extend(loan['loan_id'] for loan in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, self.loan_ids)
+
+        # And back: the previous link of the last page is the second page
+        previous = self.client.get(response.data['previous'])
+        self.assertEqual([loan['loan_id'] for loan in previous.data['results']], self.loan_ids[100:200])
+
+    def test_count_can_be_skipped(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(f"{self.url}?cursor=&count=false")
+        self.assertIsNone(response.data['count'])
+        self.assertIn('count=false', response.data['next'])
+
+    def test_invalid_cursor_and_unknown_customer(self):
+        self.assertEqual(self.client.get(f"{self.url}?cursor=bogus").status_code, 404)
+        url = reverse('view-loans-by-customer', args=[999999])
+        self.assertEqual(self.client.get(f"{url}?cursor=").status_code, 404)
+
+
+class FastJSONTests(TestCase):
+    """
+    Validates that the orjson renderer/parser are drop-in replacements for DRF's JSON ones.
+    """
+    def test_renderer_output_matches_drf(self):
+        data = {
+            'loan_id': 7, 'approval': True, 'corrected_interest_rate': Decimal('14.50'),
+            'monthly_installment': Decimal('8791.59'), 'amount': '100000.00', 'ratio': 0.25,
+            'start_date': date(2026, 1, 31), 'name': 'Zoë \u2028 line', 'missing': None,
+            'errors': {'customer_id': [ErrorDetail('A valid integer is required.', code='invalid')]},
+            3: 'int key', 'rows': [{'n': i} for i in range(3)],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+        # Indented output is delegated to the stdlib renderer
+        self.assertEqual(
+            ORJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4')
+        )
+
+    def test_parser_matches_drf(self):
+        body = b'{"customer_id": 1, "loan_amount": 100000.5, "interest_rate": "10", "tags": ["a"], "name": "Zo\xc3\xab"}'
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+        for bad in (b'{"customer_id": ', b'{"x": NaN}'):
+            with self.assertRaises(ParseError):
+                ORJSONParser().parse(io.BytesIO(bad))
+
+    def test_api_uses_fast_json(self):
+        response = self.client.post(reverse('check-eligibility'), b'{"customer_id": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.json()['detail'].startswith('JSON parse error'))
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+
+
+class ConditionalLoanReadTests(TestCase):
+    """
+    Validates ETag/Last-Modified handling and the rendered-response cache of the loan read endpoints.
+    """
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Etag", last_name="Tester",
+            phone_number="9999777766", monthly_salary=100000,
+            approved_limit=3600000, age=30
+        )
+        # A fully repaid loan gives the customer a score that approves at 14%
+        self.loan = Loan.objects.create(
+            customer=self.customer, loan_amount=100000, tenure=12,
+            interest_rate=10, monthly_repayment=8792, emis_paid_on_time=12,
+            end_date=date.today() - timedelta(days=30), status='PAID'
+        )
+        LoanSummaryService.rebuild([self.customer.customer_id])
+        clear_cached_score(self.customer.customer_id)
+        redis_client.delete(LoanResponseCache.get_cache_key(self.customer.customer_id))
+        self.detail_url = reverse('view-loan-detail', args=[self.loan.loan_id])
+        self.list_url = reverse('view-loans-by-customer', args=[self.customer.customer_id])
+
+    def test_unchanged_resources_are_not_modified(self):
+        for url in (self.detail_url, self.list_url):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('Last-Modified', response)
+            with self.assertNumQueries(1):
+                not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(not_modified.status_code, 304)
+            self.assertEqual(not_modified.content, b'')
+
+        # A change within the same second leaves Last-Modified as it was
+        response = self.client.get(self.list_url)
+        CustomerLoanSummary.objects.filter(customer=self.customer).update(loan_count=F('loan_count') + 1)
+        changed = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed['Last-Modified'], response['Last-Modified'])
+
+        # Each page has its own validator
+        page = self.client.get(self.list_url)
+        cursor_page = self.client.get(f"{self.list_url}?cursor=")
+        self.assertNotEqual(page['ETag'], cursor_page['ETag'])
+
+    def test_new_loan_changes_validators(self):
+        etags = [self.client.get(url)['ETag'] for url in (self.detail_url, self.list_url)]
+        result = LoanService.create_loan(self.customer.customer_id, Decimal('200000'), Decimal('14'), 12)
+        self.assertTrue(result['loan_approved'])
+
+        for url, etag in zip((self.detail_url, self.list_url), etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_payment_changes_validators(self):
+        loan = Loan.objects.create(
+            customer=self.customer, loan_amount=100000, tenure=12,
+            interest_rate=10, monthly_repayment=8792, end_date=date.today() + timedelta(days=360), status='APPROVED'
+        )
+        LoanSummaryService.rebuild([self.customer.customer_id])
+        response = self.client.get(self.list_url)
+        summary = CustomerLoanSummary.objects.get(customer=self.customer)
+        self.assertEqual(response['Last-Modified'], http_date(int(summary.updated_at.timestamp())))
+
+        # repayments_left follows the ledger, so a payment moves the version
+        PaymentService.apply_batch([{'loan_id': loan.loan_id, 'amount': Decimal('8792'), 'paid_on': date.today()}])
+        after = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(after.data['results'][1]['repayments_left'], 11)
+
+    @override_settings(LOAN_RESPONSE_CACHE=True)
+    def test_rendered_response_cache(self):
+        cache_key = LoanResponseCache.get_cache_key(self.customer.customer_id)
+        first = self.client.get(self.list_url)
+        self.assertEqual(redis_client.hlen(cache_key), 1)
+        # Served from Redis: only the version lookup hits the database
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.list_url)
+        self.assertEqual(cached.content, first.content)
+        self.assertEqual(cached['ETag'], first['ETag'])
+
+        LoanService.create_loan(self.customer.customer_id, Decimal('200000'), Decimal('14'), 12)
+        self.assertFalse(redis_client.exists(cache_key))
+        self.assertEqual(json.loads(self.client.get(self.list_url).content)['count'], 2)
+
+    async def test_async_views_share_validators(self):
+        for url in (self.detail_url, self.list_url):
+            response = await sync_to_async(self.client.get)(url)
+            with self.settings(ROOT_URLCONF='config.asgi_urls'):
+                async_response = await self.async_client.get(url)
+                self.assertEqual(async_response['ETag'], response['ETag'])
+                not_modified = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+            self.assertEqual(not_modified.status_code, 304)
+
+
+@override_settings(SERVER_TIMING=True)
+class InstrumentationTests(TestCase):
+    """
+    Validates the per-request instrumentation: Server-Timing and /metrics.
+    """
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Metrics", last_name="Tester",
+            phone_number="9999666655", monthly_salary=100000,
+            approved_limit=3600000, age=30
+        )
+        self.loan = Loan.objects.create(
+            customer=self.customer, loan_amount=100000, tenure=12,
+            interest_rate=10, monthly_repayment=8792, emis_paid_on_time=6,
+            end_date=date.today() + timedelta(days=300), status='APPROVED'
+        )
+        LoanSummaryService.rebuild([self.customer.customer_id])
+        clear_cached_score(self.customer.customer_id)
+
+    def server_timing(self, response):
+        """Server-Timing entries as {name: {'dur': ..., 'desc': ...}}."""
+        entries = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            entries[name] = dict(param.split('=', 1) for param in params)
+        return entries
+
+    def test_server_timing_reports_queries_and_total(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('view-loan-detail', args=[self.loan.loan_id]))
+        timing = self.server_timing(response)
+        self.assertEqual(timing['db']['desc'], '"2 queries"')
+        self.assertGreaterEqual(float(timing['total']['dur']), float(timing['db']['dur']))
+
+    def test_server_timing_reports_redis_cache_and_spans(self):
+        payload = {'customer_id': self.customer.customer_id, 'loan_amount': 50000, 'interest_rate': 10, 'tenure': 12}
+        cold = self.server_timing(self.client.post('/check-eligibility', payload, content_type='application/json'))
+        warm = self.server_timing(self.client.post('/check-eligibility', payload, content_type='application/json'))
+        self.assertEqual(cold['cache-score-redis']['desc'], '"hit 0 miss 1"')
+        self.assertEqual(warm['cache-score-redis']['desc'], '"hit 1 miss 0"')
+        self.assertIn('credit-score', warm)
+        self.assertIn('eligibility', warm)
+        self.assertIn('emi', warm)
+        self.assertNotEqual(warm['redis']['desc'], '"0 calls"')
+
+    def test_metrics_endpoint_has_route_histograms(self):
+        route = 'view-loan/<int:loan_id>'
+        before = REQUEST_DURATION.count(route, 'GET')
+        self.client.get(reverse('view-loan-detail', args=[self.loan.loan_id]))
+        self.assertEqual(REQUEST_DURATION.count(route, 'GET'), before + 1)
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn(f'http_request_db_queries_bucket{{route="{route}",le="2"}}', body)
+        self.assertIn(f'http_requests_total{{route="{route}",method="GET",status="200"}}', body)
+
+    def test_histogram_exposition(self):
+        registry = Registry()
+        histogram = registry.histogram('demo_seconds', 'Demo.', ['route'], buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value, 'a"b')
+        self.assertEqual(registry.exposition().splitlines(), [
+            '# HELP demo_seconds Demo.',
+            '# TYPE demo_seconds histogram',
+            'demo_seconds_bucket{route="a\\"b",le="0.1"} 1',
+            'demo_seconds_bucket{route="a\\"b",le="1"} 2',
+            'demo_seconds_bucket{route="a\\"b",le="+Inf"} 3',
+            'demo_seconds_sum{route="a\\"b"} 5.55',
+            'demo_seconds_count{route="a\\"b"} 3',
+        ])
+
+    def test_server_timing_can_be_disabled(self):
+        with self.settings(SERVER_TIMING=False):
+            response = Client().get(reverse('view-loan-detail', args=[self.loan.loan_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.1'], METRICS_TOKEN='scrape-secret')
+    def test_metrics_are_restricted_to_allowed_scrapers(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.1').status_code, 200)
+        with self.settings(METRICS_TOKEN=''):
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+    async def test_async_views_are_instrumented(self):
+        with self.settings(ROOT_URLCONF='config.asgi_urls'):
+            response = await self.async_client.get(f'/view-loan/{self.loan.loan_id}')
+        self.assertEqual(self.server_timing(response)['db']['desc'], '"2 queries"')
+
+
+@skipUnless(connection.features.has_select_for_update, "Needs row locks (PostgreSQL)")
+class ConcurrentLoanCreationTests(TransactionTestCase):
+    """
+    Validates that parallel create-loan calls cannot push a customer past the EMI cap.
+    """
+    APPLICATIONS = 8
+
+    def create_customer(self, phone_number):
+        customer = Customer.objects.create(
+            first_name="Race", last_name="Tester",
+            phone_number=phone_number, monthly_salary=100000,
+            approved_limit=3600000, age=30
+        )
+        # A fully repaid loan gives the customer a score that approves at 14%
+        Loan.objects.create(
+            customer=customer, loan_amount=100000, tenure=12,
+            interest_rate=10, monthly_repayment=8792, emis_paid_on_time=12,
+            end_date=date.today() - timedelta(days=30), status='PAID'
+        )
+        clear_cached_score(customer.customer_id)
+        return customer
+
+    def test_parallel_applications_never_exceed_emi_cap(self):
+        customer = self.create_customer("9999333322")
+        start = threading.Barrier(self.APPLICATIONS)
+
+        def apply():
+            start.wait()
+            try:
+                return LoanService.create_loan(customer.customer_id, Decimal('200000'), Decimal('14'), 12)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.APPLICATIONS) as pool:
+            results = list(pool.map(lambda _: apply(), range(self.APPLICATIONS)))
+
+        # Each EMI is ~17,957 against a 50,000 cap: exactly two fit
+        approved = [result for result in results if result['loan_approved']]
+        self.assertEqual(len(approved), 2)
+        current_emis = LoanService.current_loans(customer=customer).aggregate(total=Sum('monthly_repayment'))['total']
+        self.assertLessEqual(current_emis, Decimal('50000'))
+        self.assertEqual(LoanSummaryService.verify([customer.customer_id]), [])
+
+    def test_other_customers_are_not_blocked(self):
+        busy = self.create_customer("9999333311")
+        free = self.create_customer("9999333300")
+        locked = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            with transaction.atomic():
+                Customer.objects.select_for_update().get(customer_id=busy.customer_id)
+                locked.set()
+                release.wait(5)
+            connection.close()
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        try:
+            self.assertTrue(locked.wait(5))
+            result = LoanService.create_loan(free.customer_id, Decimal('100000'), Decimal('14'), 12)
+            self.assertTrue(result['loan_approved'])
+        finally:
+            release.set()
+            holder.join()
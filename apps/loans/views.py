@@ -2,9 +2,21 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework import generics
-from apps.loans.serializers import CheckEligibilitySerializer, CreateLoanSerializer, LoanDetailSerializer, CustomerLoanListSerializer
+from rest_framework.parsers import MultiPartParser
+from apps.loans.serializers import CheckEligibilitySerializer, CreateLoanSerializer, LoanDetailSerializer, CustomerLoanListSerializer, LoanPaymentSerializer, represent_payment, represent_schedule_row, represent_score_breakdown
+from apps.loans.services.credit_score import CreditScoreService
+from apps.loans.services.interest import InterestService
 from apps.loans.services.loan_service import LoanService
-from apps.loans.models import Loan
+from apps.loans.services.payments import PaymentService
+from apps.loans.services.response_cache import LoanResponseCache
+from apps.loans.models import Loan, LoanPayment
+from apps.loans.pagination import LoanCursorPagination
+from apps.loans.renderers import CSVRenderer, NDJSONRenderer
+from apps.customers.models import Customer
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from datetime import date
 
 class CheckEligibilityView(APIView):
     def post(self, request):
@@ -20,6 +32,40 @@ class CheckEligibilityView(APIView):
             return Response(result, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class CheckEligibilityBatchView(APIView):
+    """
+    Scores a list of eligibility payloads in one request. Each item is
+    validated on its own, so a bad item or an unknown customer only
+    produces an 'errors' entry at that position in the results.
+    """
+    MAX_BATCH_SIZE = 1000
+
+    def post(self, request):
+        if not isinstance(request.data, list):
+            return Response({'detail': 'Expected a list of applications.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > self.MAX_BATCH_SIZE:
+            return Response(
+                {'detail': f'A batch may contain at most {self.MAX_BATCH_SIZE} applications.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = [None] * len(request.data)
+        valid_positions = []
+        applications = []
+        for position, item in enumerate(request.data):
+            serializer = CheckEligibilitySerializer(data=item)
+            if serializer.is_valid():
+                valid_positions.append(position)
+                applications.append(serializer.validated_data)
+            else:
+                results[position] = {'errors': serializer.errors}
+
+        if applications:
+            for position, result in zip(valid_positions, LoanService.check_eligibility_batch(applications)):
+                results[position] = result
+
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
 class CreateLoanView(APIView):
     def post(self, request):
         serializer = CreateLoanSerializer(data=request.data)
@@ -36,14 +82,204 @@ class CreateLoanView(APIView):
             return Response(result, status=status.HTTP_201_CREATED if result['loan_approved'] else status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class ViewLoanDetailView(generics.RetrieveAPIView):
+class CreditScoreView(APIView):
+    """
+    A customer's credit score with its components (repayment, count,
+    activity, volume and the debt-overload flag), read from the cached
+    breakdown the score itself is derived from.
+    """
+    def get(self, request, customer_id):
+        if not Customer.objects.filter(customer_id=customer_id).exists():
+            raise Http404('No Customer matches the given query.')
+        breakdown = CreditScoreService.get_score_breakdown(customer_id)
+        return Response(represent_score_breakdown(customer_id, breakdown))
+
+class LoanPaymentsView(APIView):
+    """
+    A loan's repayment ledger (GET, by installment) and recording one EMI
+    payment (POST amount, optional paid_on, default today, and reference).
+    Posting a reference that is already in the ledger returns the recorded
+    payment with 200 instead of recording it twice.
+    """
+    def get(self, request, loan_id):
+        loan = Loan.objects.filter(loan_id=loan_id).values_list('tenure', 'emis_paid_on_time', 'status', named=True).first()
+        if loan is None:
+            raise Http404('No Loan matches the given query.')
+        payments = (
+            LoanPayment.objects.filter(loan_id=loan_id).order_by('installment')
+            .values_list(*LoanPaymentSerializer.PAYMENT_FIELDS, named=True)
+        )
+        return Response({
+            'loan_id': loan_id,
+            'tenure': loan.tenure,
+            'emis_paid_on_time': loan.emis_paid_on_time,
+            'status': loan.status,
+            'payments': [represent_payment(payment) for payment in payments],
+        })
+
+    def post(self, request, loan_id):
+        serializer = LoanPaymentSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not Loan.objects.filter(loan_id=loan_id).exists():
+            raise Http404('No Loan matches the given query.')
+        data = serializer.validated_data
+        reference = data.get('reference') or None
+        summary = PaymentService.apply_batch([{
+            'loan_id': loan_id,
+            'amount': data['amount'],
+            'paid_on': data.get('paid_on') or date.today(),
+            'reference': reference,
+        }])
+
+        if summary['duplicates']:
+            payment = (
+                LoanPayment.objects.filter(reference=reference)
+                .values_list(*LoanPaymentSerializer.PAYMENT_FIELDS, named=True).first()
+            )
+            if payment.loan_id != loan_id:
+                return Response({'detail': 'Reference already used for another loan.'}, status=status.HTTP_400_BAD_REQUEST)
+            return Response(represent_payment(payment), status=status.HTTP_200_OK)
+        if summary['errors']:
+            # Drop the "Row 0: " prefix batch errors carry
+            return Response({'detail': summary['errors'][0].partition(': ')[2]}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = represent_payment(summary['payments'][0])
+        result['loan_status'] = Loan.objects.values_list('status', flat=True).get(loan_id=loan_id)
+        return Response(result, status=status.HTTP_201_CREATED)
+
+class PaymentSettlementView(APIView):
+    """
+    Applies the bank's settlement CSV (multipart field `file`; columns
+    loan_id, amount, paid_on, reference) in batches of
+    PAYMENT_SETTLEMENT_BATCH_SIZE rows, each committed on its own. Rows
+    with a reference already in the ledger are counted as duplicates, so a
+    partially applied file can be uploaded again.
+    """
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        file = request.FILES.get('file')
+        if file is None:
+            return Response({'detail': 'Upload the settlement CSV as "file".'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            report = PaymentService.settle_file(file)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK)
+
+class ConditionalLoanReadMixin:
+    """
+    Conditional GET for the loan read views: ETag/Last-Modified from the
+    customer's loan version (LoanResponseCache), 304 without serializing
+    when the client's copy is current, and the optional rendered-response
+    cache for JSON responses.
+    """
+    def get_version_query(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        version = LoanResponseCache.resolve_version(self.get_version_query())
+        if version is None:
+            # Unknown loan/customer: the regular lookup produces the 404
+            return super().get(request, *args, **kwargs)
+        customer_id, version, last_modified = version
+        etag = LoanResponseCache.etag(version, request, request.accepted_media_type)
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+
+        # The ETag alone decides: Last-Modified has one-second granularity, so
+        # If-Modified-Since could answer 304 for a change made in the same second
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            cacheable = request.accepted_renderer.format == 'json'
+            content = LoanResponseCache.get(customer_id, etag) if cacheable else None
+            if content is not None:
+                response = HttpResponse(content, content_type='application/json')
+            else:
+                response = super().get(request, *args, **kwargs)
+                if cacheable and response.status_code == 200 and LoanResponseCache.enabled():
+                    response = self.finalize_response(request, response, *args, **kwargs)
+                    LoanResponseCache.set(customer_id, etag, response.render().content)
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+class ViewLoanDetailView(ConditionalLoanReadMixin, generics.RetrieveAPIView):
     queryset = Loan.objects.all()
     serializer_class = LoanDetailSerializer
     lookup_field = 'loan_id'
 
-class ViewLoansByCustomerView(generics.ListAPIView):
+    def retrieve(self, request, *args, **kwargs):
+        # Loan and customer columns in one query, rendered without the ModelSerializer
+        row = (
+            self.get_queryset().filter(loan_id=self.kwargs['loan_id'])
+            .values_list(*LoanDetailSerializer.ROW_FIELDS, named=True)
+            .first()
+        )
+        if row is None:
+            raise Http404('No Loan matches the given query.')
+        return Response(LoanDetailSerializer.represent_row(row))
+
+    def get_version_query(self):
+        return LoanResponseCache.loan_version_query(self.kwargs['loan_id'])
+
+class ViewLoansByCustomerView(ConditionalLoanReadMixin, generics.ListAPIView):
+    """
+    A customer's loans as projected rows (no model instances), serialized
+    with CustomerLoanListSerializer.represent_rows. Two queries per page
+    (count + page); unknown customers get a 404.
+
+    Page numbers by default; `?cursor=` switches to keyset pagination
+    (LoanCursorPagination), which also allows `count=false`.
+    """
     serializer_class = CustomerLoanListSerializer
 
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if LoanCursorPagination.cursor_query_param in self.request.query_params:
+                self._paginator = LoanCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_version_query(self):
+        return LoanResponseCache.customer_version_query(self.kwargs['customer_id'])
+
     def get_queryset(self):
         customer_id = self.kwargs['customer_id']
-        return Loan.objects.filter(customer_id=customer_id)
+        return CustomerLoanListSerializer.rows(Loan.objects.filter(customer_id=customer_id).order_by('loan_id'))
+
+    def list(self, request, *args, **kwargs):
+        customer_id = self.kwargs['customer_id']
+        page = self.paginate_queryset(self.get_queryset())
+        # Only an empty result needs the extra existence check
+        if not page and not Customer.objects.filter(customer_id=customer_id).exists():
+            raise Http404('No Customer matches the given query.')
+        return self.get_paginated_response(CustomerLoanListSerializer.represent_rows(page))
+
+class ViewLoanScheduleView(APIView):
+    """
+    Amortization schedule of a loan, one installment per row, streamed as
+    NDJSON (default) or CSV (`?format=csv` or `Accept: text/csv`).
+    """
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    def get(self, request, loan_id):
+        loan = (
+            Loan.objects.filter(loan_id=loan_id)
+            .values_list('loan_amount', 'interest_rate', 'tenure', 'start_date', named=True)
+            .first()
+        )
+        if loan is None:
+            raise Http404('No Loan matches the given query.')
+        rows = InterestService.amortization_schedule(loan.loan_amount, loan.interest_rate, loan.tenure)
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(represent_schedule_row(row, loan.start_date) for row in rows),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}" if renderer.charset else renderer.media_type
+        )
+        if renderer.format == 'csv':
+            response['Content-Disposition'] = f'attachment; filename="loan-{loan_id}-schedule.csv"'
+        return response
@@ -0,0 +1,294 @@
+"""
+Load test of the public API: requests per second, p50/p95/p99 latency and
+database queries per request for each endpoint at a fixed concurrency.
+
+Seeds a throwaway database with a synthetic dataset through the ingestion
+loaders (ExcelLoader.load_customers/load_loans, COPY on PostgreSQL), serves
+the WSGI application from a threaded server inside this process (so every
+query can be counted) and drives one scenario at a time with the
+closed-loop generator in benchmarks/http_load.py:
+
+    python -m benchmarks.api_load --fakeredis --customers 10000 --loans 100000
+    DATABASE_URL=postgres://... python -m benchmarks.api_load --customers 1000000 --loans 10000000
+
+Runs are reproducible: the dataset and every request are derived from
+--seed, and --output writes the results (with the git commit, dataset and
+settings) as JSON. Pass an earlier file to --compare to print the change
+per endpoint:
+
+    python -m benchmarks.api_load --fakeredis --output before.json
+    git checkout other-branch
+    python -m benchmarks.api_load --fakeredis --compare before.json
+
+Absolute numbers include the load generator sharing the interpreter with
+the server; compare runs made with the same options on the same machine.
+For server-level throughput across worker models see benchmarks/asgi_vs_wsgi.py.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import threading
+
+from benchmarks.common import setup_django, bench_database, timer
+from benchmarks.http_load import run_load, wait_for_server
+
+SCENARIOS = ['check-eligibility', 'view-loan', 'view-loans', 'view-loan-schedule', 'register', 'create-loan']
+
+
+def start_fakeredis():
+    """Serve fakeredis on a free local port and point the REDIS_* settings at it (before Django starts)."""
+    from fakeredis import TcpFakeServer
+
+    server = TcpFakeServer(('127.0.0.1', 0))
+    # Connection handler threads must not keep the process alive once the run is over
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='fakeredis', daemon=True).start()
+    os.environ['REDIS_HOST'], os.environ['REDIS_PORT'] = '127.0.0.1', str(server.server_address[1])
+    return server
+
+
+def clear_redis():
+    """Drop cached scores/responses left by an earlier run so every run starts cold."""
+    from config.redis_client import get_redis_client
+
+    client = get_redis_client()
+    for pattern in ('credit_score*', 'loan_responses:*'):
+        keys = list(client.scan_iter(match=pattern, count=1000))
+        for start in range(0, len(keys), 1000):
+            client.delete(*keys[start:start + 1000])
+
+
+def seed(customer_count, loan_count, seed_value):
+    """Load synthetic CSVs through the ingestion loaders; returns the wall time per step."""
+    from django.core.management.color import no_style
+    from django.db import connection
+    from apps.customers.models import Customer
+    from apps.loans.models import Loan
+    from apps.ingestion.loaders import ExcelLoader
+    from benchmarks.ingestion_backends import write_csv_files
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as directory:
+        with timer() as generate_time:
+            customer_path, loan_path = write_csv_files(directory, customer_count, loan_count, seed=seed_value)
+        timings['generate_csv'] = generate_time['seconds']
+        with timer() as customers_time:
+            ExcelLoader.load_customers(customer_path, backend='auto')
+        timings['load_customers'] = customers_time['seconds']
+        with timer() as loans_time:
+            # Also rebuilds the loan summaries of every loaded customer
+            ExcelLoader.load_loans(loan_path, backend='auto')
+        timings['load_loans'] = loans_time['seconds']
+
+    # The loaders write explicit ids; move the sequences past them for /register and /create-loan
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [Customer, Loan]):
+            cursor.execute(sql)
+        if connection.vendor == 'postgresql':
+            cursor.execute(f"ANALYZE {Customer._meta.db_table}")
+            cursor.execute(f"ANALYZE {Loan._meta.db_table}")
+    return timings
+
+
+class QueryCounter:
+    """WSGI wrapper counting the database queries run while serving requests."""
+
+    def __init__(self, application):
+        self.application = application
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.queries = 0
+
+    def __call__(self, environ, start_response):
+        from django.db import connection
+
+        count = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            # Streaming bodies run their queries up front (the schedule view loads the loan before streaming)
+            response = self.application(environ, start_response)
+        with self.lock:
+            self.requests += 1
+            self.queries += count
+        return response
+
+    def per_request(self):
+        with self.lock:
+            return self.queries / self.requests if self.requests else 0.0
+
+
+def start_server(application, port):
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadedWSGIServer(('127.0.0.1', port), QuietHandler, allow_reuse_address=True)
+    server.daemon_threads = True
+    server.set_app(application)
+    threading.Thread(target=server.serve_forever, name='api-server', daemon=True).start()
+    return server
+
+
+def request_factory(scenario, customer_count, loan_count, seed_value):
+    """make_request(worker, iteration) for run_load; deterministic per (seed, worker, iteration)."""
+    def rng_for(worker, iteration):
+        return random.Random(f"{seed_value}:{scenario}:{worker}:{iteration}")
+
+    def make_request(worker, iteration):
+        rng = rng_for(worker, iteration)
+        customer_id = rng.randint(1, customer_count)
+        if scenario == 'check-eligibility':
+            return 'POST', '/check-eligibility', {
+                'customer_id': customer_id, 'loan_amount': rng.randint(1, 50) * 10000,
+                'interest_rate': rng.choice([8, 10, 12, 14, 16]), 'tenure': rng.choice([6, 12, 24, 36]),
+            }
+        if scenario == 'create-loan':
+            return 'POST', '/create-loan', {
+                'customer_id': customer_id, 'loan_amount': rng.randint(1, 20) * 10000,
+                'interest_rate': rng.choice([12, 14, 16]), 'tenure': rng.choice([12, 24, 36]),
+            }
+        if scenario == 'register':
+            # Unique per request so every registration is an insert
+            return 'POST', '/register', {
+                'first_name': 'Load', 'last_name': f"Test{worker}", 'age': rng.randint(21, 65),
+                'monthly_income': rng.randint(20, 300) * 1000,
+                'phone_number': str(7000000000 + worker * 10000000 + iteration),
+            }
+        if scenario == 'view-loan':
+            return 'GET', f'/view-loan/{rng.randint(1, loan_count)}', None
+        if scenario == 'view-loan-schedule':
+            return 'GET', f'/view-loan/{rng.randint(1, loan_count)}/schedule', None
+        if scenario == 'view-loans':
+            return 'GET', f'/view-loans/{customer_id}', None
+        raise ValueError(f"Unknown scenario {scenario}")
+    return make_request
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    baseline = {row['scenario']: row for row in (baseline or {}).get('scenarios', [])}
+    print(f"\n{'scenario':20s} {'req/s':>9s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'queries':>8s} {'errors':>7s}")
+    for row in results['scenarios']:
+        line = (
+            f"{row['scenario']:20s} {row['rps']:9.1f} {row['p50']:8.2f} {row['p95']:8.2f} "
+            f"{row['p99']:8.2f} {row['queries_per_request']:8.2f} {row['errors']:7d}"
+        )
+        before = baseline.get(row['scenario'])
+        if before:
+            def change(key):
+                return f"{(row[key] - before[key]) / before[key] * 100:+.0f}%" if before[key] else 'n/a'
+            line += f"   vs baseline: req/s {change('rps')}, p95 {change('p95')}, queries {change('queries_per_request')}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--customers', type=int, default=10000)
+    parser.add_argument('--loans', type=int, default=100000)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--seed', type=int, default=20)
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--fakeredis', action='store_true', help="Serve Redis from an in-process fakeredis")
+    parser.add_argument('--output', help="Write the results as JSON")
+    parser.add_argument('--compare', help="Results JSON of an earlier run to compare against")
+    args = parser.parse_args()
+
+    scenarios = args.scenarios.split(',')
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if args.fakeredis:
+        start_fakeredis()
+
+    setup_django()
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+
+    if connection.vendor == 'sqlite':
+        # Server threads need a file database (the default test database is in-memory)
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    settings.ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
+    settings.DEBUG = False
+
+    with bench_database() as connection:
+        clear_redis()
+        seed_timings = seed(args.customers, args.loans, args.seed)
+        print(
+            f"database: {connection.vendor}, redis: {'fakeredis' if args.fakeredis else settings.REDIS_HOST}, "
+            f"customers: {args.customers}, loans: {args.loans}, seeded in {sum(seed_timings.values()):.1f}s "
+            f"({', '.join(f'{step} {seconds:.1f}s' for step, seconds in seed_timings.items())})"
+        )
+        connection.close()
+
+        application = QueryCounter(get_wsgi_application())
+        server = start_server(application, args.port)
+        results = {
+            'commit': git_commit(),
+            'database': connection.vendor,
+            'redis': 'fakeredis' if args.fakeredis else 'redis',
+            'python': platform.python_version(),
+            'options': {
+                key: getattr(args, key)
+                for key in ('customers', 'loans', 'concurrency', 'duration', 'warmup', 'seed')
+            },
+            'seed_seconds': seed_timings,
+            'scenarios': [],
+        }
+        try:
+            wait_for_server('127.0.0.1', args.port, path='/view-loans/1')
+            for scenario in scenarios:
+                application.reset()
+                result = run_load(
+                    '127.0.0.1', args.port,
+                    request_factory(scenario, args.customers, args.loans, args.seed),
+                    concurrency=args.concurrency, duration=args.duration, warmup=args.warmup
+                )
+                results['scenarios'].append({
+                    'scenario': scenario, **result, 'queries_per_request': application.per_request(),
+                })
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('options') != results['options'] or baseline.get('database') != results['database']:
+            print(f"note: {args.compare} was run with different options/database; deltas are indicative only")
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nresults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Throughput and tail latency of the WSGI (sync DRF views, gunicorn sync
+workers) and ASGI (async views, gunicorn + uvicorn workers) deployments at
+the same worker count.
+
+Seeds a throwaway database, starts each server in turn against it and
+drives a fixed-concurrency mix of /check-eligibility, /view-loan/<id> and
+/view-loans/<customer_id> requests:
+
+    DATABASE_URL=postgres://... python -m benchmarks.asgi_vs_wsgi --workers 2 --concurrency 32 --duration 20
+
+Needs gunicorn and uvicorn installed. Pin both servers and the load
+generator to separate cores (e.g. taskset) for numbers that mean anything.
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from urllib.parse import urlsplit, urlunsplit
+
+from benchmarks.common import setup_django, bench_database, timer
+from benchmarks.http_load import run_load, wait_for_server
+
+SERVERS = {
+    'wsgi': ['gunicorn', 'config.wsgi:application', '--worker-class', 'gthread', '--threads', '{threads}'],
+    'asgi': ['gunicorn', 'config.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+def seed(customer_count, loans_per_customer):
+    from datetime import date, timedelta
+    from apps.customers.models import Customer
+    from apps.loans.models import Loan
+    from apps.loans.services.loan_summary import LoanSummaryService
+
+    rng = random.Random(5)
+    Customer.objects.bulk_create([
+        Customer(
+            customer_id=i, first_name=f"First{i}", last_name=f"Last{i}", phone_number=str(6000000000 + i),
+            monthly_salary=rng.randint(30, 200) * 1000, approved_limit=3600000, age=30
+        )
+        for i in range(1, customer_count + 1)
+    ], batch_size=5000)
+    loans = []
+    for customer_id in range(1, customer_count + 1):
+        for _ in range(loans_per_customer):
+            tenure = rng.choice([12, 24, 36])
+            loans.append(Loan(
+                customer_id=customer_id, loan_amount=rng.randint(1, 20) * 10000, tenure=tenure,
+                interest_rate=10, monthly_repayment=rng.randint(1000, 9000), emis_paid_on_time=rng.randint(0, tenure),
+                end_date=date.today() + timedelta(days=30 * tenure), status='APPROVED'
+            ))
+    Loan.objects.bulk_create(loans, batch_size=5000)
+    LoanSummaryService.rebuild()
+    return list(Loan.objects.values_list('loan_id', flat=True))
+
+
+def database_url(connection):
+    """DATABASE_URL pointing the server processes at the benchmark database."""
+    if connection.vendor == 'sqlite':
+        return f"sqlite:///{connection.settings_dict['NAME']}"
+    parts = urlsplit(os.environ['DATABASE_URL'])
+    return urlunsplit(parts._replace(path=f"/{connection.settings_dict['NAME']}"))
+
+
+def request_mix(customer_count, loan_ids):
+    def make_request(worker, iteration):
+        rng = random.Random(worker * 1000003 + iteration)
+        customer_id = rng.randint(1, customer_count)
+        kind = rng.random()
+        if kind < 0.6:
+            return 'POST', '/check-eligibility', {
+                'customer_id': customer_id, 'loan_amount': rng.randint(1, 50) * 10000,
+                'interest_rate': rng.choice([8, 10, 12, 14]), 'tenure': rng.choice([12, 24, 36]),
+            }
+        if kind < 0.8:
+            return 'GET', f'/view-loan/{rng.choice(loan_ids)}', None
+        return 'GET', f'/view-loans/{customer_id}', None
+    return make_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--customers', type=int, default=5000)
+    parser.add_argument('--loans-per-customer', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Server processes (same for both)')
+    parser.add_argument('--threads', type=int, default=8, help='Threads per WSGI worker')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--servers', default='wsgi,asgi')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+
+    if connection.vendor == 'sqlite':
+        # Servers run in other processes, so the test database must be a file
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+
+    with bench_database() as connection:
+        with timer() as seed_time:
+            loan_ids = seed(args.customers, args.loans_per_customer)
+        print(
+            f"database: {connection.vendor}, customers: {args.customers}, loans: {len(loan_ids)} "
+            f"(seeded in {seed_time['seconds']:.1f}s), workers: {args.workers}, concurrency: {args.concurrency}"
+        )
+        connection.close()
+
+        env = dict(os.environ, DATABASE_URL=database_url(connection), ALLOWED_HOSTS='127.0.0.1,localhost', DEBUG='0')
+        for name in args.servers.split(','):
+            command = [part.format(threads=args.threads) for part in SERVERS[name]] + [
+                '--workers', str(args.workers), '--bind', f'127.0.0.1:{args.port}', '--log-level', 'warning'
+            ]
+            server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=sys.stderr)
+            try:
+                wait_for_server('127.0.0.1', args.port, path='/view-loans/1')
+                result = run_load(
+                    '127.0.0.1', args.port, request_mix(args.customers, loan_ids),
+                    concurrency=args.concurrency, duration=args.duration
+                )
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f"{name}: {result['rps']:>8,.0f} req/s   p50 {result['p50']:7.1f} ms   "
+                f"p95 {result['p95']:7.1f} ms   p99 {result['p99']:7.1f} ms   errors {result['errors']}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Shared helpers for the Django-backed benchmarks.
+
+Benchmarks run against a throwaway test database created from the
+configured DATABASES['default'] (set DATABASE_URL to point at Postgres),
+so they never touch development data.
+"""
+import contextlib
+import os
+import time
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+
+@contextlib.contextmanager
+def bench_database(keepdb=False):
+    """Create (and afterwards destroy) a migrated test database."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+@contextlib.contextmanager
+def timer():
+    """Yields a dict whose 'seconds' key is filled in on exit."""
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result['seconds'] = time.perf_counter() - start
@@ -0,0 +1,58 @@
+"""
+EMI engine benchmark: scalar InterestService.calculate_monthly_installment
+against the vectorized InterestService.calculate_monthly_installments.
+
+Usage:
+    python -m benchmarks.emi_batch [--size 100000] [--repeat 3]
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from apps.loans.services.interest import InterestService
+
+
+def build_inputs(size, seed=42):
+    rng = random.Random(seed)
+    principals = [Decimal(rng.randint(10000, 5000000)) for _ in range(size)]
+    rates = [Decimal(rng.choice([0, rng.randint(500, 2400) / 100])) for _ in range(size)]
+    tenures = [rng.choice([0, 6, 12, 24, 36, 60, 120, 240]) for _ in range(size)]
+    return principals, rates, tenures
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    principals, rates, tenures = build_inputs(args.size)
+
+    scalar_time, scalar = best_of(args.repeat, lambda: [
+        InterestService.calculate_monthly_installment(p, r, n)
+        for p, r, n in zip(principals, rates, tenures)
+    ])
+    batch_time, batch = best_of(args.repeat, lambda: InterestService.calculate_monthly_installments(
+        principals, rates, tenures
+    ))
+    mismatches = sum(1 for a, b in zip(scalar, batch) if a != b)
+
+    print(f"loans:       {args.size}")
+    print(f"scalar:      {scalar_time * 1000:10.1f} ms  ({args.size / scalar_time:,.0f} EMIs/s)")
+    print(f"vectorized:  {batch_time * 1000:10.1f} ms  ({args.size / batch_time:,.0f} EMIs/s)")
+    print(f"speedup:     {scalar_time / batch_time:10.1f}x")
+    print(f"mismatches:  {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
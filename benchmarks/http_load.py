@@ -0,0 +1,97 @@
+"""
+Minimal closed-loop HTTP load generator (stdlib only).
+
+Each of `concurrency` threads keeps one keep-alive connection open and
+sends requests back to back until `duration` seconds have passed, so the
+offered load is fixed by the concurrency rather than by a target rate.
+"""
+import http.client
+import json
+import statistics
+import threading
+import time
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_load(host, port, make_request, concurrency=16, duration=10.0, warmup=1.0):
+    """
+    make_request(worker_index, iteration) returns (method, path, body_dict_or_None).
+    Returns {'requests', 'errors', 'rps', 'p50', 'p95', 'p99', 'mean'} with latencies in ms.
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    start_at = time.perf_counter() + warmup
+    stop_at = start_at + duration
+
+    def worker(index):
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        local_latencies = []
+        local_errors = 0
+        iteration = 0
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                break
+            method, path, body = make_request(index, iteration)
+            iteration += 1
+            payload = json.dumps(body) if body is not None else None
+            headers = {'Content-Type': 'application/json'} if payload is not None else {}
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                failed = response.status >= 500
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=30)
+                failed = True
+            elapsed = time.perf_counter() - started
+            # Requests finishing during the warm-up window are not counted
+            if started >= start_at:
+                if failed:
+                    local_errors += 1
+                else:
+                    local_latencies.append(elapsed * 1000)
+        connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': len(latencies) / duration,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'mean': statistics.fmean(latencies) if latencies else 0.0,
+    }
+
+
+def wait_for_server(host, port, path='/', timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=2)
+            connection.request('GET', path)
+            connection.getresponse().read()
+            connection.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on {host}:{port} did not come up within {timeout}s")
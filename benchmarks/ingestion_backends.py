@@ -0,0 +1,87 @@
+"""
+Ingestion throughput per write backend (ORM bulk_create vs PostgreSQL COPY).
+
+Generates synthetic customer/loan CSV files, loads them through
+ExcelLoader with each backend into a throwaway database and reports rows
+per second. The COPY backend is only measured on PostgreSQL:
+
+    DATABASE_URL=postgres://... python -m benchmarks.ingestion_backends --customers 100000 --loans 500000
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+from datetime import date, timedelta
+
+from benchmarks.common import setup_django, bench_database, timer
+
+
+def write_csv_files(directory, customer_count, loan_count, seed=7):
+    rng = random.Random(seed)
+    customer_path = os.path.join(directory, 'customers.csv')
+    loan_path = os.path.join(directory, 'loans.csv')
+
+    with open(customer_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Customer ID', 'First Name', 'Last Name', 'Age', 'Phone Number', 'Monthly Salary', 'Approved Limit'])
+        for customer_id in range(1, customer_count + 1):
+            salary = rng.randint(20, 300) * 1000
+            writer.writerow([
+                customer_id, f"First{customer_id}", f"Last{customer_id}", rng.randint(21, 65),
+                6000000000 + customer_id, salary, round(36 * salary / 100000) * 100000
+            ])
+
+    with open(loan_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            'Customer ID', 'Loan ID', 'Loan Amount', 'Tenure', 'Interest Rate',
+            'Monthly payment', 'EMIs paid on Time', 'Date of Approval', 'End Date'
+        ])
+        for loan_id in range(1, loan_count + 1):
+            tenure = rng.choice([6, 12, 24, 36, 60, 120])
+            start = date(2015, 1, 1) + timedelta(days=rng.randint(0, 3650))
+            writer.writerow([
+                rng.randint(1, customer_count), loan_id, rng.randint(1, 50) * 10000, tenure,
+                rng.randint(500, 2000) / 100, rng.randint(1000, 50000), rng.randint(0, tenure),
+                start.isoformat(), (start + timedelta(days=30 * tenure)).isoformat()
+            ])
+
+    return customer_path, loan_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--customers', type=int, default=20000)
+    parser.add_argument('--loans', type=int, default=100000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from apps.customers.models import Customer
+    from apps.loans.models import Loan
+    from apps.ingestion.loaders import ExcelLoader
+
+    backends = ['orm', 'copy'] if connection.vendor == 'postgresql' else ['orm']
+
+    with tempfile.TemporaryDirectory() as directory, bench_database():
+        customer_path, loan_path = write_csv_files(directory, args.customers, args.loans)
+        print(f"database: {connection.vendor}, customers: {args.customers}, loans: {args.loans}")
+
+        for backend in backends:
+            Loan.objects.all().delete()
+            Customer.objects.all().delete()
+
+            with timer() as customers_time:
+                ExcelLoader.load_customers(customer_path, backend=backend)
+            with timer() as loans_time:
+                ExcelLoader.load_loans(loan_path, backend=backend)
+
+            print(
+                f"{backend:5s} customers: {args.customers / customers_time['seconds']:>10,.0f} rows/s   "
+                f"loans: {args.loans / loans_time['seconds']:>10,.0f} rows/s"
+            )
+
+
+if __name__ == '__main__':
+    main()
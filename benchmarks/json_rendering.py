@@ -0,0 +1,89 @@
+"""
+Serialization cost of the /view-loans payload: ModelSerializer vs the slim
+dict path (CustomerLoanListSerializer.represent_rows), each rendered with
+DRF's JSONRenderer and with the orjson ORJSONRenderer, plus parsing the
+result back with JSONParser vs ORJSONParser.
+
+Rows are built in memory (no database), so only serialization is timed:
+
+    python -m benchmarks.json_rendering [--sizes 100,10000] [--repeat 5]
+"""
+import argparse
+import io
+import random
+import time
+from collections import namedtuple
+from decimal import Decimal
+
+from benchmarks.common import setup_django
+
+
+def build_loans(size, seed=7):
+    """Unsaved Loan instances and the equivalent values_list(named=True) rows."""
+    from apps.loans.models import Loan
+    from apps.loans.serializers import CustomerLoanListSerializer
+
+    Row = namedtuple('Row', CustomerLoanListSerializer.ROW_FIELDS)
+    rng = random.Random(seed)
+    cents = Decimal('0.01')
+    loans, rows = [], []
+    for loan_id in range(1, size + 1):
+        values = dict(
+            loan_id=loan_id,
+            # Quantized like values read from the DecimalField columns
+            loan_amount=Decimal(rng.randint(1000, 5000000)).quantize(cents),
+            interest_rate=(Decimal(rng.randint(500, 2400)) / 100).quantize(cents),
+            monthly_repayment=(Decimal(rng.randint(100000, 9000000)) / 100).quantize(cents),
+            tenure=rng.choice([6, 12, 24, 36, 60]),
+        )
+        loans.append(Loan(**values))
+        rows.append(Row(**values))
+    return loans, rows
+
+
+def best_ms(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='100,10000')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from apps.loans.serializers import CustomerLoanListSerializer
+    from config.parsers import ORJSONParser
+    from config.renderers import ORJSONRenderer
+
+    renderers = [('JSONRenderer', JSONRenderer()), ('ORJSONRenderer', ORJSONRenderer())]
+    parsers = [('JSONParser', JSONParser()), ('ORJSONParser', ORJSONParser())]
+    for size in [int(s) for s in args.sizes.split(',')]:
+        loans, rows = build_loans(size)
+        print(f"\n{size} loans (best of {args.repeat}, ms)")
+        builders = [
+            ('ModelSerializer', lambda: CustomerLoanListSerializer(loans, many=True).data),
+            ('represent_rows', lambda: CustomerLoanListSerializer.represent_rows(rows)),
+        ]
+        for builder_name, build in builders:
+            build_ms, data = best_ms(args.repeat, build)
+            for renderer_name, renderer in renderers:
+                render_ms, content = best_ms(args.repeat, lambda: renderer.render(data))
+                print(
+                    f"  {builder_name:16s} + {renderer_name:15s} {build_ms:9.2f} + {render_ms:8.2f} "
+                    f"= {build_ms + render_ms:9.2f}"
+                )
+        for parser_name, json_parser in parsers:
+            parse_ms, _ = best_ms(args.repeat, lambda: json_parser.parse(io.BytesIO(content)))
+            print(f"  parse {len(content):,} bytes with {parser_name:13s} {parse_ms:9.2f}")
+
+
+if __name__ == '__main__':
+    main()
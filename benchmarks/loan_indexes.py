@@ -0,0 +1,199 @@
+"""
+Query plans and timings for the Loan hot-path queries with and without the
+composite indexes declared on Loan.Meta.indexes.
+
+Seeds a throwaway database with synthetic customers/loans (generate_series
+on PostgreSQL, bulk_create elsewhere), runs each query from credit_score.py,
+loan_service.py and loan_summary.py for a sample of customers, then reports
+the median EXPLAIN ANALYZE execution time and the Loan scan node with the
+indexes dropped and again with them in place:
+
+    DATABASE_URL=postgres://... python -m benchmarks.loan_indexes --customers 200000 --loans 2000000
+
+On other databases only EXPLAIN QUERY PLAN output is shown (no timings).
+"""
+import argparse
+import random
+import re
+import statistics
+from datetime import date, timedelta
+
+from benchmarks.common import setup_django, bench_database, timer
+
+STATUSES = ['APPROVED', 'APPROVED', 'APPROVED', 'PAID', 'PENDING', 'REJECTED']
+
+
+def seed_postgres(connection, customer_count, loan_count):
+    from apps.customers.models import Customer
+    from apps.loans.models import Loan
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {Customer._meta.db_table} "
+            "(customer_id, first_name, last_name, phone_number, monthly_salary, approved_limit, current_debt, age) "
+            "SELECT g, 'First' || g, 'Last' || g, (6000000000 + g)::text, 50000 + (g %% 250) * 1000, "
+            "1800000 + (g %% 250) * 36000, 0, 21 + g %% 45 "
+            "FROM generate_series(1, %s) g",
+            [customer_count]
+        )
+        # Spread loans over ten years of start dates; end_date follows the tenure
+        cursor.execute(
+            f"INSERT INTO {Loan._meta.db_table} "
+            "(loan_id, customer_id, loan_amount, tenure, interest_rate, monthly_repayment, "
+            "emis_paid_on_time, start_date, end_date, status) "
+            "SELECT g, 1 + (random() * (%s - 1))::int, (1 + (random() * 49)::int) * 10000, t.tenure, "
+            "5 + (random() * 15)::numeric(5, 2), (1000 + random() * 49000)::numeric(12, 2), "
+            "(random() * t.tenure)::int, s.start_date, s.start_date + t.tenure * 30, "
+            "(%s::text[])[1 + (random() * %s)::int %% %s] "
+            "FROM generate_series(1, %s) g "
+            "CROSS JOIN LATERAL (SELECT (ARRAY[6, 12, 24, 36, 60, 120])[1 + (g %% 6)] AS tenure) t "
+            "CROSS JOIN LATERAL (SELECT CURRENT_DATE - (random() * 3650)::int AS start_date) s",
+            [customer_count, STATUSES, len(STATUSES), len(STATUSES), loan_count]
+        )
+        cursor.execute(f"ANALYZE {Customer._meta.db_table}")
+        cursor.execute(f"ANALYZE {Loan._meta.db_table}")
+
+
+def seed_orm(customer_count, loan_count, batch_size=10000):
+    from apps.customers.models import Customer
+    from apps.loans.models import Loan
+
+    rng = random.Random(9)
+    Customer.objects.bulk_create(
+        [
+            Customer(
+                customer_id=i, first_name=f"First{i}", last_name=f"Last{i}", phone_number=str(6000000000 + i),
+                monthly_salary=50000, approved_limit=1800000, age=30
+            )
+            for i in range(1, customer_count + 1)
+        ],
+        batch_size=batch_size
+    )
+    batch = []
+    start_dates = []
+    for loan_id in range(1, loan_count + 1):
+        tenure = rng.choice([6, 12, 24, 36, 60, 120])
+        start = date.today() - timedelta(days=rng.randint(0, 3650))
+        start_dates.append(start)
+        batch.append(Loan(
+            loan_id=loan_id, customer_id=rng.randint(1, customer_count), loan_amount=rng.randint(1, 50) * 10000,
+            tenure=tenure, interest_rate=rng.randint(500, 2000) / 100, monthly_repayment=rng.randint(1000, 50000),
+            emis_paid_on_time=rng.randint(0, tenure), start_date=start, end_date=start + timedelta(days=30 * tenure),
+            status=rng.choice(STATUSES)
+        ))
+        if len(batch) >= batch_size or loan_id == loan_count:
+            Loan.objects.bulk_create(batch)
+            # bulk_create stamps start_date with today (auto_now_add); restore the spread
+            for loan, start_date in zip(batch, start_dates):
+                loan.start_date = start_date
+            Loan.objects.bulk_update(batch, ['start_date'])
+            batch = []
+            start_dates = []
+
+
+def hot_queries(customer_ids):
+    """(name, callable) pairs for the per-customer and batch queries the services run."""
+    from django.db.models import Sum
+    from apps.loans.services.credit_score import CreditScoreService
+    from apps.loans.services.loan_service import LoanService
+    from apps.loans.services.loan_summary import LoanSummaryService
+
+    customer_id = customer_ids[0]
+    return [
+        ('credit_score.get_score_aggregates', lambda: CreditScoreService.get_score_aggregates(customer_id)),
+        ('credit_score.get_bulk_score_aggregates (100 ids)',
+         lambda: CreditScoreService.get_bulk_score_aggregates(customer_id__in=customer_ids)),
+        ('loan_service.current_emis', lambda: LoanService.current_loans(customer_id=customer_id).aggregate(
+            Sum('monthly_repayment'))),
+        ('loan_service.batch current_emis (100 ids)', lambda: list(
+            LoanService.current_loans(customer_id__in=customer_ids)
+            .values('customer_id').annotate(total=Sum('monthly_repayment'))
+        )),
+        ('loan_summary.compute', lambda: LoanSummaryService.compute([customer_id])),
+    ]
+
+
+def explain(connection, sql):
+    """Return (execution_ms or None, Loan scan node) for one captured statement."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")
+            lines = [row[0] for row in cursor.fetchall()]
+            match = re.search(r'Execution Time: ([\d.]+) ms', lines[-1])
+            # The node reading loans_loan is the one the composite indexes change
+            scans = [line for line in lines if 'Scan' in line]
+            plan = next((line for line in scans if 'loans_loan' in line), scans[0] if scans else lines[0])
+            plan = plan.split('  (cost=')[0].strip(' ->')
+            return float(match.group(1)) if match else None, plan
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return None, ' | '.join(str(row[-1]) for row in cursor.fetchall())
+
+
+def measure(connection, samples, batch_ids):
+    from django.test.utils import CaptureQueriesContext
+
+    results = {}
+    for customer_ids in [[customer_id] + batch_ids for customer_id in samples]:
+        for name, run in hot_queries(customer_ids):
+            with CaptureQueriesContext(connection) as captured:
+                run()
+            for i, query in enumerate(captured.captured_queries):
+                label = name if len(captured.captured_queries) == 1 else f"{name} [{i + 1}]"
+                results.setdefault(label, []).append(explain(connection, query['sql']))
+    return results
+
+
+def report(title, results):
+    print(f"\n{title}")
+    for label, runs in results.items():
+        timings = [ms for ms, _ in runs if ms is not None]
+        median = f"{statistics.median(timings):9.3f} ms" if timings else '        n/a'
+        print(f"  {label:50s} {median}   {runs[0][1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--customers', type=int, default=100000)
+    parser.add_argument('--loans', type=int, default=1000000)
+    parser.add_argument('--samples', type=int, default=20, help='Customers each query is explained for')
+    args = parser.parse_args()
+
+    setup_django()
+    from apps.loans.models import Loan
+
+    with bench_database() as connection:
+        with timer() as seed_time:
+            if connection.vendor == 'postgresql':
+                seed_postgres(connection, args.customers, args.loans)
+            else:
+                seed_orm(args.customers, args.loans)
+        print(
+            f"database: {connection.vendor}, customers: {args.customers}, loans: {args.loans} "
+            f"(seeded in {seed_time['seconds']:.1f}s)"
+        )
+
+        rng = random.Random(3)
+        samples = rng.sample(range(1, args.customers + 1), min(args.samples, args.customers))
+        batch_ids = rng.sample(range(1, args.customers + 1), min(99, args.customers))
+
+        indexes = Loan._meta.indexes
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(Loan, index)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {Loan._meta.db_table}")
+        report('without composite indexes', measure(connection, samples, batch_ids))
+
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(Loan, index)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                # Fresh visibility map so covering indexes can be used for index-only scans
+                cursor.execute(f"VACUUM ANALYZE {Loan._meta.db_table}")
+        report('with composite indexes', measure(connection, samples, batch_ids))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Latency of page N of /view-loans/<customer_id> with page-number (OFFSET +
+COUNT(*)) paging versus keyset paging (?cursor=, with and without the count).
+
+Seeds one customer with many loans among a crowd of smaller customers, then
+requests pages at increasing depth through the Django test client and
+reports the median time per request:
+
+    DATABASE_URL=postgres://... python -m benchmarks.loan_pagination --loans 200000 --pages 1,10,100,1000
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import setup_django, bench_database, timer
+
+CUSTOMER_ID = 1
+
+
+def seed(connection, loan_count, other_customers, batch_size=10000):
+    from apps.customers.models import Customer
+    from apps.loans.models import Loan
+
+    Customer.objects.bulk_create([
+        Customer(
+            customer_id=i, first_name=f"First{i}", last_name=f"Last{i}", phone_number=str(6000000000 + i),
+            monthly_salary=50000, approved_limit=1800000, age=30
+        )
+        for i in range(1, other_customers + 2)
+    ], batch_size=batch_size)
+    # Interleave the big customer's loans with everyone else's, as ingestion would
+    rng = random.Random(11)
+    customer_ids = [CUSTOMER_ID] * loan_count + [rng.randint(2, other_customers + 1) for _ in range(loan_count)]
+    rng.shuffle(customer_ids)
+    end_date = date.today() + timedelta(days=365)
+    for start in range(0, len(customer_ids), batch_size):
+        Loan.objects.bulk_create([
+            Loan(
+                customer_id=customer_id, loan_amount=100000, tenure=12, interest_rate=10,
+                monthly_repayment=8792, end_date=end_date, status='APPROVED'
+            )
+            for customer_id in customer_ids[start:start + batch_size]
+        ])
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f"VACUUM ANALYZE {Loan._meta.db_table}")
+
+
+def cursor_url(path, position, include_count):
+    """The ?cursor= URL of the page that starts after loan_id `position`."""
+    from rest_framework.pagination import Cursor
+    from apps.loans.pagination import LoanCursorPagination
+
+    paginator = LoanCursorPagination()
+    paginator.base_url = f"{path}?cursor=" + ('' if include_count else '&count=false')
+    if position is None:
+        return paginator.base_url
+    return paginator.encode_cursor(Cursor(offset=0, reverse=False, position=str(position)))
+
+
+def median_ms(client, url, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, (url, response.status_code)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--loans', type=int, default=50000, help="Loans of the paged customer")
+    parser.add_argument('--other-customers', type=int, default=10000)
+    parser.add_argument('--pages', default='1,10,100,400')
+    parser.add_argument('--repeat', type=int, default=15)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import Client
+    from rest_framework.settings import api_settings
+    from apps.loans.models import Loan
+
+    with bench_database() as connection:
+        with timer() as seed_time:
+            seed(connection, args.loans, args.other_customers)
+        print(
+            f"database: {connection.vendor}, paged customer loans: {args.loans}, "
+            f"total loans: {Loan.objects.count()} (seeded in {seed_time['seconds']:.1f}s)"
+        )
+
+        page_size = api_settings.DEFAULT_PAGINATION_CLASS.page_size
+        loan_ids = list(Loan.objects.filter(customer_id=CUSTOMER_ID).order_by('loan_id').values_list('loan_id', flat=True))
+        path = f"/view-loans/{CUSTOMER_ID}"
+        client = Client()
+
+        print(f"\n{'page':>6} {'offset':>12} {'cursor':>12} {'cursor, no count':>18}   (median ms, page size {page_size})")
+        for page in [int(p) for p in args.pages.split(',')]:
+            if (page - 1) * page_size >= len(loan_ids):
+                print(f"{page:>6}   beyond the last page")
+                continue
+            position = loan_ids[(page - 1) * page_size - 1] if page > 1 else None
+            offset = median_ms(client, f"{path}?page={page}", args.repeat)
+            keyset = median_ms(client, cursor_url(path, position, True), args.repeat)
+            keyset_no_count = median_ms(client, cursor_url(path, position, False), args.repeat)
+            print(f"{page:>6} {offset:>12.2f} {keyset:>12.2f} {keyset_no_count:>18.2f}")
+
+
+if __name__ == '__main__':
+    main()
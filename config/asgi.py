@@ -0,0 +1,9 @@
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Serve the async eligibility/read views (config/asgi_urls.py)
+os.environ.setdefault('DJANGO_SERVER_MODE', 'asgi')
+
+application = get_asgi_application()
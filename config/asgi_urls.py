@@ -0,0 +1,21 @@
+"""
+URLconf for the ASGI deployment: the same routes as config.urls, with the
+eligibility and read endpoints served by their async views.
+"""
+from django.urls import path
+from apps.loans.async_views import (
+    AsyncCheckEligibilityView,
+    AsyncViewLoanDetailView,
+    AsyncViewLoansByCustomerView
+)
+from config.urls import urlpatterns as wsgi_urlpatterns
+
+async_views = {
+    'check-eligibility': path('check-eligibility', AsyncCheckEligibilityView.as_view(), name='check-eligibility'),
+    'view-loan-detail': path('view-loan/<int:loan_id>', AsyncViewLoanDetailView.as_view(), name='view-loan-detail'),
+    'view-loans-by-customer': path(
+        'view-loans/<int:customer_id>', AsyncViewLoansByCustomerView.as_view(), name='view-loans-by-customer'
+    ),
+}
+
+urlpatterns = [async_views.get(getattr(pattern, 'name', None), pattern) for pattern in wsgi_urlpatterns]
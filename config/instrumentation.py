@@ -0,0 +1,258 @@
+"""
+Per-request instrumentation: database queries, Redis calls, cache lookups,
+service spans and total handler time.
+
+InstrumentationMiddleware opens a RequestStats for every request (held in a
+contextvar, so it follows the request into sync_to_async threads) and, when
+the response is ready:
+- adds a Server-Timing header (db, redis, cache, service spans, total) if
+  settings.SERVER_TIMING is on (off by default: it tells every client how
+  the request was served), and
+- observes the per-route histograms and counters in config.metrics.REGISTRY,
+  which /metrics serves in the Prometheus text format to the scrapers
+  allowed by settings.METRICS_ALLOWED_IPS / METRICS_TOKEN.
+
+The sources report into whatever RequestStats is current and do nothing
+outside a request:
+- queries through an execute wrapper on every database connection,
+- Redis commands and pipeline executions through GuardedRedis,
+- cache tiers through record_cache() (score cache, loan response cache),
+- service calls through the @instrumented(name) decorator.
+
+Per query or Redis call the cost is a contextvar lookup and two
+perf_counter() reads, so it is meant to stay on in production;
+settings.INSTRUMENTATION turns it off entirely. Work done while a streaming
+body is sent is not included.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from config.metrics import CONTENT_TYPE, REGISTRY
+import functools
+import hmac
+import time
+
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+REQUEST_DURATION = REGISTRY.histogram(
+    'http_request_duration_seconds', 'Total handler time per request.', ['route', 'method']
+)
+REQUESTS = REGISTRY.counter(
+    'http_requests_total', 'Requests handled, by response status.', ['route', 'method', 'status']
+)
+DB_QUERIES = REGISTRY.histogram(
+    'http_request_db_queries', 'Database queries per request.', ['route'], buckets=COUNT_BUCKETS
+)
+DB_DURATION = REGISTRY.histogram(
+    'http_request_db_seconds', 'Time spent in database queries per request.', ['route']
+)
+REDIS_CALLS = REGISTRY.histogram(
+    'http_request_redis_calls', 'Redis commands and pipeline executions per request.', ['route'], buckets=COUNT_BUCKETS
+)
+REDIS_DURATION = REGISTRY.histogram(
+    'http_request_redis_seconds', 'Time spent in Redis calls per request.', ['route']
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    'cache_lookups_total', 'Cache lookups by cache tier and result.', ['cache', 'result']
+)
+SPAN_DURATION = REGISTRY.histogram(
+    'service_span_seconds', 'Time spent in an instrumented service call, per request.', ['route', 'span']
+)
+
+class RequestStats:
+    __slots__ = ('db_queries', 'db_seconds', 'redis_calls', 'redis_seconds', 'cache', 'spans')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.redis_calls = 0
+        self.redis_seconds = 0.0
+        self.cache = {}  # (cache, 'hit'|'miss') -> count
+        self.spans = {}  # name -> [seconds, calls]
+
+    def add_span(self, name, seconds):
+        span = self.spans.get(name)
+        if span is None:
+            self.spans[name] = [seconds, 1]
+        else:
+            span[0] += seconds
+            span[1] += 1
+
+    def server_timing(self, total_seconds):
+        """Server-Timing header value; durations in milliseconds."""
+        entries = [
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.db_queries} queries"',
+            f'redis;dur={self.redis_seconds * 1000:.2f};desc="{self.redis_calls} calls"',
+        ]
+        for cache in sorted({cache for cache, _ in self.cache}):
+            hits, misses = self.cache.get((cache, 'hit'), 0), self.cache.get((cache, 'miss'), 0)
+            entries.append(f'cache-{cache};desc="hit {hits} miss {misses}"')
+        for name, (seconds, calls) in self.spans.items():
+            entries.append(f'{name};dur={seconds * 1000:.2f};desc="{calls} calls"')
+        entries.append(f'total;dur={total_seconds * 1000:.2f}')
+        return ', '.join(entries)
+
+_current = ContextVar('request_stats', default=None)
+
+def current_stats():
+    """The RequestStats of the request being handled, or None."""
+    return _current.get()
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection; counts queries run inside a request."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_seconds += time.perf_counter() - start
+        stats.db_queries += 1
+
+def install_query_hook(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+# New connections (any thread, including sync_to_async workers) get the hook on connect
+connection_created.connect(install_query_hook)
+
+def track_redis(fn, *args, **kwargs):
+    """Call fn (a Redis command) and count it against the current request."""
+    stats = _current.get()
+    if stats is None:
+        return fn(*args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        stats.redis_seconds += time.perf_counter() - start
+        stats.redis_calls += 1
+
+async def atrack_redis(fn, *args, **kwargs):
+    stats = _current.get()
+    if stats is None:
+        return await fn(*args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return await fn(*args, **kwargs)
+    finally:
+        stats.redis_seconds += time.perf_counter() - start
+        stats.redis_calls += 1
+
+def record_cache(cache, hit, count=1):
+    """Count lookups in a cache tier (e.g. 'score-local', 'loan-response') for metrics and the current request."""
+    if not count:
+        return
+    result = 'hit' if hit else 'miss'
+    CACHE_LOOKUPS.inc(cache, result, amount=count)
+    stats = _current.get()
+    if stats is not None:
+        stats.cache[(cache, result)] = stats.cache.get((cache, result), 0) + count
+
+def instrumented(name):
+    """Time calls of a service function (sync or async) as span `name` of the current request."""
+    def decorator(fn):
+        if iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                stats = _current.get()
+                if stats is None:
+                    return await fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    stats.add_span(name, time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            stats = _current.get()
+            if stats is None:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stats.add_span(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+class InstrumentationMiddleware:
+    """Collects RequestStats per request; place first in MIDDLEWARE so the total covers the whole stack."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'INSTRUMENTATION', True)
+        self.server_timing = getattr(settings, 'SERVER_TIMING', False)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        # Connections opened before this module was imported are hooked here (once per connection)
+        for connection in connections.all(initialized_only=True):
+            install_query_hook(connection)
+        stats, start = RequestStats(), time.perf_counter()
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        stats, start = RequestStats(), time.perf_counter()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - start)
+
+    def finish(self, request, response, stats, total_seconds):
+        match = request.resolver_match
+        route = match.route if match is not None else 'unmatched'
+        method = request.method
+        REQUEST_DURATION.observe(total_seconds, route, method)
+        REQUESTS.inc(route, method, str(response.status_code))
+        DB_QUERIES.observe(stats.db_queries, route)
+        DB_DURATION.observe(stats.db_seconds, route)
+        REDIS_CALLS.observe(stats.redis_calls, route)
+        REDIS_DURATION.observe(stats.redis_seconds, route)
+        for name, (seconds, _) in stats.spans.items():
+            SPAN_DURATION.observe(seconds, route, name)
+        if self.server_timing:
+            response['Server-Timing'] = stats.server_timing(total_seconds)
+        return response
+
+def metrics_allowed(request):
+    """
+    Whether the request may scrape /metrics: it connects from one of
+    settings.METRICS_ALLOWED_IPS, or sends 'Authorization: Bearer
+    <METRICS_TOKEN>' when a token is configured. Only the socket address is
+    trusted (X-Forwarded-For can be set by any client).
+    """
+    if request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', ()):
+        return True
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    return bool(token) and hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode())
+
+def metrics_view(request):
+    """Prometheus scrape endpoint (this process's metrics), for allowed scrapers only."""
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(REGISTRY.exposition(), content_type=CONTENT_TYPE)
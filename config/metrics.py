@@ -0,0 +1,127 @@
+"""
+Minimal Prometheus metrics: counters and histograms with labels, rendered
+in the text exposition format served by /metrics.
+
+Values are per process (each gunicorn worker keeps its own), which is what
+Prometheus expects when every worker is scraped, or summed by a sidecar;
+there is no shared-memory aggregation as in prometheus_client's
+multiprocess mode.
+"""
+import bisect
+import math
+import threading
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labelvalues, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+    def get(self, *labelvalues):
+        with self._lock:
+            return self._values.get(labelvalues, 0)
+
+class Histogram:
+    type = 'histogram'
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}  # labelvalues -> [per-bucket counts..., +Inf count, sum]
+
+    def observe(self, value, *labelvalues):
+        # Non-cumulative counts; the exposition sums them up
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            series = {labelvalues: list(values) for labelvalues, values in self._series.items()}
+        for labelvalues, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), values[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, labelvalues, [('le', _format_value(bound))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_format_value(values[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+    def count(self, *labelvalues):
+        with self._lock:
+            values = self._series.get(labelvalues)
+            return sum(values[:-1]) if values else 0
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=Histogram.DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def exposition(self):
+        """All metrics in the Prometheus text format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
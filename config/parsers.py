@@ -0,0 +1,21 @@
+"""orjson-backed JSON parser for DRF (enabled in REST_FRAMEWORK); stdlib fallback without orjson."""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; requirements.txt pins it
+    orjson = None
+
+class ORJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # orjson rejects NaN/Infinity, matching STRICT_JSON
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,231 @@
+"""
+Shared Redis client for the app (credit score cache, locks, pub/sub).
+
+One client per process, built from the REDIS_* settings:
+- BlockingConnectionPool: at most REDIS_MAX_CONNECTIONS sockets; callers
+  wait up to REDIS_POOL_TIMEOUT for a free one instead of opening more.
+- Connect/read timeouts, so a hung Redis costs milliseconds, not a worker.
+- Retries with exponential backoff and jitter on connection errors/timeouts.
+- A circuit breaker: after REDIS_CIRCUIT_FAILURE_THRESHOLD consecutive
+  failures every call fails immediately with CircuitOpenError for
+  REDIS_CIRCUIT_COOLDOWN seconds, then one trial call decides whether to close it.
+  Only connection errors and timeouts count as failures; an error the
+  server answers with (WRONGTYPE, WatchError...) shows Redis is up.
+
+CircuitOpenError is a redis ConnectionError, so callers that already treat
+Redis as optional (try/except around cache calls) degrade without changes.
+
+get_async_redis_client() is the redis.asyncio counterpart for the ASGI
+views: same settings, one pool per event loop, and the same breaker as the
+sync client so both see one view of Redis health.
+
+Both clients report every command and pipeline execution to the request
+instrumentation (config.instrumentation) for per-request Redis metrics.
+"""
+from django.conf import settings
+from config.instrumentation import atrack_redis, track_redis
+import asyncio
+import redis
+import redis.asyncio
+import redis.asyncio.retry
+from redis.backoff import ExponentialWithJitterBackoff
+from redis.retry import Retry
+import threading
+import time
+import weakref
+
+class CircuitOpenError(redis.exceptions.ConnectionError):
+    """Raised instead of calling Redis while the circuit breaker is open."""
+
+class CircuitBreaker:
+    FAILURES = (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError)
+
+    def __init__(self, failure_threshold, cooldown):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def check(self):
+        """
+        Raise CircuitOpenError unless a call may go through. Returns True when
+        the caller holds the half-open trial and must release it (call/acall do).
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at < self.cooldown or self._trial_in_flight:
+                raise CircuitOpenError("Redis circuit breaker is open")
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        with self._lock:
+            self._trial_in_flight = False
+
+    def call(self, fn, *args, **kwargs):
+        trial = self.check()
+        try:
+            result = fn(*args, **kwargs)
+        except self.FAILURES:
+            self.record_failure()
+            raise
+        except redis.exceptions.RedisError:
+            # The server answered (WRONGTYPE, a WatchError...): Redis itself is healthy
+            self.record_success()
+            raise
+        else:
+            self.record_success()
+            return result
+        finally:
+            # Whatever else was raised, never leave the half-open trial taken
+            if trial:
+                self.release_trial()
+
+    async def acall(self, fn, *args, **kwargs):
+        """call() for coroutine functions."""
+        trial = self.check()
+        try:
+            result = await fn(*args, **kwargs)
+        except self.FAILURES:
+            self.record_failure()
+            raise
+        except redis.exceptions.RedisError:
+            self.record_success()
+            raise
+        else:
+            self.record_success()
+            return result
+        finally:
+            if trial:
+                self.release_trial()
+
+class GuardedRedis:
+    """
+    redis.Redis proxy that routes commands and pipeline executions through a
+    CircuitBreaker. pubsub() is passed through unguarded: subscribers manage
+    their own reconnects.
+    """
+    UNGUARDED = {'pubsub', 'close', 'connection_pool'}
+
+    def __init__(self, client, breaker):
+        self.client = client
+        self.breaker = breaker
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name in self.UNGUARDED or not callable(attr):
+            return attr
+
+        def guarded(*args, **kwargs):
+            return track_redis(self.breaker.call, attr, *args, **kwargs)
+        return guarded
+
+    def pipeline(self, *args, **kwargs):
+        # Building a pipeline sends nothing; only execute() goes through the breaker
+        pipe = self.client.pipeline(*args, **kwargs)
+        execute = pipe.execute
+        pipe.execute = lambda *a, **kw: track_redis(self.breaker.call, execute, *a, **kw)
+        return pipe
+
+class AsyncGuardedRedis(GuardedRedis):
+    """GuardedRedis for a redis.asyncio client: commands and pipeline executions are awaited."""
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name in self.UNGUARDED or not callable(attr):
+            return attr
+
+        async def guarded(*args, **kwargs):
+            return await atrack_redis(self.breaker.acall, attr, *args, **kwargs)
+        return guarded
+
+    def pipeline(self, *args, **kwargs):
+        pipe = self.client.pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def guarded_execute(*a, **kw):
+            return await atrack_redis(self.breaker.acall, execute, *a, **kw)
+        pipe.execute = guarded_execute
+        return pipe
+
+def _pool_options(overrides, retry_class):
+    def option(name):
+        return overrides.get(name.lower(), getattr(settings, f"REDIS_{name}"))
+
+    return option, dict(
+        host=option('HOST'),
+        port=option('PORT'),
+        db=option('DB'),
+        max_connections=option('MAX_CONNECTIONS'),
+        timeout=option('POOL_TIMEOUT'),
+        socket_connect_timeout=option('SOCKET_CONNECT_TIMEOUT'),
+        socket_timeout=option('SOCKET_TIMEOUT'),
+        health_check_interval=option('HEALTH_CHECK_INTERVAL'),
+        retry=retry_class(
+            ExponentialWithJitterBackoff(cap=option('RETRY_BACKOFF_CAP'), base=option('RETRY_BACKOFF_BASE')),
+            option('RETRY_ATTEMPTS'),
+        ),
+        retry_on_error=[redis.exceptions.ConnectionError, redis.exceptions.TimeoutError],
+        decode_responses=True,
+    )
+
+def create_redis_client(**overrides):
+    """Build a GuardedRedis from the REDIS_* settings; keyword overrides use the setting names without the prefix."""
+    option, pool_options = _pool_options(overrides, Retry)
+    pool = redis.BlockingConnectionPool(**pool_options)
+    breaker = CircuitBreaker(option('CIRCUIT_FAILURE_THRESHOLD'), option('CIRCUIT_COOLDOWN'))
+    return GuardedRedis(redis.Redis(connection_pool=pool), breaker)
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_redis_client():
+    """The process-wide client (pools are fork-safe: redis-py resets them in a child process)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_redis_client()
+    return _client
+
+def create_async_redis_client(breaker=None, **overrides):
+    """Build an AsyncGuardedRedis; pass a breaker to share health state with another client."""
+    option, pool_options = _pool_options(overrides, redis.asyncio.retry.Retry)
+    pool = redis.asyncio.BlockingConnectionPool(**pool_options)
+    breaker = breaker or CircuitBreaker(option('CIRCUIT_FAILURE_THRESHOLD'), option('CIRCUIT_COOLDOWN'))
+    return AsyncGuardedRedis(redis.asyncio.Redis(connection_pool=pool), breaker)
+
+_async_clients = weakref.WeakKeyDictionary()
+
+def get_async_redis_client():
+    """
+    The client for the running event loop. asyncio connections cannot be
+    shared across loops, so each loop (one per ASGI worker in production)
+    gets its own pool.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = create_async_redis_client(breaker=get_redis_client().breaker)
+        _async_clients[loop] = client
+    return client
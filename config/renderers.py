@@ -0,0 +1,39 @@
+"""
+orjson-backed JSON renderer for DRF (enabled in REST_FRAMEWORK).
+
+Produces the same bytes as rest_framework.renderers.JSONRenderer for the
+compact, unicode output the API uses: types orjson does not know
+(Decimal, dates, lazy strings, ...) go through DRF's JSONEncoder.default,
+so a Decimal outside a serializer is still rendered as a number. Indented
+output (?format=json with `indent=`) and installs without orjson fall back
+to the stdlib renderer.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; requirements.txt pins it
+    orjson = None
+
+class ORJSONRenderer(JSONRenderer):
+    encoder = JSONEncoder()
+    # Dates through DRF's encoder (it trims microseconds to milliseconds); int keys like json.dumps
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.encoder.default, option=self.options)
+        # Same JavaScript-safe escaping as JSONRenderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
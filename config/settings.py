@@ -30,6 +30,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its total covers every other middleware
+    'config.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,7 +41,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'config.urls'
+# config/asgi.py sets DJANGO_SERVER_MODE=asgi to route hot endpoints to async views
+ROOT_URLCONF = 'config.asgi_urls' if os.environ.get('DJANGO_SERVER_MODE') == 'asgi' else 'config.urls'
 
 TEMPLATES = [
     {
@@ -58,6 +61,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
 DATABASES = {
     'default': dj_database_url.config(
@@ -66,6 +70,9 @@ DATABASES = {
     )
 }
 
+# Covering (INCLUDE) indexes are Postgres-only; SQLite (dev/tests) builds them without the extra columns
+SILENCED_SYSTEM_CHECKS = ['models.W040']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -101,8 +108,78 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 
+# Ingestion write backend: 'auto' uses COPY on PostgreSQL and bulk_create elsewhere,
+# 'orm' always uses bulk_create, 'copy' requests COPY (falls back to the ORM off PostgreSQL)
+INGESTION_BACKEND = os.environ.get('INGESTION_BACKEND', 'auto')
+# Rows per shard when a file is split across Celery tasks or worker processes
+INGESTION_SHARD_SIZE = int(os.environ.get('INGESTION_SHARD_SIZE', 50000))
+# Where shard files are written; empty means next to the file being ingested.
+# Celery workers must be able to read it.
+INGESTION_SHARD_DIR = os.environ.get('INGESTION_SHARD_DIR') or None
+
+# Rows per transaction when a bank settlement file is applied (see PaymentService)
+PAYMENT_SETTLEMENT_BATCH_SIZE = int(os.environ.get('PAYMENT_SETTLEMENT_BATCH_SIZE', 5000))
+
+# Redis used by the app (cache, locks, pub/sub); see config/redis_client.py
+REDIS_HOST = os.environ.get('REDIS_HOST', 'localhost')
+REDIS_PORT = int(os.environ.get('REDIS_PORT', 6379))
+REDIS_DB = int(os.environ.get('REDIS_DB', 1))
+REDIS_MAX_CONNECTIONS = int(os.environ.get('REDIS_MAX_CONNECTIONS', 50))
+REDIS_POOL_TIMEOUT = float(os.environ.get('REDIS_POOL_TIMEOUT', 0.2))  # Wait for a free pooled connection
+REDIS_SOCKET_CONNECT_TIMEOUT = float(os.environ.get('REDIS_SOCKET_CONNECT_TIMEOUT', 0.2))
+REDIS_SOCKET_TIMEOUT = float(os.environ.get('REDIS_SOCKET_TIMEOUT', 0.3))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.environ.get('REDIS_HEALTH_CHECK_INTERVAL', 30))
+REDIS_RETRY_ATTEMPTS = int(os.environ.get('REDIS_RETRY_ATTEMPTS', 2))
+REDIS_RETRY_BACKOFF_BASE = float(os.environ.get('REDIS_RETRY_BACKOFF_BASE', 0.01))
+REDIS_RETRY_BACKOFF_CAP = float(os.environ.get('REDIS_RETRY_BACKOFF_CAP', 0.1))
+# Skip Redis for REDIS_CIRCUIT_COOLDOWN seconds after this many consecutive failures
+REDIS_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('REDIS_CIRCUIT_FAILURE_THRESHOLD', 5))
+REDIS_CIRCUIT_COOLDOWN = float(os.environ.get('REDIS_CIRCUIT_COOLDOWN', 30))
+
+# Per-process credit score cache in front of Redis (off by default). Entries live for
+# CREDIT_SCORE_LOCAL_CACHE_TTL seconds and invalidations are broadcast over Redis pub/sub.
+CREDIT_SCORE_LOCAL_CACHE = os.environ.get('CREDIT_SCORE_LOCAL_CACHE', 'false').lower() in ('1', 'true', 'yes')
+CREDIT_SCORE_LOCAL_CACHE_SIZE = int(os.environ.get('CREDIT_SCORE_LOCAL_CACHE_SIZE', 10000))
+CREDIT_SCORE_LOCAL_CACHE_TTL = float(os.environ.get('CREDIT_SCORE_LOCAL_CACHE_TTL', 5))
+
+# Event-driven score recomputation (see ScoreEventService): loan changes are published to a
+# Redis stream and recomputed by a beat-scheduled consumer, so cached scores never expire
+CREDIT_SCORE_EVENTS = os.environ.get('CREDIT_SCORE_EVENTS', 'false').lower() in ('1', 'true', 'yes')
+CREDIT_SCORE_EVENTS_WINDOW = float(os.environ.get('CREDIT_SCORE_EVENTS_WINDOW', 5))  # Seconds between consumer runs
+CREDIT_SCORE_EVENTS_BATCH_SIZE = int(os.environ.get('CREDIT_SCORE_EVENTS_BATCH_SIZE', 1000))
+CREDIT_SCORE_EVENTS_MAXLEN = int(os.environ.get('CREDIT_SCORE_EVENTS_MAXLEN', 100000))
+CELERY_BEAT_SCHEDULE = {
+    'recompute-changed-credit-scores': {
+        'task': 'apps.loans.tasks.recompute_changed_scores',
+        'schedule': CREDIT_SCORE_EVENTS_WINDOW,
+    },
+}
+
+# Rendered /view-loan and /view-loans responses in Redis, keyed by ETag (see LoanResponseCache)
+LOAN_RESPONSE_CACHE = os.environ.get('LOAN_RESPONSE_CACHE', 'false').lower() in ('1', 'true', 'yes')
+LOAN_RESPONSE_CACHE_TTL = int(os.environ.get('LOAN_RESPONSE_CACHE_TTL', 300))
+
+# Per-request query/Redis/cache/timing instrumentation (config/instrumentation.py),
+# exported as Prometheus metrics on /metrics and, optionally, as Server-Timing headers
+INSTRUMENTATION = os.environ.get('INSTRUMENTATION', 'true').lower() in ('1', 'true', 'yes')
+# Server-Timing exposes query counts and timings to every client: opt in (e.g. staging, local debugging)
+SERVER_TIMING = os.environ.get('SERVER_TIMING', 'false').lower() in ('1', 'true', 'yes')
+# /metrics answers scrapers connecting from these addresses, or presenting METRICS_TOKEN as a bearer token
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 # DRF Configuration
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 100
+    'PAGE_SIZE': 100,
+    # orjson-backed JSON (same output as DRF's JSONRenderer/JSONParser, see config/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'config.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'config.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
@@ -2,10 +2,16 @@ from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
 from apps.customers.views import RegisterView
+from config.instrumentation import metrics_view
 from apps.loans.views import (
     CheckEligibilityView, 
+    CheckEligibilityBatchView,
     CreateLoanView, 
+    CreditScoreView,
+    LoanPaymentsView,
+    PaymentSettlementView,
     ViewLoanDetailView, 
+    ViewLoanScheduleView,
     ViewLoansByCustomerView
 )
 
@@ -16,13 +22,21 @@ urlpatterns = [
     path('qa/', include('apps.qa_interface.urls')),
     path('', RedirectView.as_view(url='/qa/', permanent=False)), # Redirect root to QA Dashboard
 
+    # Prometheus scrape endpoint
+    path('metrics', metrics_view, name='metrics'),
+
     
     # Customer Endpoints
     path('register', RegisterView.as_view(), name='register'),
     
     # Loan Endpoints
     path('check-eligibility', CheckEligibilityView.as_view(), name='check-eligibility'),
+    path('check-eligibility/batch', CheckEligibilityBatchView.as_view(), name='check-eligibility-batch'),
     path('create-loan', CreateLoanView.as_view(), name='create-loan'),
     path('view-loan/<int:loan_id>', ViewLoanDetailView.as_view(), name='view-loan-detail'),
+    path('view-loan/<int:loan_id>/schedule', ViewLoanScheduleView.as_view(), name='view-loan-schedule'),
     path('view-loans/<int:customer_id>', ViewLoansByCustomerView.as_view(), name='view-loans-by-customer'),
+    path('loans/<int:loan_id>/payments', LoanPaymentsView.as_view(), name='loan-payments'),
+    path('loans/payments/settlement', PaymentSettlementView.as_view(), name='payment-settlement'),
+    path('credit-score/<int:customer_id>', CreditScoreView.as_view(), name='credit-score'),
 ]